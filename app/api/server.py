@@ -0,0 +1,278 @@
+import logging
+import math
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config.logging_config import setup_logging
+from app.config.settings import settings
+from app.database import get_db, get_read_sessionmaker
+from app.models.cep_record import CEPRecord
+from app.repositories.cached_cep_repository import CachedCEPRepository
+from app.repositories.cep_not_found_repository import CEPNotFoundRepository
+from app.repositories.cep_repository import CEPRepository
+from app.repositories.write_behind_cep_repository import (
+    WriteBehindCEPRepository,
+)
+from app.schemas.cep_schema import (
+    CEPBatchRequest,
+    CEPBatchResponse,
+    CEPPage,
+    CEPSchema,
+)
+from app.services.cep_service import (
+    MAX_PAGE_SIZE,
+    CEPService,
+    sanitize_cep,
+)
+from app.services.cep_refresher import CEPRefresher, create_cep_refresher
+from app.services.multi_provider_api_service import create_api_service
+from app.utils.cep_json_cache import CEPJSON, CEPJSONCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_STATE_VALUES = {
+    CircuitBreaker.CLOSED: 0,
+    CircuitBreaker.HALF_OPEN: 1,
+    CircuitBreaker.OPEN: 2,
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cada processo worker do uvicorn configura o próprio logging: a fila e
+    # a thread de escrita não passam do processo pai para os workers
+    log_listener = None
+    if app.state.configure_logging:
+        log_listener = setup_logging()
+    # Dependências compartilhadas por todas as requisições: o pool HTTP, o
+    # cache de CEPs e o registro de CEPs inexistentes vivem com o processo
+    app.state.api_service = create_api_service()
+    repository = CEPRepository(read_sessionmaker=get_read_sessionmaker())
+    app.state.write_behind = None
+    if settings.CEP_WRITE_BEHIND:
+        repository = WriteBehindCEPRepository(repository)
+        repository.start()
+        app.state.write_behind = repository
+        metrics.gauge(
+            "cep_write_behind_pending",
+            "CEPs obtidos da API aguardando gravação na base.",
+            lambda: len(repository),
+        )
+    app.state.json_cache = CEPJSONCache()
+    app.state.cep_repository = CachedCEPRepository(
+        repository, json_cache=app.state.json_cache
+    )
+    app.state.cep_refresher = create_cep_refresher(
+        app.state.api_service, app.state.cep_repository
+    )
+    app.state.not_found_repository = CEPNotFoundRepository()
+    metrics.gauge(
+        "cep_cache_entries",
+        "CEPs mantidos no cache em memória.",
+        lambda: len(app.state.cep_repository.cache),
+    )
+    metrics.gauge(
+        "cep_json_cache_entries",
+        "CEPs com o JSON da resposta já serializado em cache.",
+        lambda: len(app.state.json_cache),
+    )
+    metrics.gauge(
+        "cep_api_circuit_state",
+        "Pior estado entre os circuit breakers dos provedores externos "
+        "(0 fechado, 1 meio aberto, 2 aberto).",
+        lambda: max(
+            CIRCUIT_STATE_VALUES[breaker.state] for breaker in
+            app.state.api_service.circuit_breakers.values()
+        ),
+    )
+    yield
+    if app.state.cep_refresher is not None:
+        app.state.cep_refresher.close()
+    app.state.api_service.close()
+    if app.state.write_behind is not None:
+        app.state.write_behind.close()
+    if log_listener is not None:
+        log_listener.stop()
+
+
+def get_cep_service(
+    request: Request, db: Session = Depends(get_db)
+) -> CEPService:
+    state = request.app.state
+    return CEPService(
+        db_session=db,
+        api_service=state.api_service,
+        cep_repository=state.cep_repository,
+        not_found_repository=state.not_found_repository,
+        refresher=state.cep_refresher,
+    )
+
+
+def to_schema(cep_model) -> CEPSchema:
+    try:
+        return CEPSchema.model_validate(cep_model)
+    except Exception as e:
+        logger.error(f"Erro ao validar dados do CEP {cep_model.cep}: {e}")
+        raise HTTPException(
+            status_code=500, detail="Erro ao gerar os dados do CEP."
+        )
+
+
+def to_json_entry(json_cache: CEPJSONCache, record: CEPRecord) -> CEPJSON:
+    # JSON gerado direto do registro, sem entidade do ORM nem validação do
+    # response_model, que só documenta o formato; normalmente já foi gerado
+    # quando o CEP entrou no cache
+    entry = json_cache.get(record.cep)
+    if entry is not None:
+        return entry
+    try:
+        return json_cache.put(record)
+    except Exception as e:
+        logger.error(f"Erro ao validar dados do CEP {record.cep}: {e}")
+        raise HTTPException(
+            status_code=500, detail="Erro ao gerar os dados do CEP."
+        )
+
+
+def serve_cached_json(
+    refresher: Optional[CEPRefresher], cep: str, entry: CEPJSON
+) -> bool:
+    """Se o JSON em cache pode ser servido: com o CEP vencido
+    (``CEP_HARD_TTL_SECONDS``) a consulta passa pelo serviço, que o
+    revalida; vencido só o prazo brando, a revalidação é agendada."""
+    if refresher is None:
+        return True
+    freshness = refresher.freshness(entry.verified_at)
+    if freshness == refresher.EXPIRED:
+        return False
+    if freshness == refresher.STALE:
+        refresher.schedule(cep)
+    return True
+
+
+def to_json_response(entry: CEPJSON, accept_encoding: Optional[str]):
+    content, encoding = entry.variant(accept_encoding)
+    headers = {}
+    if entry.gzip is not None or entry.br is not None:
+        headers["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=content, media_type="application/json", headers=headers
+    )
+
+
+def create_app(configure_logging: bool = False) -> FastAPI:
+    app = FastAPI(title="Consulta de CEP", lifespan=lifespan)
+    app.state.configure_logging = configure_logging
+
+    @app.get("/cep/{cep}", response_model=CEPSchema)
+    def get_cep(
+        cep: str,
+        request: Request,
+        cep_service: CEPService = Depends(get_cep_service),
+    ):
+        sanitized = sanitize_cep(cep)
+        if len(sanitized) != 8:
+            raise HTTPException(status_code=400, detail="CEP inválido.")
+        accept_encoding = request.headers.get("accept-encoding")
+        json_cache = request.app.state.json_cache
+        # Acerto no cache de JSON: os bytes prontos, sem consultar o serviço,
+        # desde que o CEP não tenha passado do prazo de validade
+        entry = json_cache.get(sanitized)
+        if entry is not None and serve_cached_json(
+            request.app.state.cep_refresher, sanitized, entry
+        ):
+            metrics.inc("json_cache_hit")
+            return to_json_response(entry, accept_encoding)
+        failed = set()
+        record = cep_service.get_cep_record(cep, failed)
+        if record is None and failed:
+            # Falha temporária (API fora, circuito aberto, erro ao gravar):
+            # um 404 seria guardado por clientes e caches como definitivo
+            raise HTTPException(
+                status_code=503,
+                detail="Consulta do CEP indisponível no momento.",
+                headers={"Retry-After": str(
+                    math.ceil(settings.API_CIRCUIT_RECOVERY_SECONDS)
+                )},
+            )
+        if record is None:
+            raise HTTPException(status_code=404, detail="CEP não encontrado.")
+        return to_json_response(
+            to_json_entry(json_cache, record), accept_encoding
+        )
+
+    @app.post("/cep/batch", response_model=CEPBatchResponse)
+    def get_ceps(
+        batch: CEPBatchRequest,
+        cep_service: CEPService = Depends(get_cep_service),
+    ):
+        results = cep_service.get_or_fetch_many(batch.ceps)
+        return CEPBatchResponse(results={
+            cep: to_schema(cep_model) if cep_model else None
+            for cep, cep_model in results.items()
+        })
+
+    @app.get("/ceps", response_model=CEPPage)
+    def list_ceps(
+        prefix: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        uf: Optional[str] = None,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+        cep_service: CEPService = Depends(get_cep_service),
+    ):
+        try:
+            page = cep_service.list_ceps(
+                prefix=prefix, start=start, end=end, uf=uf,
+                localidade=localidade, after=after, limit=limit,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except SQLAlchemyError:
+            # Sem a página, o cliente não pode concluir que a lista acabou
+            raise HTTPException(
+                status_code=503, detail="Base de dados indisponível."
+            )
+        return CEPPage(
+            results=[to_schema(cep_model) for cep_model in page],
+            next_after=page[-1].cep if len(page) == limit else None,
+        )
+
+    @app.get("/health")
+    def health(request: Request, db: Session = Depends(get_db)):
+        try:
+            db.execute(text("SELECT 1"))
+        except Exception as e:
+            logger.error(f"Falha no health check da base de dados: {e}")
+            raise HTTPException(
+                status_code=503, detail="Base de dados indisponível."
+            )
+        # O circuito aberto não derruba o serviço: os CEPs já conhecidos
+        # continuam sendo servidos a partir da base
+        breakers = request.app.state.api_service.circuit_breakers
+        return {"status": "ok", "external_api": {
+            name: breaker.snapshot() for name, breaker in breakers.items()
+        }}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def prometheus_metrics():
+        return metrics.render_prometheus()
+
+    return app
+
+
+def create_worker_app() -> FastAPI:
+    """Fábrica usada pelo uvicorn em cada processo do servidor."""
+    return create_app(configure_logging=True)
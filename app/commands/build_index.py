@@ -0,0 +1,56 @@
+import argparse
+import logging
+import time
+from typing import Optional
+
+from app.config.logging_config import setup_logging
+from app.database import get_sessionmaker
+from app.repositories.in_memory_cep_repository import InMemoryCEPRepository
+from app.utils.cep_dump import iter_cep_records
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_index(output: str, dump_path: Optional[str] = None) -> int:
+    """Gera o snapshot do índice em memória a partir de um arquivo de CEPs
+    (CSV ou JSON lines) ou, sem arquivo, da tabela ``CEP``."""
+    started_at = time.monotonic()
+    if dump_path:
+        index = InMemoryCEPRepository.from_records(
+            iter_cep_records(dump_path)
+        )
+    else:
+        with get_sessionmaker()() as db:
+            index = InMemoryCEPRepository.from_database(db)
+    index.save(output)
+    logger.info(
+        "Índice com %s CEPs gravado em %s (%.1fs).",
+        len(index), output, time.monotonic() - started_at,
+    )
+    return len(index)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Gera o snapshot do índice de CEPs para consultas "
+                    "sem base de dados."
+    )
+    parser.add_argument("output", help="Arquivo do snapshot a gravar.")
+    parser.add_argument(
+        "--dump",
+        metavar="ARQUIVO",
+        help="Arquivo de CEPs (.csv/.jsonl, opcionalmente .gz); "
+             "sem ele, lê a tabela CEP.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+    build_index(args.output, dump_path=args.dump)
+
+
+if __name__ == "__main__":
+    main()
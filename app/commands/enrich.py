@@ -0,0 +1,295 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    wait,
+)
+from multiprocessing.util import Finalize
+from typing import Iterator, List, Optional, Set, TextIO, Tuple
+
+from app.config.logging_config import setup_logging
+from app.services.cep_service import CEPService
+from app.schemas.cep_schema import cep_record_json
+from app.utils.cep_dump import chunked, open_text
+from app.utils.cep_normalizer import normalize_ceps
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_enrich.json"
+
+# Motivo gravado nas linhas sem endereço (``"erro": true``)
+STATUS_NOT_FOUND = "not_found"
+STATUS_INVALID = "invalid"
+STATUS_ERROR = "error"
+
+# Serviço do processo worker, criado por ``init_worker``
+_worker: Optional[CEPService] = None
+
+
+def part_path(output_dir: str, shard: int) -> str:
+    return os.path.join(output_dir, f"part-{shard:06d}.jsonl")
+
+
+def init_worker() -> None:
+    """Prepara um worker: engine, sessão e pool HTTP próprios do processo."""
+    global _worker
+    from app.database import get_read_sessionmaker, get_sessionmaker
+    from app.repositories.cached_cep_repository import CachedCEPRepository
+    from app.repositories.cep_not_found_repository import (
+        CEPNotFoundRepository,
+    )
+    from app.repositories.cep_repository import CEPRepository
+    from app.services.multi_provider_api_service import create_api_service
+
+    setup_logging()
+    db_session = get_sessionmaker()()
+    api_service = create_api_service()
+    _worker = CEPService(
+        db_session=db_session,
+        api_service=api_service,
+        cep_repository=CachedCEPRepository(
+            CEPRepository(read_sessionmaker=get_read_sessionmaker())
+        ),
+        not_found_repository=CEPNotFoundRepository(),
+    )
+    # Processos do pool terminam sem rodar o atexit; Finalize com
+    # prioridade roda na saída do worker
+    Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker() -> None:
+    if _worker is not None:
+        _worker.api_service.close()
+        _worker.db_session.close()
+        logger.info("Worker %s encerrado.", os.getpid())
+
+
+def process_shard(
+    shard: int, lines: List[str], output_dir: str
+) -> Tuple[int, int, int, int, float]:
+    """Resolve os CEPs de um shard e grava ``part-<shard>.jsonl``.
+
+    O arquivo só aparece completo (gravação em temporário e ``os.replace``):
+    sua existência é o checkpoint do shard. Com falhas temporárias (API
+    fora, circuito aberto, erro ao gravar), o shard não é finalizado e é
+    refeito na próxima execução, em que os CEPs já gravados vêm da base.
+    Retorna (shard, linhas, CEPs encontrados, CEPs com falha, segundos).
+    """
+    started_at = time.monotonic()
+    column = normalize_ceps(lines)
+    failed: Set[str] = set()
+    results = _worker.get_records_or_fetch_many(column.unique, failed)
+    if failed:
+        logger.warning(
+            "Shard %s não finalizado: %s CEPs sem resposta da API.",
+            shard, len(failed),
+        )
+        return shard, len(lines), 0, len(failed), \
+            time.monotonic() - started_at
+
+    found = 0
+    path = part_path(output_dir, shard)
+    with open(path + ".tmp", "w", encoding="utf-8") as output:
+        for cep_input, cep in zip(lines, column.sanitized):
+            record = results.get(cep) if cep else None
+            if record:
+                try:
+                    output.write(cep_record_json(record))
+                    output.write("\n")
+                    found += 1
+                    continue
+                except Exception as e:
+                    logger.error(
+                        f"Erro ao validar dados do CEP {cep_input}: {e}"
+                    )
+                    status = STATUS_ERROR
+            else:
+                status = STATUS_NOT_FOUND if cep else STATUS_INVALID
+            output.write(json.dumps(
+                {"cep": cep_input, "erro": True, "status": status}
+            ))
+            output.write("\n")
+    os.replace(path + ".tmp", path)
+    return shard, len(lines), found, 0, time.monotonic() - started_at
+
+
+def iter_shards(path: str, shard_size: int) -> Iterator[List[str]]:
+    # Um CEP por linha; a numeração dos shards depende só da ordem das
+    # linhas e do tamanho do shard
+    with open_text(path) as source:
+        lines = (line.strip() for line in source if line.strip())
+        yield from chunked(lines, shard_size)
+
+
+def _check_manifest(input_path: str, output_dir: str, shard_size: int):
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {
+        "input": os.path.abspath(input_path),
+        "shard_size": shard_size,
+    }
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as source:
+            previous = json.load(source)
+        if previous != manifest:
+            raise ValueError(
+                f"{output_dir} contém uma execução com outros parâmetros "
+                f"({previous}); use outro diretório de saída."
+            )
+        return
+    with open(manifest_path, "w", encoding="utf-8") as target:
+        json.dump(manifest, target)
+
+
+def enrich(
+    input_path: str,
+    output_dir: str,
+    workers: Optional[int] = None,
+    shard_size: int = 10_000,
+    progress: Optional[TextIO] = sys.stderr,
+    progress_interval_seconds: float = 5.0,
+    executor: Optional[Executor] = None,
+) -> dict:
+    """Resolve um arquivo de CEPs (um por linha) em ``workers`` processos.
+
+    A entrada é dividida em shards de ``shard_size`` linhas, cada um gravado
+    em ``output_dir/part-<n>.jsonl``. Shards já gravados são pulados, de
+    modo que uma execução interrompida continua de onde parou sem consultar
+    de novo os CEPs resolvidos. Shards com CEPs sem resposta da API não são
+    gravados e são refeitos na execução seguinte.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    _check_manifest(input_path, output_dir, shard_size)
+
+    own_executor = executor is None
+    if own_executor:
+        # spawn: cada worker abre suas conexões, sem herdar sockets nem
+        # threads do processo pai
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        )
+
+    lines_done = found = shards_done = shards_skipped = 0
+    shards_failed = ceps_failed = 0
+    started_at = last_report = time.monotonic()
+    pending = set()
+
+    def collect(done) -> None:
+        nonlocal lines_done, found, shards_done, last_report
+        nonlocal shards_failed, ceps_failed
+        for future in done:
+            shard, count, shard_found, shard_failed, seconds = \
+                future.result()
+            if shard_failed:
+                shards_failed += 1
+                ceps_failed += shard_failed
+                continue
+            lines_done += count
+            found += shard_found
+            shards_done += 1
+            logger.info(
+                "Shard %s: %s CEPs em %.1fs.", shard, count, seconds
+            )
+        now = time.monotonic()
+        if progress and now - last_report >= progress_interval_seconds:
+            last_report = now
+            rate = lines_done / (now - started_at)
+            progress.write(
+                f"{lines_done} CEPs resolvidos em {shards_done} shards "
+                f"({rate:.0f} CEPs/s)\n"
+            )
+
+    try:
+        for shard, lines in enumerate(iter_shards(input_path, shard_size)):
+            if os.path.exists(part_path(output_dir, shard)):
+                shards_skipped += 1
+                continue
+            # Poucos shards em espera: a entrada é lida conforme o consumo
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(
+                executor.submit(process_shard, shard, lines, output_dir)
+            )
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    finally:
+        if own_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.monotonic() - started_at
+    summary = {
+        "ceps": lines_done,
+        "found": found,
+        "shards": shards_done,
+        "skipped_shards": shards_skipped,
+        "failed_shards": shards_failed,
+        "failed_ceps": ceps_failed,
+        "seconds": round(elapsed, 3),
+        "ceps_per_second": round(lines_done / elapsed) if elapsed else 0,
+    }
+    logger.info(f"Enriquecimento de {input_path} concluído: {summary}")
+    if progress:
+        progress.write(
+            f"Concluído: {lines_done} CEPs ({found} encontrados) em "
+            f"{shards_done} shards, {shards_skipped} já gravados, "
+            f"{summary['seconds']}s ({summary['ceps_per_second']} CEPs/s)\n"
+        )
+        if shards_failed:
+            progress.write(
+                f"{shards_failed} shards com {ceps_failed} CEPs sem resposta "
+                f"da API não foram gravados; execute novamente para "
+                f"refazê-los.\n"
+            )
+    return summary
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Resolve um arquivo de CEPs (um por linha, opcionalmente "
+                    ".gz) em vários processos, com retomada."
+    )
+    parser.add_argument("input", help="Arquivo com um CEP por linha.")
+    parser.add_argument(
+        "output_dir",
+        help="Diretório dos resultados (part-<n>.jsonl) e do checkpoint.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processos workers (padrão: número de CPUs).",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=10_000,
+        help="CEPs por shard de saída e checkpoint (padrão: 10000).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+    enrich(
+        args.input,
+        args.output_dir,
+        workers=args.workers,
+        shard_size=args.shard_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
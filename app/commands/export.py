@@ -0,0 +1,113 @@
+import argparse
+import logging
+import sys
+import time
+from typing import Callable, Iterator, List, Optional, TextIO
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session
+
+from app.config.logging_config import setup_logging
+from app.models.cep import CEP
+from app.utils.cep_dump import CEP_DUMP_FIELDS, CEPDumpWriter
+
+
+logger = logging.getLogger(__name__)
+
+_EXPORT_COLUMNS = [CEP.__table__.c[field] for field in CEP_DUMP_FIELDS]
+
+
+def iter_cep_pages(db: Session, page_size: int) -> Iterator[List[Row]]:
+    """Percorre a tabela ``CEP`` em ordem de CEP, uma página por consulta
+    (keyset: ``cep > último``), sem cursor aberto entre as páginas. As
+    linhas trazem os campos de ``CEP_DUMP_FIELDS``, nessa ordem."""
+    connection = db.connection()
+    after = None
+    while True:
+        query = select(*_EXPORT_COLUMNS).order_by(CEP.cep).limit(page_size)
+        if after is not None:
+            query = query.where(CEP.cep > after)
+        page = connection.execute(query).all()
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = page[-1].cep
+
+
+def export(
+    output: str,
+    page_size: int = 10_000,
+    progress: Optional[TextIO] = sys.stderr,
+    progress_interval_seconds: float = 5.0,
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> dict:
+    """Exporta a tabela ``CEP`` para Parquet, Arrow IPC ou JSON lines
+    (``.jsonl.gz``), conforme a extensão de ``output``.
+
+    A memória fica limitada a uma página. O arquivo gerado pode ser lido por
+    ``preload`` e ``build_index --dump``.
+    """
+    if session_factory is None:
+        # A réplica de leitura, quando configurada, poupa a base principal
+        from app.database import get_read_sessionmaker, get_sessionmaker
+        session_factory = get_read_sessionmaker() or get_sessionmaker()
+
+    writer = CEPDumpWriter(output)
+    exported = 0
+    started_at = last_report = time.monotonic()
+    try:
+        with session_factory() as db:
+            for page in iter_cep_pages(db, page_size):
+                writer.write(page)
+                exported += len(page)
+                now = time.monotonic()
+                if progress and \
+                        now - last_report >= progress_interval_seconds:
+                    last_report = now
+                    rate = exported / (now - started_at)
+                    progress.write(f"{exported} CEPs exportados "
+                                   f"({rate:.0f} linhas/s)\n")
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+
+    elapsed = time.monotonic() - started_at
+    summary = {
+        "exported": exported,
+        "format": writer.format,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(exported / elapsed) if elapsed else exported,
+    }
+    logger.info(f"Exportação para {output} concluída: {summary}")
+    if progress:
+        progress.write(
+            f"Concluído: {exported} CEPs exportados em {summary['seconds']}s "
+            f"({summary['rows_per_second']} linhas/s)\n"
+        )
+    return summary
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Exporta a tabela CEP para Parquet (.parquet), Arrow IPC "
+                    "(.arrow) ou JSON lines (.jsonl, .jsonl.gz)."
+    )
+    parser.add_argument("output", help="Arquivo a gravar.")
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=10_000,
+        help="CEPs lidos por consulta e gravados por lote (padrão: 10000).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+    export(args.output, page_size=args.page_size)
+
+
+if __name__ == "__main__":
+    main()
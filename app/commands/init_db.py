@@ -0,0 +1,63 @@
+import argparse
+import logging
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config.logging_config import setup_logging
+from app.database import Base, get_engine, missing_columns
+# Registra os modelos no metadata antes de criar as tabelas
+from app.models import cep, cep_not_found  # noqa: F401
+
+
+logger = logging.getLogger(__name__)
+
+
+def init_db(bind: Optional[Engine] = None) -> None:
+    """Cria as tabelas e índices ausentes e adiciona às tabelas existentes
+    as colunas novas dos modelos, sempre aceitando nulos (os dados
+    existentes não são alterados).
+
+    Roda uma vez por implantação, e não a cada inicialização da aplicação.
+    """
+    bind = bind or get_engine()
+    logger.info("Criando tabelas na base de dados...")
+    Base.metadata.create_all(bind=bind)
+    missing = missing_columns(bind)
+    preparer = bind.dialect.identifier_preparer
+    with bind.begin() as connection:
+        for table_name, names in missing.items():
+            table = Base.metadata.tables[table_name]
+            for name in names:
+                column = table.c[name]
+                if not column.nullable:
+                    raise RuntimeError(
+                        f"A coluna {table_name}.{name} não aceita nulos e "
+                        f"não pode ser adicionada automaticamente."
+                    )
+                logger.info(f"Adicionando a coluna {table_name}.{name}.")
+                # ADD sem COLUMN: aceito por SQL Server, PostgreSQL e SQLite
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD {preparer.format_column(column)} "
+                    f"{column.type.compile(dialect=bind.dialect)}"
+                ))
+    logger.info("Tabelas criadas com sucesso.")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Cria as tabelas da aplicação na base de dados e "
+                    "adiciona as colunas novas às tabelas existentes."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    parse_args(argv)
+    setup_logging()
+    init_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import logging
+import sys
+import time
+from typing import Callable, Optional, TextIO
+from sqlalchemy.orm import Session
+
+from app.config.logging_config import setup_logging
+from app.database import get_sessionmaker
+from app.repositories.cep_repository import CEPRepository, normalize_cep_rows
+from app.utils.cep_dump import chunked, iter_cep_records
+from app.utils.cep_normalizer import normalize_ceps
+
+
+logger = logging.getLogger(__name__)
+
+
+def preload(
+    path: str,
+    chunk_size: int = 5000,
+    update_existing: bool = False,
+    progress: Optional[TextIO] = sys.stderr,
+    progress_interval_seconds: float = 5.0,
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> dict:
+    """Carrega um arquivo de CEPs na tabela ``CEP`` em lotes.
+
+    A memória usada é limitada ao lote corrente; cada lote é um único
+    comando de upsert e um único commit. O resumo separa os registros
+    processados dos gravados (inseridos ou, com ``update_existing``,
+    atualizados); ``written`` é None se o driver não informar a contagem.
+    """
+    repository = CEPRepository()
+    session_factory = session_factory or get_sessionmaker()
+    processed = skipped = 0
+    written: Optional[int] = 0
+    started_at = last_report = time.monotonic()
+
+    with session_factory() as db:
+        for records in chunked(iter_cep_records(path), chunk_size):
+            ceps = normalize_ceps([record.get("cep") for record in records])
+            valid = []
+            for record, cep in zip(records, ceps.sanitized):
+                if cep is not None:
+                    record["cep"] = cep
+                    valid.append(record)
+            skipped += len(records) - len(valid)
+
+            rows = list(normalize_cep_rows(valid).values())
+            if rows:
+                try:
+                    affected = repository.execute_upsert(
+                        db, rows, update_existing
+                    )
+                    db.commit()
+                except Exception as e:
+                    logger.error(f"Erro ao carregar lote de {len(rows)} "
+                                 f"CEPs de {path}: {e}")
+                    db.rollback()
+                    raise
+                db.expunge_all()
+                if written is not None:
+                    written = (
+                        None if affected is None else written + affected
+                    )
+            processed += len(rows)
+
+            now = time.monotonic()
+            if progress and now - last_report >= progress_interval_seconds:
+                last_report = now
+                rate = processed / (now - started_at)
+                progress.write(f"{processed} CEPs processados "
+                               f"({rate:.0f} linhas/s)\n")
+
+    elapsed = time.monotonic() - started_at
+    summary = {
+        "processed": processed,
+        "written": written,
+        "skipped": skipped,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": (
+            round(processed / elapsed) if elapsed else processed
+        ),
+    }
+    logger.info(f"Carga de {path} concluída: {summary}")
+    if progress:
+        progress.write(
+            f"Concluído: {processed} CEPs processados, "
+            f"{'?' if written is None else written} gravados, "
+            f"{skipped} inválidos, "
+            f"{summary['seconds']}s ({summary['rows_per_second']} linhas/s)\n"
+        )
+    return summary
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Carrega um arquivo de CEPs (CSV ou JSON lines, "
+                    "opcionalmente .gz) na tabela CEP."
+    )
+    parser.add_argument("path", help="Arquivo com os registros de CEP.")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=5000,
+        help="Registros gravados por lote (padrão: 5000).",
+    )
+    parser.add_argument(
+        "--update-existing",
+        action="store_true",
+        help="Atualiza CEPs já existentes (padrão: mantém os existentes).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+    preload(
+        args.path,
+        chunk_size=args.chunk_size,
+        update_existing=args.update_existing,
+    )
+
+
+if __name__ == "__main__":
+    main()
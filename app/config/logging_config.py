@@ -1,14 +1,181 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
 import ecs_logging
 import os
+from typing import List, Optional
+
+from app.config.settings import settings
 
 
 LOG_FILE = os.getenv("LOG_FILE", "app.log")
 
+# Loggers do caminho de consulta, com um registro por CEP consultado
+HIGH_VOLUME_LOGGERS = (
+    "app.services.cep_service",
+    "app.services.api_service",
+)
+
+_STOP = object()
+
+
+class SamplingFilter(logging.Filter):
+    """Mantém só uma fração dos registros até ``max_level``.
+
+    Registros acima de ``max_level`` (por padrão, WARNING e acima) passam
+    sempre.
+    """
+
+    def __init__(self, rate: float, max_level: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > self.max_level or random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta registros com a fila cheia.
+
+    A formatação fica com a thread do listener; aqui só a mensagem é
+    resolvida, para que os argumentos não mudem antes da escrita.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener:
+    """Consome a fila de logs numa thread e grava os registros em lotes.
+
+    Cada lote é formatado e escrito com uma única chamada de escrita e um
+    único flush, limitado a ``batch_size`` registros ou ``flush_interval``
+    segundos a partir do primeiro registro do lote.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        handler: logging.StreamHandler,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ):
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self.handler.close()
+
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            if record is _STOP:
+                return
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+            self.write_batch(batch)
+            if stopping:
+                return
+
+    def write_batch(self, records: List[logging.LogRecord]) -> None:
+        lines = []
+        for record in records:
+            if self.handler.filter(record):
+                try:
+                    lines.append(self.handler.format(record))
+                except Exception:
+                    self.handler.handleError(record)
+        if not lines:
+            return
+        self.handler.acquire()
+        try:
+            stream = self.handler.stream
+            stream.write(self.handler.terminator.join(lines))
+            stream.write(self.handler.terminator)
+            self.handler.flush()
+        finally:
+            self.handler.release()
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    queued: Optional[bool] = None,
+    sample_rate: Optional[float] = None,
+) -> Optional[BatchingQueueListener]:
+    level = level or settings.LOG_LEVEL
+    queued = settings.LOG_QUEUE if queued is None else queued
+    sample_rate = (
+        settings.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    )
 
-def setup_logging():
     log_handler = logging.FileHandler(LOG_FILE)
     log_handler.setFormatter(ecs_logging.StdlibFormatter())
     logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
-    logger.addHandler(log_handler)
+    logger.setLevel(level)
+
+    if sample_rate < 1.0:
+        # Filtro no próprio logger: o registro descartado não chega a ser
+        # enfileirado nem formatado
+        for name in HIGH_VOLUME_LOGGERS:
+            logging.getLogger(name).addFilter(SamplingFilter(sample_rate))
+
+    if not queued:
+        logger.addHandler(log_handler)
+        return None
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_MAX_SIZE)
+    listener = BatchingQueueListener(
+        log_queue,
+        log_handler,
+        batch_size=settings.LOG_BATCH_SIZE,
+        flush_interval=settings.LOG_FLUSH_INTERVAL_SECONDS,
+    )
+    logger.addHandler(DroppingQueueHandler(log_queue))
+    listener.start()
+    # Grava os registros pendentes ao encerrar o processo
+    atexit.register(listener.stop)
+    return listener
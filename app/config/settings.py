@@ -1,11 +1,106 @@
+from functools import lru_cache
+from typing import Any, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     EXTERNAL_API_URL: str
+    # Driver assíncrono (ex.: mssql+aioodbc://...); usa DATABASE_URL se vazio
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Réplica somente leitura usada nas consultas de CEP
+    DATABASE_READ_URL: Optional[str] = None
+
+    # Pool de conexões do SQLAlchemy
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_FAST_EXECUTEMANY: bool = True
+    DB_STATEMENT_TIMEOUT_SECONDS: Optional[int] = None
+
+    # Busca concorrente na API externa
+    API_MAX_WORKERS: int = 8
+    API_POOL_CONNECTIONS: int = 4
+    API_POOL_MAXSIZE: int = 16
+
+    # Tempo limite, novas tentativas e circuit breaker da API externa
+    API_CONNECT_TIMEOUT_SECONDS: float = 3.05
+    API_READ_TIMEOUT_SECONDS: float = 5.0
+    API_RETRIES: int = 2
+    API_RETRY_BACKOFF_SECONDS: float = 0.1
+    API_RETRY_BACKOFF_MAX_SECONDS: float = 2.0
+    API_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    API_CIRCUIT_RECOVERY_SECONDS: float = 30.0
+
+    # Limite de requisições por segundo à API externa (0 desativa)
+    API_RATE_LIMIT_PER_SECOND: float = 0
+    API_RATE_LIMIT_BURST: int = 10
+
+    # Provedores externos, em ordem de preferência (viacep, brasilapi).
+    # Com API_HEDGE_DELAY_SECONDS > 0, o próximo provedor é consultado em
+    # paralelo quando o anterior demora mais que esse tempo
+    API_PROVIDERS: str = "viacep"
+    BRASILAPI_URL: str = "https://brasilapi.com.br/api/cep/v1"
+    API_HEDGE_DELAY_SECONDS: float = 0
+
+    # Cache em memória na frente do repositório de CEPs
+    CEP_CACHE_MAX_SIZE: int = 100_000
+    CEP_CACHE_TTL_SECONDS: float = 3600
+    CEP_CACHE_NEGATIVE_TTL_SECONDS: float = 300
+    # Guarda também o JSON dos CEPs em cache comprimido (gzip e, com o
+    # pacote brotli, br), servido conforme o Accept-Encoding
+    CEP_JSON_COMPRESS: bool = False
+
+    # Gravação dos CEPs novos fora da requisição, em lotes por tamanho ou
+    # tempo; com a fila em CEP_WRITE_BEHIND_MAX_PENDING, grava na hora
+    CEP_WRITE_BEHIND: bool = False
+    CEP_WRITE_BEHIND_BATCH_SIZE: int = 500
+    CEP_WRITE_BEHIND_FLUSH_INTERVAL_SECONDS: float = 1.0
+    CEP_WRITE_BEHIND_MAX_PENDING: int = 50_000
+
+    # Validade dos CEPs da base local (0 desativa): após o prazo curto o CEP
+    # é servido e revalidado na API em segundo plano; após o longo, a
+    # revalidação é feita na consulta
+    CEP_SOFT_TTL_SECONDS: float = 0
+    CEP_HARD_TTL_SECONDS: float = 0
+    CEP_REFRESH_MAX_WORKERS: int = 2
+
+    # Validade dos CEPs que a API informou como inexistentes
+    NOT_FOUND_TTL_SECONDS: int = 7 * 24 * 3600
+    NOT_FOUND_CACHE_MAX_SIZE: int = 100_000
+
+    # Logging: nível, fila com escrita em lotes fora da thread da requisição
+    # e amostragem dos logs de alto volume das consultas (1.0 = todos)
+    LOG_LEVEL: str = "DEBUG"
+    LOG_QUEUE: bool = False
+    LOG_QUEUE_MAX_SIZE: int = 10_000
+    LOG_BATCH_SIZE: int = 256
+    LOG_FLUSH_INTERVAL_SECONDS: float = 0.5
+    LOG_SAMPLE_RATE: float = 1.0
+
+    # Métricas por etapa (Prometheus) e spans OpenTelemetry opcionais
+    METRICS_ENABLED: bool = False
+    TRACING_ENABLED: bool = False
 
     model_config = SettingsConfigDict(env_file=".env")
 
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return Settings()
+
+
+class LazySettings:
+    """Adia a leitura do ``.env`` e das variáveis de ambiente até o primeiro
+    acesso a uma configuração, e não mais ao importar o módulo."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(get_settings(), name, value)
+
+
+settings = LazySettings()
@@ -1,17 +1,176 @@
-from sqlalchemy import create_engine
+from functools import lru_cache
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.config.settings import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def engine_options(url: str) -> dict:
+    parsed_url = make_url(url)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    # SQLite usa pools próprios, sem tamanho configurável
+    if parsed_url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        )
+    if parsed_url.drivername == "mssql+pyodbc":
+        options["fast_executemany"] = settings.DB_FAST_EXECUTEMANY
+    timeout = settings.DB_STATEMENT_TIMEOUT_SECONDS
+    if timeout and parsed_url.get_backend_name() == "postgresql":
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={timeout * 1000}"
+        }
+    return options
+
+
+def build_engine(url: str) -> Engine:
+    new_engine = create_engine(url, **engine_options(url))
+    timeout = settings.DB_STATEMENT_TIMEOUT_SECONDS
+    if timeout and new_engine.dialect.driver == "pyodbc":
+        @event.listens_for(new_engine, "connect")
+        def set_query_timeout(dbapi_connection, connection_record):
+            # Tempo máximo de cada comando na conexão pyodbc
+            dbapi_connection.timeout = timeout
+    guard_schema(new_engine)
+    return new_engine
+
+
 Base = declarative_base()
 
 
+def missing_columns(bind: Engine) -> Dict[str, List[str]]:
+    """Colunas dos modelos ausentes das tabelas já existentes na base."""
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    missing: Dict[str, List[str]] = {}
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {
+            column["name"] for column in inspector.get_columns(table.name)
+        }
+        names = [
+            column.name for column in table.columns
+            if column.name not in existing
+        ]
+        if names:
+            missing[table.name] = names
+    return missing
+
+
+def _schema_error(missing: Dict[str, List[str]]) -> RuntimeError:
+    return RuntimeError(
+        f"Colunas ausentes na base de dados: {missing}. Execute "
+        f"python -m app.commands.init_db para adicioná-las."
+    )
+
+
+def guard_schema(engine: Engine) -> None:
+    """Troca o erro de um comando numa base anterior a colunas novas dos
+    modelos por um que indica ``init_db``: sem isso, toda leitura pelo ORM
+    falharia e cada CEP iria à API.
+
+    O catálogo só é lido depois do primeiro comando que falhar, e não a
+    cada inicialização: comandos curtos não pagam essa verificação.
+    """
+    state = {"checked": False, "missing": {}}
+
+    @event.listens_for(engine, "handle_error")
+    def check_schema_on_error(context):
+        # Coluna ou tabela desconhecida; falhas de conexão ficam de fora
+        if context.is_disconnect or not isinstance(
+            context.sqlalchemy_exception, (OperationalError, ProgrammingError)
+        ):
+            return
+        if not state["checked"]:
+            # Marcado antes da leitura: um erro nela não a repete
+            state["checked"] = True
+            try:
+                state["missing"] = missing_columns(engine)
+            except Exception:
+                state["checked"] = False
+                return
+        if state["missing"]:
+            raise _schema_error(state["missing"]) \
+                from context.original_exception
+
+
+# O engine (e o driver do banco) só é criado no primeiro uso, para que
+# comandos curtos e importações não paguem esse custo na inicialização
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    return build_engine(settings.DATABASE_URL)
+
+
+@lru_cache(maxsize=None)
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+@lru_cache(maxsize=None)
+def get_read_engine() -> Optional[Engine]:
+    if not settings.DATABASE_READ_URL:
+        return None
+    return build_engine(settings.DATABASE_READ_URL)
+
+
+@lru_cache(maxsize=None)
+def get_read_sessionmaker() -> Optional[sessionmaker]:
+    read_engine = get_read_engine()
+    if read_engine is None:
+        return None
+    return sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "SessionLocal": get_sessionmaker,
+    "read_engine": get_read_engine,
+    "ReadSessionLocal": get_read_sessionmaker,
+}
+
+
+def __getattr__(name: str):
+    # Mantém ``from app.database import engine, SessionLocal`` funcionando
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+@lru_cache(maxsize=None)
+def get_async_engine():
+    # Importação tardia: o driver assíncrono só é exigido por quem o usa
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = settings.ASYNC_DATABASE_URL or settings.DATABASE_URL
+    return create_async_engine(url, **engine_options(url))
+
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker():
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    # expire_on_commit=False evita I/O implícito ao ler atributos após commit
+    return async_sessionmaker(
+        bind=get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -0,0 +1,26 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+from app.interfaces.cep_api_service_interface import FetchStatus
+
+
+class IAsyncCEPAPIService(ABC):
+
+    @abstractmethod
+    async def fetch_cep_data(self, cep: str) -> Optional[dict]:
+        pass
+
+    async def fetch_cep(self, cep: str) -> Tuple[FetchStatus, Optional[dict]]:
+        data = await self.fetch_cep_data(cep)
+        return (FetchStatus.FOUND if data else FetchStatus.ERROR), data
+
+    async def fetch_ceps(
+        self, ceps: Sequence[str]
+    ) -> List[Tuple[FetchStatus, Optional[dict]]]:
+        return list(await asyncio.gather(*map(self.fetch_cep, ceps)))
+
+    async def fetch_many_cep_data(
+        self, ceps: Sequence[str]
+    ) -> List[Optional[dict]]:
+        return [data for _, data in await self.fetch_ceps(ceps)]
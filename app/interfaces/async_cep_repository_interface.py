@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.cep import CEP
+
+
+class IAsyncCEPRepository(ABC):
+
+    @abstractmethod
+    async def get_cep(self, db: AsyncSession, cep: str) -> Optional[CEP]:
+        pass
+
+    @abstractmethod
+    async def get_ceps(
+        self, db: AsyncSession, ceps: Sequence[str]
+    ) -> List[CEP]:
+        pass
+
+    @abstractmethod
+    async def create_cep(
+        self, db: AsyncSession, cep_data: dict
+    ) -> Optional[CEP]:
+        pass
+
+    @abstractmethod
+    async def create_ceps(
+        self, db: AsyncSession, ceps_data: List[dict]
+    ) -> List[CEP]:
+        pass
+
+    @abstractmethod
+    async def upsert_ceps(
+        self,
+        db: AsyncSession,
+        ceps_data: List[dict],
+        update_existing: bool = True,
+    ) -> List[CEP]:
+        pass
+
+    @abstractmethod
+    async def find_by_range(
+        self,
+        db: AsyncSession,
+        start: str,
+        end: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        pass
+
+    async def find_by_prefix(
+        self,
+        db: AsyncSession,
+        prefix: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return await self.find_by_range(
+            db, prefix.ljust(8, "0"), prefix.ljust(8, "9"), after, limit
+        )
+
+    @abstractmethod
+    async def find_by_locality(
+        self,
+        db: AsyncSession,
+        uf: str,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        pass
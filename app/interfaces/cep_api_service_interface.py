@@ -1,5 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from enum import Enum
+from typing import List, Optional, Sequence, Tuple
+
+
+class FetchStatus(Enum):
+    FOUND = "found"
+    # A API respondeu que o CEP não existe
+    NOT_FOUND = "not_found"
+    # Falha de comunicação ou resposta inesperada; pode ser temporária
+    ERROR = "error"
 
 
 class ICEPAPIService(ABC):
@@ -7,3 +16,17 @@ class ICEPAPIService(ABC):
     @abstractmethod
     def fetch_cep_data(self, cep: str) -> Optional[dict]:
         pass
+
+    def fetch_many_cep_data(self, ceps: Sequence[str]) -> List[Optional[dict]]:
+        return [self.fetch_cep_data(cep) for cep in ceps]
+
+    def fetch_cep(self, cep: str) -> Tuple[FetchStatus, Optional[dict]]:
+        # Sem distinção entre "inexistente" e "falha", nenhum resultado vazio
+        # é tratado como definitivo
+        data = self.fetch_cep_data(cep)
+        return (FetchStatus.FOUND if data else FetchStatus.ERROR), data
+
+    def fetch_ceps(
+        self, ceps: Sequence[str]
+    ) -> List[Tuple[FetchStatus, Optional[dict]]]:
+        return [self.fetch_cep(cep) for cep in ceps]
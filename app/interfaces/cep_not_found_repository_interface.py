@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Sequence, Set
+from sqlalchemy.orm import Session
+
+
+class ICEPNotFoundRepository(ABC):
+
+    @abstractmethod
+    def is_not_found(self, db: Session, cep: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_not_found(self, db: Session, ceps: Sequence[str]) -> Set[str]:
+        pass
+
+    @abstractmethod
+    def mark_not_found(self, db: Session, ceps: Sequence[str]) -> None:
+        pass
@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+from typing import FrozenSet, Optional
+
+
+class ICEPProvider(ABC):
+    """Provedor externo de CEPs: monta a URL e traduz a resposta.
+
+    ``parse`` devolve os campos no formato do modelo ``CEP`` (o mesmo da
+    ViaCEP) ou ``None`` quando o provedor informa que o CEP não existe.
+    """
+
+    name: str
+    # Códigos HTTP com que o provedor indica CEP inexistente
+    not_found_status_codes: FrozenSet[int] = frozenset()
+
+    @abstractmethod
+    def url(self, cep: str) -> str:
+        pass
+
+    @abstractmethod
+    def parse(self, payload: dict) -> Optional[dict]:
+        pass
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Sequence
 from sqlalchemy.orm import Session
 from app.models.cep import CEP
+from app.models.cep_record import CEPRecord, record_from_model
 
 
 class ICEPRepository(ABC):
@@ -10,6 +11,73 @@ class ICEPRepository(ABC):
     def get_cep(self, db: Session, cep: str) -> Optional[CEP]:
         pass
 
+    @abstractmethod
+    def get_ceps(self, db: Session, ceps: Sequence[str]) -> List[CEP]:
+        pass
+
+    # Leitura sem entidades do ORM. As implementações podem selecionar as
+    # colunas diretamente; o padrão converte o resultado de get_cep(s)
+
+    def get_cep_record(self, db: Session, cep: str) -> Optional[CEPRecord]:
+        db_cep = self.get_cep(db, cep)
+        return record_from_model(db_cep) if db_cep is not None else None
+
+    def get_cep_records(
+        self, db: Session, ceps: Sequence[str]
+    ) -> List[CEPRecord]:
+        return [
+            record_from_model(db_cep) for db_cep in self.get_ceps(db, ceps)
+        ]
+
     @abstractmethod
     def create_cep(self, db: Session, cep_data: dict) -> Optional[CEP]:
         pass
+
+    @abstractmethod
+    def create_ceps(self, db: Session, ceps_data: List[dict]) -> List[CEP]:
+        pass
+
+    @abstractmethod
+    def upsert_ceps(
+        self,
+        db: Session,
+        ceps_data: List[dict],
+        update_existing: bool = True,
+    ) -> List[CEP]:
+        pass
+
+    @abstractmethod
+    def find_by_range(
+        self,
+        db: Session,
+        start: str,
+        end: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        """CEPs entre ``start`` e ``end`` (inclusive), em ordem, a partir do
+        primeiro maior que ``after`` (paginação por chave)."""
+
+    def find_by_prefix(
+        self,
+        db: Session,
+        prefix: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        # Os dígitos iniciais codificam região, sub-região e setor: um
+        # prefixo é a faixa de CEPs que o completa com 0s até 9s
+        return self.find_by_range(
+            db, prefix.ljust(8, "0"), prefix.ljust(8, "9"), after, limit
+        )
+
+    @abstractmethod
+    def find_by_locality(
+        self,
+        db: Session,
+        uf: str,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        pass
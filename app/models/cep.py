@@ -1,12 +1,16 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String
 from app.database import Base
 
 
 class CEP(Base):
     __tablename__ = "CEP"
+    # Listagem por UF/localidade paginada por CEP (keyset)
+    __table_args__ = (
+        Index("ix_CEP_uf_localidade_cep", "uf", "localidade", "cep"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    cep = Column(String(9), index=True)
+    cep = Column(String(9), unique=True, index=True)
     logradouro = Column(String(255))
     complemento = Column(String(100))
     unidade = Column(String(100))
@@ -19,3 +23,6 @@ class CEP(Base):
     gia = Column(String(7))
     ddd = Column(String(2))
     siafi = Column(String(7))
+    # Primeira gravação e última confirmação dos dados na API externa (UTC)
+    fetched_at = Column(DateTime)
+    verified_at = Column(DateTime)
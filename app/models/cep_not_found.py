@@ -0,0 +1,10 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from app.database import Base
+
+
+class CEPNotFound(Base):
+    __tablename__ = "CEP_NOT_FOUND"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cep = Column(String(9), unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,34 @@
+import datetime
+from typing import NamedTuple, Optional
+from app.models.cep import CEP
+
+
+class CEPRecord(NamedTuple):
+    """Linha da tabela ``CEP`` somente leitura, sem instrumentação do ORM.
+
+    Os campos seguem a ordem das colunas de ``CEP`` (exceto ``id``), para
+    que as linhas de um ``select`` dessas colunas virem registros com
+    ``CEPRecord._make(row)``.
+    """
+
+    cep: str
+    logradouro: Optional[str] = None
+    complemento: Optional[str] = None
+    unidade: Optional[str] = None
+    bairro: Optional[str] = None
+    localidade: Optional[str] = None
+    uf: Optional[str] = None
+    estado: Optional[str] = None
+    regiao: Optional[str] = None
+    ibge: Optional[str] = None
+    gia: Optional[str] = None
+    ddd: Optional[str] = None
+    siafi: Optional[str] = None
+    fetched_at: Optional[datetime.datetime] = None
+    verified_at: Optional[datetime.datetime] = None
+
+
+def record_from_model(db_cep: CEP) -> CEPRecord:
+    return CEPRecord._make(
+        getattr(db_cep, field) for field in CEPRecord._fields
+    )
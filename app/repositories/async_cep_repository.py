@@ -0,0 +1,135 @@
+import logging
+from typing import List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.interfaces.async_cep_repository_interface import IAsyncCEPRepository
+from app.models.cep import CEP
+from app.repositories.cep_repository import (
+    IN_CLAUSE_CHUNK_SIZE,
+    CEPRepository,
+    normalize_cep_rows,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCEPRepository(IAsyncCEPRepository):
+
+    def __init__(self):
+        # Os comandos de upsert por dialeto são os mesmos do repositório
+        # síncrono, executados via AsyncSession.run_sync
+        self._sync_repository = CEPRepository()
+
+    async def get_cep(self, db: AsyncSession, cep: str) -> Optional[CEP]:
+        try:
+            result = await db.execute(
+                select(CEP).where(CEP.cep == cep).limit(1)
+            )
+            return result.scalars().first()
+        except Exception as e:
+            logger.error(f"Erro ao recuperar o CEP {cep} da base: {e}")
+            return None
+
+    async def get_ceps(
+        self, db: AsyncSession, ceps: Sequence[str]
+    ) -> List[CEP]:
+        found = []
+        try:
+            for start in range(0, len(ceps), IN_CLAUSE_CHUNK_SIZE):
+                chunk = ceps[start:start + IN_CLAUSE_CHUNK_SIZE]
+                result = await db.execute(
+                    select(CEP).where(CEP.cep.in_(chunk))
+                )
+                found.extend(result.scalars().all())
+            return found
+        except Exception as e:
+            logger.error(f"Erro ao recuperar {len(ceps)} CEPs da base: {e}")
+            return found
+
+    async def find_by_range(
+        self,
+        db: AsyncSession,
+        start: str,
+        end: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return await self._query_page(
+            db, [CEP.cep >= start, CEP.cep <= end], after, limit
+        )
+
+    async def find_by_locality(
+        self,
+        db: AsyncSession,
+        uf: str,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        criteria = [CEP.uf == uf]
+        if localidade is not None:
+            criteria.append(CEP.localidade == localidade)
+        return await self._query_page(db, criteria, after, limit)
+
+    @staticmethod
+    async def _query_page(
+        db: AsyncSession, criteria: list, after: Optional[str], limit: int
+    ) -> List[CEP]:
+        if after is not None:
+            criteria = [*criteria, CEP.cep > after]
+        try:
+            result = await db.execute(
+                select(CEP).where(*criteria).order_by(CEP.cep).limit(limit)
+            )
+            return list(result.scalars().all())
+        except Exception as e:
+            logger.error(f"Erro ao listar CEPs da base: {e}")
+            raise
+
+    async def create_cep(
+        self, db: AsyncSession, cep_data: dict
+    ) -> Optional[CEP]:
+        try:
+            db_cep = CEP(**normalize_cep_rows([cep_data])[cep_data["cep"]])
+            db.add(db_cep)
+            await db.commit()
+            await db.refresh(db_cep)
+            return db_cep
+        except IntegrityError:
+            await db.rollback()
+            logger.info(f"CEP {cep_data.get('cep')} já existente na base.")
+            return await self.get_cep(db, cep_data.get("cep"))
+        except Exception as e:
+            logger.error(f"Erro ao gravar CEP na base {cep_data}: {e}")
+            await db.rollback()
+            return None
+
+    async def create_ceps(
+        self, db: AsyncSession, ceps_data: List[dict]
+    ) -> List[CEP]:
+        return await self.upsert_ceps(db, ceps_data, update_existing=False)
+
+    async def upsert_ceps(
+        self,
+        db: AsyncSession,
+        ceps_data: List[dict],
+        update_existing: bool = True,
+    ) -> List[CEP]:
+        rows = normalize_cep_rows(ceps_data)
+        if not rows:
+            return []
+        try:
+            await db.run_sync(
+                self._sync_repository.execute_upsert,
+                list(rows.values()),
+                update_existing,
+            )
+            await db.commit()
+            return await self.get_ceps(db, list(rows))
+        except Exception as e:
+            logger.error(f"Erro ao gravar {len(rows)} CEPs na base: {e}")
+            await db.rollback()
+            return []
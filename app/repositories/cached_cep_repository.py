@@ -0,0 +1,220 @@
+import logging
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.interfaces.cep_repository_interface import ICEPRepository
+from app.models.cep import CEP
+from app.models.cep_record import CEPRecord, record_from_model
+from app.utils.cep_json_cache import CEPJSONCache
+from app.utils.lru_cache import MISSING, LRUCache
+from app.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Marcador das entradas negativas (CEP ausente da base)
+NOT_FOUND = object()
+
+
+def snapshot_cep(db_cep: CEP) -> CEP:
+    # Cópia desvinculada da sessão: o objeto original seria expirado no
+    # próximo commit da sessão que o carregou
+    return CEP(**{
+        column.name: getattr(db_cep, column.name)
+        for column in CEP.__table__.columns
+    })
+
+
+class CachedCEPRepository(ICEPRepository):
+    """Decorator de ``ICEPRepository`` com cache LRU/TTL em processo.
+
+    CEPs ausentes da base (por exemplo, os que a API respondeu com ``erro``
+    e por isso nunca foram gravados) ficam em cache negativo por
+    ``negative_ttl_seconds``, evitando novas consultas à base.
+
+    Com ``json_cache``, o JSON de cada CEP guardado é serializado na mesma
+    hora, para ser servido sem nova serialização.
+    """
+
+    def __init__(
+        self,
+        repository: ICEPRepository,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        negative_ttl_seconds: Optional[float] = None,
+        cache: Optional[LRUCache] = None,
+        json_cache: Optional[CEPJSONCache] = None,
+    ):
+        self.repository = repository
+        self.json_cache = json_cache
+        if cache is None:
+            cache = LRUCache(
+                max_size=max_size or settings.CEP_CACHE_MAX_SIZE,
+                ttl_seconds=(
+                    settings.CEP_CACHE_TTL_SECONDS
+                    if ttl_seconds is None else ttl_seconds
+                ),
+            )
+        self.cache = cache
+        self.negative_ttl_seconds = (
+            settings.CEP_CACHE_NEGATIVE_TTL_SECONDS
+            if negative_ttl_seconds is None else negative_ttl_seconds
+        )
+        self.negative_hits = 0
+
+    def get_cep(self, db: Session, cep: str) -> Optional[CEP]:
+        cached = self.cache.get(cep)
+        if cached is NOT_FOUND:
+            self.negative_hits += 1
+            metrics.inc("cache_negative_hit")
+            return None
+        if cached is not MISSING:
+            metrics.inc("cache_hit")
+            return cached
+
+        metrics.inc("cache_miss")
+        db_cep = self.repository.get_cep(db, cep)
+        self._store(cep, db_cep)
+        return db_cep
+
+    def get_ceps(self, db: Session, ceps: Sequence[str]) -> List[CEP]:
+        found: List[CEP] = []
+        misses: List[str] = []
+        for cep in ceps:
+            cached = self.cache.get(cep)
+            if cached is NOT_FOUND:
+                self.negative_hits += 1
+            elif cached is MISSING:
+                misses.append(cep)
+            else:
+                found.append(cached)
+        metrics.inc("cache_hit", len(found))
+        metrics.inc("cache_miss", len(misses))
+        metrics.inc("cache_negative_hit", len(ceps) - len(found) - len(misses))
+
+        if misses:
+            loaded: Dict[str, CEP] = {
+                db_cep.cep: db_cep
+                for db_cep in self.repository.get_ceps(db, misses)
+            }
+            for cep in misses:
+                self._store(cep, loaded.get(cep))
+            found.extend(loaded.values())
+        return found
+
+    def get_cep_record(self, db: Session, cep: str) -> Optional[CEPRecord]:
+        records = self.get_cep_records(db, [cep])
+        return records[0] if records else None
+
+    def get_cep_records(
+        self, db: Session, ceps: Sequence[str]
+    ) -> List[CEPRecord]:
+        found: List[CEPRecord] = []
+        misses: List[str] = []
+        for cep in ceps:
+            cached = self.cache.get(cep)
+            if cached is NOT_FOUND:
+                self.negative_hits += 1
+            elif cached is MISSING:
+                misses.append(cep)
+            else:
+                found.append(record_from_model(cached))
+        metrics.inc("cache_hit", len(found))
+        metrics.inc("cache_miss", len(misses))
+        metrics.inc("cache_negative_hit", len(ceps) - len(found) - len(misses))
+
+        if misses:
+            loaded = {
+                record.cep: record
+                for record in self.repository.get_cep_records(db, misses)
+            }
+            for cep in misses:
+                record = loaded.get(cep)
+                self._store(
+                    cep, CEP(**record._asdict()) if record else None
+                )
+            found.extend(loaded.values())
+        return found
+
+    def create_cep(self, db: Session, cep_data: dict) -> Optional[CEP]:
+        db_cep = self.repository.create_cep(db, cep_data)
+        if db_cep:
+            self._store(db_cep.cep, db_cep)
+        return db_cep
+
+    def create_ceps(self, db: Session, ceps_data: List[dict]) -> List[CEP]:
+        created = self.repository.create_ceps(db, ceps_data)
+        for db_cep in created:
+            self._store(db_cep.cep, db_cep)
+        return created
+
+    def upsert_ceps(
+        self,
+        db: Session,
+        ceps_data: List[dict],
+        update_existing: bool = True,
+    ) -> List[CEP]:
+        upserted = self.repository.upsert_ceps(db, ceps_data, update_existing)
+        for db_cep in upserted:
+            self._store(db_cep.cep, db_cep)
+        return upserted
+
+    # Varreduras não passam pelo cache, que só guarda consultas exatas
+
+    def find_by_range(
+        self,
+        db: Session,
+        start: str,
+        end: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return self.repository.find_by_range(db, start, end, after, limit)
+
+    def find_by_prefix(
+        self,
+        db: Session,
+        prefix: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return self.repository.find_by_prefix(db, prefix, after, limit)
+
+    def find_by_locality(
+        self,
+        db: Session,
+        uf: str,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return self.repository.find_by_locality(
+            db, uf, localidade, after, limit
+        )
+
+    def invalidate(self, cep: str) -> None:
+        self.cache.delete(cep)
+        if self.json_cache is not None:
+            self.json_cache.invalidate(cep)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.cache.stats(), "negative_hits": self.negative_hits}
+
+    def _store(self, cep: str, db_cep: Optional[CEP]) -> None:
+        if db_cep is None:
+            self.cache.set(cep, NOT_FOUND, self.negative_ttl_seconds)
+        else:
+            self.cache.set(cep, snapshot_cep(db_cep))
+        if self.json_cache is not None:
+            self._store_json(cep, db_cep)
+
+    def _store_json(self, cep: str, db_cep: Optional[CEP]) -> None:
+        if db_cep is None:
+            self.json_cache.invalidate(cep)
+            return
+        try:
+            self.json_cache.put(record_from_model(db_cep))
+        except Exception as e:
+            # Dados fora do schema: a consulta reporta o erro ao serializar
+            logger.warning(f"JSON do CEP {cep} não gerado: {e}")
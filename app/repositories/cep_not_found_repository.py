@@ -0,0 +1,94 @@
+import datetime
+import logging
+from typing import Optional, Sequence, Set
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.interfaces.cep_not_found_repository_interface import (
+    ICEPNotFoundRepository,
+)
+from app.models.cep_not_found import CEPNotFound
+from app.repositories.cep_repository import IN_CLAUSE_CHUNK_SIZE
+from app.utils.helpers import get_current_datetime
+from app.utils.lru_cache import LRUCache
+
+
+logger = logging.getLogger(__name__)
+
+
+class CEPNotFoundRepository(ICEPNotFoundRepository):
+    """Registro persistente dos CEPs que a API informou como inexistentes.
+
+    As entradas válidas já consultadas ficam também em memória até a sua
+    expiração, de forma que consultas repetidas não acessam a base.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = None,
+        cache_max_size: Optional[int] = None,
+    ):
+        self.ttl_seconds = (
+            settings.NOT_FOUND_TTL_SECONDS
+            if ttl_seconds is None else ttl_seconds
+        )
+        self.cache = LRUCache(
+            max_size=cache_max_size or settings.NOT_FOUND_CACHE_MAX_SIZE,
+            ttl_seconds=self.ttl_seconds,
+        )
+
+    def is_not_found(self, db: Session, cep: str) -> bool:
+        return cep in self.get_not_found(db, [cep])
+
+    def get_not_found(self, db: Session, ceps: Sequence[str]) -> Set[str]:
+        not_found = {cep for cep in ceps if self.cache.get(cep, False)}
+        pending = [cep for cep in ceps if cep not in not_found]
+        if not pending:
+            return not_found
+
+        now = get_current_datetime()
+        try:
+            for start in range(0, len(pending), IN_CLAUSE_CHUNK_SIZE):
+                chunk = pending[start:start + IN_CLAUSE_CHUNK_SIZE]
+                rows = db.query(CEPNotFound.cep, CEPNotFound.expires_at) \
+                    .filter(CEPNotFound.cep.in_(chunk)) \
+                    .filter(CEPNotFound.expires_at > now) \
+                    .all()
+                for cep, expires_at in rows:
+                    not_found.add(cep)
+                    self.cache.set(
+                        cep, True, (expires_at - now).total_seconds()
+                    )
+        except Exception as e:
+            logger.error(f"Erro ao consultar CEPs inexistentes na base: {e}")
+        return not_found
+
+    def mark_not_found(self, db: Session, ceps: Sequence[str]) -> None:
+        if not ceps:
+            return
+        expires_at = get_current_datetime() + datetime.timedelta(
+            seconds=self.ttl_seconds
+        )
+        try:
+            existing = {}
+            for start in range(0, len(ceps), IN_CLAUSE_CHUNK_SIZE):
+                chunk = ceps[start:start + IN_CLAUSE_CHUNK_SIZE]
+                existing.update(
+                    (row.cep, row)
+                    for row in db.query(CEPNotFound)
+                    .filter(CEPNotFound.cep.in_(chunk))
+                    .all()
+                )
+            for cep in dict.fromkeys(ceps):
+                if cep in existing:
+                    existing[cep].expires_at = expires_at
+                else:
+                    db.add(CEPNotFound(cep=cep, expires_at=expires_at))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Erro ao registrar CEPs inexistentes {ceps}: {e}")
+            db.rollback()
+            return
+
+        for cep in ceps:
+            self.cache.set(cep, True)
@@ -1,31 +1,327 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
 from app.models.cep import CEP
+from app.models.cep_record import CEPRecord
+from app.utils.helpers import get_current_datetime
 import logging
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
 from app.interfaces.cep_repository_interface import ICEPRepository
 
 
 logger = logging.getLogger(__name__)
 
+# O SQL Server aceita no máximo 2100 parâmetros por comando
+IN_CLAUSE_CHUNK_SIZE = 1000
+UPSERT_MAX_PARAMETERS = 900
+
+# Datas de gravação e de confirmação na API, preenchidas na escrita
+FRESHNESS_COLUMNS = ["fetched_at", "verified_at"]
+# Colunas de endereço
+CEP_DATA_COLUMNS = [
+    column.name for column in CEP.__table__.columns
+    if column.name != "id" and column.name not in FRESHNESS_COLUMNS
+]
+UPDATABLE_COLUMNS = [name for name in CEP_DATA_COLUMNS if name != "cep"]
+# Colunas gravadas por linha; ``fetched_at`` não muda em atualizações.
+# Nas atualizações, valores nulos (campos que o provedor não informa)
+# mantêm o valor já gravado
+CEP_ROW_COLUMNS = CEP_DATA_COLUMNS + FRESHNESS_COLUMNS
+UPSERT_UPDATE_COLUMNS = UPDATABLE_COLUMNS + ["verified_at"]
+# Colunas do select de leitura rápida, na ordem dos campos de CEPRecord
+RECORD_COLUMNS = [CEP.__table__.c[name] for name in CEPRecord._fields]
+# Montado uma vez: o SQL compilado fica no cache de comandos do engine
+_SELECT_RECORD = (
+    select(*RECORD_COLUMNS).where(CEP.cep == bindparam("cep")).limit(1)
+)
+
+
+def _mssql_merge_statement(update_existing: bool):
+    columns = ", ".join(CEP_ROW_COLUMNS)
+    source = ", ".join(f":{name} AS {name}" for name in CEP_ROW_COLUMNS)
+    values = ", ".join(f"source.{name}" for name in CEP_ROW_COLUMNS)
+    when_matched = ""
+    if update_existing:
+        assignments = ", ".join(
+            f"{name} = COALESCE(source.{name}, target.{name})"
+            for name in UPSERT_UPDATE_COLUMNS
+        )
+        when_matched = f"WHEN MATCHED THEN UPDATE SET {assignments} "
+    return text(
+        f"MERGE INTO {CEP.__tablename__} WITH (HOLDLOCK) AS target "
+        f"USING (SELECT {source}) AS source "
+        f"ON target.cep = source.cep "
+        f"{when_matched}"
+        f"WHEN NOT MATCHED THEN INSERT ({columns}) VALUES ({values});"
+    )
+
+
+def normalize_cep_rows(ceps_data: List[dict]) -> Dict[str, dict]:
+    # Uma linha por CEP, com todas as colunas, como exigem os comandos
+    # INSERT/MERGE em lote. Linhas sem datas são consideradas confirmadas
+    # agora
+    now = get_current_datetime()
+    rows: Dict[str, dict] = {}
+    for cep_data in ceps_data:
+        cep_data.pop("id", None)
+        row = {name: cep_data.get(name) for name in CEP_DATA_COLUMNS}
+        row["verified_at"] = cep_data.get("verified_at") or now
+        row["fetched_at"] = cep_data.get("fetched_at") or row["verified_at"]
+        rows[cep_data["cep"]] = row
+    return rows
+
 
 class CEPRepository(ICEPRepository):
 
+    def __init__(self, read_sessionmaker: Optional[sessionmaker] = None):
+        # Consultas vão à réplica de leitura, quando configurada; CEPs
+        # ausentes nela são conferidos na base principal, pois podem ter
+        # sido gravados e ainda não replicados
+        self.read_sessionmaker = read_sessionmaker
+
     def get_cep(self, db: Session, cep: str) -> Optional[CEP]:
+        if self.read_sessionmaker is not None:
+            replica_cep = self._from_replica(self._query_cep, cep)
+            if replica_cep is not None:
+                return replica_cep
+        return self._query_cep(db, cep)
+
+    def get_ceps(self, db: Session, ceps: Sequence[str]) -> List[CEP]:
+        if self.read_sessionmaker is None:
+            return self._query_ceps(db, ceps)
+
+        found = self._from_replica(self._query_ceps, ceps) or []
+        if len(found) < len(ceps):
+            replicated = {db_cep.cep for db_cep in found}
+            found.extend(self._query_ceps(
+                db, [cep for cep in ceps if cep not in replicated]
+            ))
+        return found
+
+    def get_cep_record(self, db: Session, cep: str) -> Optional[CEPRecord]:
+        # Select só das colunas: sem identity map, instrumentação ou
+        # rastreamento de alterações na sessão
+        if self.read_sessionmaker is not None:
+            record = self._from_replica(self._select_record, cep)
+            if record is not None:
+                return record
+        return self._select_record(db, cep)
+
+    def get_cep_records(
+        self, db: Session, ceps: Sequence[str]
+    ) -> List[CEPRecord]:
+        if self.read_sessionmaker is None:
+            return self._select_records(db, ceps)
+
+        found = self._from_replica(self._select_records, ceps) or []
+        if len(found) < len(ceps):
+            replicated = {record.cep for record in found}
+            found.extend(self._select_records(
+                db, [cep for cep in ceps if cep not in replicated]
+            ))
+        return found
+
+    def _from_replica(self, query, ceps):
+        # Falhas da réplica caem na base principal; as da principal são
+        # propagadas, para que um CEP não seja tomado por ausente numa queda
+        try:
+            with self.read_sessionmaker() as read_db:
+                return query(read_db, ceps)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _select_record(db: Session, cep: str) -> Optional[CEPRecord]:
+        try:
+            row = db.execute(_SELECT_RECORD, {"cep": cep}).first()
+        except Exception as e:
+            logger.error(f"Erro ao recuperar o CEP {cep} da base: {e}")
+            raise
+        return CEPRecord._make(row) if row is not None else None
+
+    @staticmethod
+    def _select_records(db: Session, ceps: Sequence[str]) -> List[CEPRecord]:
+        found: List[CEPRecord] = []
+        try:
+            for start in range(0, len(ceps), IN_CLAUSE_CHUNK_SIZE):
+                chunk = ceps[start:start + IN_CLAUSE_CHUNK_SIZE]
+                rows = db.execute(
+                    select(*RECORD_COLUMNS).where(CEP.cep.in_(chunk))
+                )
+                found.extend(map(CEPRecord._make, rows))
+        except Exception as e:
+            logger.error(f"Erro ao recuperar {len(ceps)} CEPs da base: {e}")
+            raise
+        return found
+
+    @staticmethod
+    def _query_cep(db: Session, cep: str) -> Optional[CEP]:
         try:
             return db.query(CEP).filter(CEP.cep == cep).first()
         except Exception as e:
             logger.error(f"Erro ao recuperar o CEP {cep} da base: {e}")
-            return None
+            raise
+
+    @staticmethod
+    def _query_ceps(db: Session, ceps: Sequence[str]) -> List[CEP]:
+        found = []
+        try:
+            for start in range(0, len(ceps), IN_CLAUSE_CHUNK_SIZE):
+                chunk = ceps[start:start + IN_CLAUSE_CHUNK_SIZE]
+                found.extend(db.query(CEP).filter(CEP.cep.in_(chunk)).all())
+        except Exception as e:
+            logger.error(f"Erro ao recuperar {len(ceps)} CEPs da base: {e}")
+            raise
+        return found
+
+    def find_by_range(
+        self,
+        db: Session,
+        start: str,
+        end: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return self._query_page(
+            db, [CEP.cep >= start, CEP.cep <= end], after, limit
+        )
+
+    def find_by_locality(
+        self,
+        db: Session,
+        uf: str,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        # Coberta pelo índice (uf, localidade, cep)
+        criteria = [CEP.uf == uf]
+        if localidade is not None:
+            criteria.append(CEP.localidade == localidade)
+        return self._query_page(db, criteria, after, limit)
+
+    def _query_page(
+        self, db: Session, criteria: list, after: Optional[str], limit: int
+    ) -> List[CEP]:
+        # Paginação por chave: cada página continua do último CEP da
+        # anterior, sem OFFSET, com custo constante ao longo da varredura.
+        # Varreduras vão à réplica, quando houver, sem conferir a principal
+        if after is not None:
+            criteria = [*criteria, CEP.cep > after]
+        try:
+            if self.read_sessionmaker is not None:
+                with self.read_sessionmaker() as read_db:
+                    return self._select_page(read_db, criteria, limit)
+            return self._select_page(db, criteria, limit)
+        except Exception as e:
+            # Propagado: uma página vazia encerraria a varredura como se
+            # não houvesse mais CEPs
+            logger.error(f"Erro ao listar CEPs da base: {e}")
+            raise
+
+    @staticmethod
+    def _select_page(db: Session, criteria: list, limit: int) -> List[CEP]:
+        return (
+            db.query(CEP).filter(*criteria).order_by(CEP.cep).limit(limit)
+            .all()
+        )
 
     def create_cep(self, db: Session, cep_data: dict) -> Optional[CEP]:
         try:
-            cep_data.pop("id", None)
-            db_cep = CEP(**cep_data)
+            db_cep = CEP(**normalize_cep_rows([cep_data])[cep_data["cep"]])
             db.add(db_cep)
             db.commit()
             db.refresh(db_cep)
             return db_cep
+        except IntegrityError:
+            # Outro processo gravou o mesmo CEP primeiro
+            db.rollback()
+            logger.info(f"CEP {cep_data.get('cep')} já existente na base.")
+            return self._query_cep(db, cep_data.get("cep"))
         except Exception as e:
             logger.error(f"Erro ao gravar CEP na base {cep_data}: {e}")
             db.rollback()
             return None
+
+    def create_ceps(self, db: Session, ceps_data: List[dict]) -> List[CEP]:
+        return self.upsert_ceps(db, ceps_data, update_existing=False)
+
+    def upsert_ceps(
+        self,
+        db: Session,
+        ceps_data: List[dict],
+        update_existing: bool = True,
+    ) -> List[CEP]:
+        rows = normalize_cep_rows(ceps_data)
+        if not rows:
+            return []
+        try:
+            self.execute_upsert(db, list(rows.values()), update_existing)
+            db.commit()
+            # Uma única consulta recarrega os registros gravados, em vez de
+            # um refresh por linha
+            return self._query_ceps(db, list(rows))
+        except Exception as e:
+            logger.error(f"Erro ao gravar {len(rows)} CEPs na base: {e}")
+            db.rollback()
+            return []
+
+    def execute_upsert(
+        self,
+        db: Session,
+        rows: List[dict],
+        update_existing: bool = True,
+    ) -> Optional[int]:
+        """Executa o upsert sem commit; ``rows`` já normalizadas.
+
+        Retorna as linhas inseridas ou atualizadas, ou None quando o driver
+        não informa a contagem (``executemany`` no SQL Server).
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "mssql":
+            result = db.execute(_mssql_merge_statement(update_existing), rows)
+            return result.rowcount if result.rowcount >= 0 else None
+        if dialect in ("sqlite", "postgresql"):
+            insert = (sqlite if dialect == "sqlite" else postgresql).insert
+            chunk_size = max(1, UPSERT_MAX_PARAMETERS // len(CEP_ROW_COLUMNS))
+            written = 0
+            for start in range(0, len(rows), chunk_size):
+                stmt = insert(CEP).values(rows[start:start + chunk_size])
+                if update_existing:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[CEP.cep],
+                        set_={
+                            name: func.coalesce(
+                                stmt.excluded[name], CEP.__table__.c[name]
+                            )
+                            for name in UPSERT_UPDATE_COLUMNS
+                        },
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(
+                        index_elements=[CEP.cep]
+                    )
+                written += db.execute(stmt).rowcount
+            return written
+        return self._upsert_rows_orm(db, rows, update_existing)
+
+    def _upsert_rows_orm(
+        self, db: Session, rows: List[dict], update_existing: bool
+    ) -> int:
+        existing = {
+            db_cep.cep: db_cep
+            for db_cep in self._query_ceps(db, [row["cep"] for row in rows])
+        }
+        written = 0
+        for row in rows:
+            db_cep = existing.get(row["cep"])
+            if db_cep is None:
+                db.add(CEP(**row))
+                written += 1
+            elif update_existing:
+                for name in UPSERT_UPDATE_COLUMNS:
+                    if row[name] is not None:
+                        setattr(db_cep, name, row[name])
+                written += 1
+        return written
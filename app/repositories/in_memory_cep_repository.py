@@ -0,0 +1,438 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union,
+)
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.interfaces.cep_repository_interface import ICEPRepository
+from app.models.cep import CEP
+from app.models.cep_record import CEPRecord
+from app.repositories.cep_repository import (
+    CEP_DATA_COLUMNS,
+    UPDATABLE_COLUMNS,
+    normalize_cep_rows,
+)
+
+
+SNAPSHOT_MAGIC = b"CEPIDX01"
+_PREAMBLE = struct.Struct("<8sI")
+# Todas as seções do snapshot começam em múltiplos de 8 bytes
+_ALIGNMENT = 8
+# CEPs (8 dígitos) e códigos de dicionário cabem em inteiros de 32 bits
+_INT_TYPECODE = "I"
+MAX_CEP_KEY = 99_999_999
+
+Codes = Union[array, memoryview]
+
+
+def cep_key(cep: str) -> Optional[int]:
+    digits = cep.replace("-", "")
+    if len(digits) != 8 or not digits.isdigit():
+        return None
+    return int(digits)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class StringTable:
+    """Strings de um dicionário em um único bloco UTF-8 com offsets.
+
+    É o formato das colunas no snapshot: lido direto do arquivo mapeado em
+    memória, decodificando só as strings acessadas.
+    """
+
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets: Codes, blob: Union[bytes, memoryview]):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_strings(cls, values: Sequence[str]) -> "StringTable":
+        offsets = array(_INT_TYPECODE, [0])
+        encoded = []
+        for value in values:
+            data = value.encode("utf-8")
+            encoded.append(data)
+            offsets.append(offsets[-1] + len(data))
+        return cls(offsets, b"".join(encoded))
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return str(self.blob[start:end], "utf-8")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+class InMemoryCEPRepository(ICEPRepository):
+    """Índice de CEPs em memória, sem base de dados.
+
+    Os CEPs ficam ordenados em um array de inteiros (busca binária) e cada
+    coluna de texto é codificada por dicionário: um array de códigos por CEP
+    mais a lista de valores distintos (código 0 é ``None``). O índice pode
+    ser gravado em um snapshot e reaberto com ``mmap``, sem copiar os dados.
+
+    CEPs gravados depois da construção ficam em um dicionário à parte, que
+    prevalece sobre o índice e é incorporado ao próximo snapshot. Suas
+    chaves ficam também numa lista ordenada, substituída (e nunca alterada)
+    a cada gravação: as leituras usam a lista vigente sem lock e sem
+    reordenar. O parâmetro ``db`` dos métodos é ignorado.
+    """
+
+    def __init__(
+        self,
+        keys: Optional[Codes] = None,
+        codes: Optional[Dict[str, Codes]] = None,
+        values: Optional[Dict[str, Sequence[str]]] = None,
+    ):
+        self._keys = keys if keys is not None else array(_INT_TYPECODE)
+        self._codes = codes or {
+            name: array(_INT_TYPECODE) for name in UPDATABLE_COLUMNS
+        }
+        self._values = values or {name: [] for name in UPDATABLE_COLUMNS}
+        self._overlay: Dict[int, dict] = {}
+        self._overlay_keys: List[int] = []
+        # CEPs do dicionário à parte que não existem no índice
+        self._added = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "InMemoryCEPRepository":
+        """Constrói o índice em fluxo; em CEPs repetidos vale o último."""
+        keys = array(_INT_TYPECODE)
+        codes = {name: array(_INT_TYPECODE) for name in UPDATABLE_COLUMNS}
+        values: Dict[str, List[str]] = {
+            name: [] for name in UPDATABLE_COLUMNS
+        }
+        encoders: Dict[str, Dict[str, int]] = {
+            name: {} for name in UPDATABLE_COLUMNS
+        }
+        for record in records:
+            key = cep_key(record.get("cep") or "")
+            if key is None:
+                continue
+            keys.append(key)
+            for name in UPDATABLE_COLUMNS:
+                codes[name].append(
+                    _encode(record.get(name), encoders[name], values[name])
+                )
+
+        # Ordenação estável: entre CEPs iguais, o último lido fica por último
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        positions = [
+            position for i, position in enumerate(order)
+            if i + 1 == len(order) or keys[order[i + 1]] != keys[position]
+        ]
+        return cls(
+            keys=array(_INT_TYPECODE, (keys[p] for p in positions)),
+            codes={
+                name: array(_INT_TYPECODE, (column[p] for p in positions))
+                for name, column in codes.items()
+            },
+            values=values,
+        )
+
+    @classmethod
+    def from_database(
+        cls, db: Session, chunk_size: int = 10_000
+    ) -> "InMemoryCEPRepository":
+        columns = [CEP.__table__.c[name] for name in CEP_DATA_COLUMNS]
+        result = db.execute(
+            select(*columns).execution_options(yield_per=chunk_size)
+        )
+        return cls.from_records(row._asdict() for row in result)
+
+    @classmethod
+    def load(cls, path: str) -> "InMemoryCEPRepository":
+        """Abre com ``mmap`` (somente leitura) um snapshot de ``save``.
+
+        Só o cabeçalho é lido; as páginas dos arrays e strings são
+        carregadas pelo sistema operacional conforme as consultas.
+        """
+        with open(path, "rb") as source:
+            mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_size = _PREAMBLE.unpack_from(mapped, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Arquivo não é um snapshot de CEPs: {path}")
+        header = json.loads(
+            mapped[_PREAMBLE.size:_PREAMBLE.size + header_size]
+        )
+        if header["byteorder"] != sys.byteorder or \
+                header["itemsize"] != array(_INT_TYPECODE).itemsize:
+            raise ValueError(
+                f"Snapshot gravado em plataforma incompatível: {path}"
+            )
+
+        data = memoryview(mapped)[_aligned(_PREAMBLE.size + header_size):]
+
+        def section(name: str) -> memoryview:
+            start, size = header["sections"][name]
+            return data[start:start + size]
+
+        return cls(
+            keys=section("keys").cast(_INT_TYPECODE),
+            codes={
+                name: section(f"{name}.codes").cast(_INT_TYPECODE)
+                for name in header["columns"]
+            },
+            values={
+                name: StringTable(
+                    section(f"{name}.offsets").cast(_INT_TYPECODE),
+                    section(f"{name}.blob"),
+                )
+                for name in header["columns"]
+            },
+        )
+
+    def save(self, path: str) -> None:
+        index = self
+        if self._overlay:
+            index = InMemoryCEPRepository.from_records(self.iter_rows())
+
+        sections = [("keys", index._keys)]
+        for name in UPDATABLE_COLUMNS:
+            values = index._values[name]
+            if not isinstance(values, StringTable):
+                values = StringTable.from_strings(values)
+            sections += [
+                (f"{name}.codes", index._codes[name]),
+                (f"{name}.offsets", values.offsets),
+                (f"{name}.blob", values.blob),
+            ]
+
+        layout = {}
+        offset = 0
+        for name, section in sections:
+            size = memoryview(section).nbytes
+            layout[name] = [offset, size]
+            offset = _aligned(offset + size)
+        header = json.dumps({
+            "version": 1,
+            "byteorder": sys.byteorder,
+            "itemsize": array(_INT_TYPECODE).itemsize,
+            "count": len(index._keys),
+            "columns": UPDATABLE_COLUMNS,
+            "sections": layout,
+        }).encode("utf-8")
+
+        # Grava em arquivo temporário e troca: leitores com o snapshot
+        # antigo mapeado não veem um arquivo pela metade
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as target:
+            target.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, len(header)))
+            target.write(header)
+            target.write(
+                b"\0" * (_aligned(target.tell()) - target.tell())
+            )
+            data_start = target.tell()
+            for name, section in sections:
+                target.write(
+                    b"\0" * (data_start + layout[name][0] - target.tell())
+                )
+                target.write(section)
+        os.replace(temporary_path, path)
+
+    def iter_rows(self) -> Iterator[dict]:
+        """Todos os CEPs em ordem, já com os gravados após a construção."""
+        return self._iter_merged(-1, MAX_CEP_KEY)
+
+    def _iter_merged(
+        self,
+        after_key: int,
+        end_key: int,
+        position_matches: Callable[[int], bool] = lambda position: True,
+        row_matches: Callable[[dict], bool] = lambda row: True,
+    ) -> Iterator[dict]:
+        # Intercala, em ordem de CEP, o índice e os CEPs gravados depois;
+        # os filtros de posição comparam só códigos, sem decodificar textos
+        overlay, overlay_keys = self._overlay, self._overlay_keys
+        position = bisect_right(self._keys, after_key)
+        end_position = bisect_right(self._keys, end_key)
+        for index in range(
+            bisect_right(overlay_keys, after_key),
+            bisect_right(overlay_keys, end_key),
+        ):
+            key = overlay_keys[index]
+            row = overlay[key]
+            while position < end_position and self._keys[position] < key:
+                if position_matches(position):
+                    yield self._decode(position)
+                position += 1
+            if position < end_position and self._keys[position] == key:
+                position += 1
+            if row_matches(row):
+                yield row
+        for position in range(position, end_position):
+            if position_matches(position):
+                yield self._decode(position)
+
+    def __len__(self) -> int:
+        return len(self._keys) + self._added
+
+    def get_cep(self, db: Session, cep: str) -> Optional[CEP]:
+        row = self._find(cep)
+        return CEP(**row) if row is not None else None
+
+    def get_ceps(self, db: Session, ceps: Sequence[str]) -> List[CEP]:
+        rows = (self._find(cep) for cep in dict.fromkeys(ceps))
+        return [CEP(**row) for row in rows if row is not None]
+
+    def get_cep_record(self, db: Session, cep: str) -> Optional[CEPRecord]:
+        row = self._find(cep)
+        return CEPRecord(**row) if row is not None else None
+
+    def get_cep_records(
+        self, db: Session, ceps: Sequence[str]
+    ) -> List[CEPRecord]:
+        rows = (self._find(cep) for cep in dict.fromkeys(ceps))
+        return [CEPRecord(**row) for row in rows if row is not None]
+
+    def create_cep(self, db: Session, cep_data: dict) -> Optional[CEP]:
+        created = self.upsert_ceps(db, [cep_data], update_existing=False)
+        return created[0] if created else None
+
+    def create_ceps(self, db: Session, ceps_data: List[dict]) -> List[CEP]:
+        return self.upsert_ceps(db, ceps_data, update_existing=False)
+
+    def upsert_ceps(
+        self,
+        db: Session,
+        ceps_data: List[dict],
+        update_existing: bool = True,
+    ) -> List[CEP]:
+        rows = normalize_cep_rows(ceps_data)
+        with self._lock:
+            overlay_keys = None
+            for cep, row in rows.items():
+                key = cep_key(cep)
+                if key is None:
+                    continue
+                existing = self._find(cep)
+                if existing is not None and not update_existing:
+                    continue
+                if key not in self._overlay:
+                    # Cópia da lista vigente, publicada ao fim do lote
+                    if overlay_keys is None:
+                        overlay_keys = list(self._overlay_keys)
+                    insort(overlay_keys, key)
+                if existing is None:
+                    # O índice não guarda as datas de gravação
+                    self._overlay[key] = {
+                        **{name: row[name] for name in UPDATABLE_COLUMNS},
+                        "cep": f"{key:08d}",
+                    }
+                    self._added += 1
+                else:
+                    # Campos nulos mantêm o valor já conhecido
+                    self._overlay[key] = {
+                        **existing,
+                        **{
+                            name: row[name] for name in UPDATABLE_COLUMNS
+                            if row[name] is not None
+                        },
+                    }
+            if overlay_keys is not None:
+                self._overlay_keys = overlay_keys
+        return self.get_ceps(db, list(rows))
+
+    def find_by_range(
+        self,
+        db: Session,
+        start: str,
+        end: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        start_key, end_key = cep_key(start), cep_key(end)
+        if start_key is None or end_key is None:
+            return []
+        after_key = max(start_key - 1, cep_key(after or "") or -1)
+        rows = self._iter_merged(after_key, end_key)
+        return [CEP(**row) for row in islice(rows, limit)]
+
+    def find_by_locality(
+        self,
+        db: Session,
+        uf: str,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        expected = {"uf": uf}
+        if localidade is not None:
+            expected["localidade"] = localidade
+        # Código de cada valor no dicionário da coluna; um valor ausente do
+        # dicionário não aparece em nenhum CEP do índice
+        expected_codes = {
+            name: self._code_of(name, value)
+            for name, value in expected.items()
+        }
+        absent = None in expected_codes.values()
+
+        def position_matches(position: int) -> bool:
+            return not absent and all(
+                self._codes[name][position] == code
+                for name, code in expected_codes.items()
+            )
+
+        def row_matches(row: dict) -> bool:
+            return all(row[name] == value for name, value in expected.items())
+
+        rows = self._iter_merged(
+            cep_key(after or "") or -1, MAX_CEP_KEY,
+            position_matches, row_matches,
+        )
+        return [CEP(**row) for row in islice(rows, limit)]
+
+    def _code_of(self, name: str, value: str) -> Optional[int]:
+        for code, candidate in enumerate(self._values[name], start=1):
+            if candidate == value:
+                return code
+        return None
+
+    def _find(self, cep: str) -> Optional[dict]:
+        key = cep_key(cep)
+        if key is None:
+            return None
+        row = self._overlay.get(key)
+        if row is not None:
+            return row
+        position = self._position(key)
+        return self._decode(position) if position is not None else None
+
+    def _position(self, key: int) -> Optional[int]:
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            return position
+        return None
+
+    def _decode(self, position: int) -> dict:
+        row = {"cep": f"{self._keys[position]:08d}"}
+        for name in UPDATABLE_COLUMNS:
+            code = self._codes[name][position]
+            row[name] = self._values[name][code - 1] if code else None
+        return row
+
+
+def _encode(
+    value: Optional[str], encoder: Dict[str, int], values: List[str]
+) -> int:
+    if value is None:
+        return 0
+    code = encoder.get(value)
+    if code is None:
+        values.append(value)
+        code = encoder[value] = len(values)
+    return code
@@ -0,0 +1,258 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.interfaces.cep_repository_interface import ICEPRepository
+from app.models.cep import CEP
+from app.models.cep_record import CEPRecord
+from app.repositories.cep_repository import CEPRepository, normalize_cep_rows
+from app.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindCEPRepository(ICEPRepository):
+    """Decorator de ``CEPRepository`` que grava os CEPs novos fora do
+    caminho da requisição.
+
+    ``create_cep``/``create_ceps`` só enfileiram as linhas e devolvem
+    entidades transitórias com os dados recebidos; uma thread grava a fila
+    em lotes (sem sobrescrever CEPs já existentes) ao atingir
+    ``batch_size`` linhas ou a cada ``flush_interval`` segundos. Linhas
+    pendentes continuam visíveis nas consultas exatas, mas não nas
+    varreduras por faixa ou localidade até serem gravadas.
+    """
+
+    def __init__(
+        self,
+        repository: CEPRepository,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.repository = repository
+        if session_factory is None:
+            from app.database import get_sessionmaker
+            session_factory = get_sessionmaker()
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.CEP_WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = (
+            settings.CEP_WRITE_BEHIND_FLUSH_INTERVAL_SECONDS
+            if flush_interval is None else flush_interval
+        )
+        self.max_pending = max_pending or settings.CEP_WRITE_BEHIND_MAX_PENDING
+        # Linhas aguardando gravação e as do lote sendo gravado, por CEP
+        self._pending: Dict[str, dict] = {}
+        self._flushing: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.flushed = 0
+        self.failed_flushes = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="cep-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Para a thread e grava o que restou na fila."""
+        if self._thread is not None:
+            with self._wakeup:
+                self._stopping = True
+                self._wakeup.notify()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._pending:
+            logger.error(
+                "%s CEPs não foram gravados na base.", len(self._pending)
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending) + len(self._flushing)
+
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                self._wakeup.wait_for(
+                    lambda: self._stopping
+                    or len(self._pending) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                if self._stopping:
+                    return
+            self.flush()
+
+    def flush(self) -> int:
+        """Grava as linhas pendentes em lotes; retorna quantas gravou."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        return written
+                    ceps = list(self._pending)[:self.batch_size]
+                    self._flushing = {
+                        cep: self._pending.pop(cep) for cep in ceps
+                    }
+                rows = list(self._flushing.values())
+                if not self._write(rows):
+                    with self._lock:
+                        # Linhas enfileiradas durante a gravação prevalecem
+                        self._pending = {**self._flushing, **self._pending}
+                        self._flushing = {}
+                    return written
+                with self._lock:
+                    self._flushing = {}
+                written += len(rows)
+                self.flushed += len(rows)
+                metrics.inc("write_behind_flushed", len(rows))
+
+    def _write(self, rows: List[dict]) -> bool:
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            self.repository.execute_upsert(db, rows, update_existing=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self.failed_flushes += 1
+            metrics.inc("write_behind_failed")
+            logger.error(f"Erro ao gravar {len(rows)} CEPs na base: {e}")
+            return False
+        finally:
+            db.close()
+        logger.debug(
+            "%s CEPs gravados em %.1f ms.",
+            len(rows),
+            (time.perf_counter() - started) * 1000,
+        )
+        return True
+
+    def _enqueue(self, rows: Dict[str, dict]) -> None:
+        with self._wakeup:
+            self._pending.update(rows)
+            full = len(self._pending) >= self.batch_size
+            if full:
+                self._wakeup.notify()
+            overflow = len(self._pending) >= self.max_pending
+        if overflow or (full and self._thread is None):
+            # Sem a thread, ou com a fila cheia, a gravação é feita aqui
+            metrics.inc("write_behind_overflow")
+            self.flush()
+
+    def _pending_row(self, cep: str) -> Optional[dict]:
+        with self._lock:
+            row = self._pending.get(cep)
+            return row if row is not None else self._flushing.get(cep)
+
+    def get_cep(self, db: Session, cep: str) -> Optional[CEP]:
+        row = self._pending_row(cep)
+        if row is not None:
+            return CEP(**row)
+        return self.repository.get_cep(db, cep)
+
+    def get_ceps(self, db: Session, ceps: Sequence[str]) -> List[CEP]:
+        found: List[CEP] = []
+        misses: List[str] = []
+        for cep in ceps:
+            row = self._pending_row(cep)
+            if row is None:
+                misses.append(cep)
+            else:
+                found.append(CEP(**row))
+        if misses:
+            found.extend(self.repository.get_ceps(db, misses))
+        return found
+
+    def get_cep_records(
+        self, db: Session, ceps: Sequence[str]
+    ) -> List[CEPRecord]:
+        found: List[CEPRecord] = []
+        misses: List[str] = []
+        for cep in ceps:
+            row = self._pending_row(cep)
+            if row is None:
+                misses.append(cep)
+            else:
+                found.append(CEPRecord(**row))
+        if misses:
+            found.extend(self.repository.get_cep_records(db, misses))
+        return found
+
+    def get_cep_record(self, db: Session, cep: str) -> Optional[CEPRecord]:
+        row = self._pending_row(cep)
+        if row is not None:
+            return CEPRecord(**row)
+        return self.repository.get_cep_record(db, cep)
+
+    def create_cep(self, db: Session, cep_data: dict) -> Optional[CEP]:
+        created = self.create_ceps(db, [cep_data])
+        return created[0] if created else None
+
+    def create_ceps(self, db: Session, ceps_data: List[dict]) -> List[CEP]:
+        rows = normalize_cep_rows(ceps_data)
+        if not rows:
+            return []
+        self._enqueue(rows)
+        return [CEP(**row) for row in rows.values()]
+
+    def upsert_ceps(
+        self,
+        db: Session,
+        ceps_data: List[dict],
+        update_existing: bool = True,
+    ) -> List[CEP]:
+        if not update_existing:
+            return self.create_ceps(db, ceps_data)
+        # Atualizações são gravadas na hora; a versão pendente, mais antiga,
+        # deixa de ser consultada
+        upserted = self.repository.upsert_ceps(db, ceps_data, update_existing)
+        with self._lock:
+            for db_cep in upserted:
+                self._pending.pop(db_cep.cep, None)
+        return upserted
+
+    def find_by_range(
+        self,
+        db: Session,
+        start: str,
+        end: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return self.repository.find_by_range(db, start, end, after, limit)
+
+    def find_by_prefix(
+        self,
+        db: Session,
+        prefix: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return self.repository.find_by_prefix(db, prefix, after, limit)
+
+    def find_by_locality(
+        self,
+        db: Session,
+        uf: str,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        return self.repository.find_by_locality(
+            db, uf, localidade, after, limit
+        )
@@ -1,19 +1,72 @@
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+from app.models.cep_record import CEPRecord
+
+try:
+    from orjson import dumps as _dumps_json
+except ImportError:
+    # Encoder do pydantic-core: a mesma saída compacta, em UTF-8
+    from pydantic_core import to_json as _dumps_json
 
 
 class CEPSchema(BaseModel):
+    # Os campos opcionais não vêm de todo provedor (a BrasilAPI só informa
+    # endereço, cidade e UF) e são nulos nos CEPs obtidos sem eles
     cep: str
     logradouro: str
-    complemento: str
-    unidade: str
+    complemento: Optional[str] = None
+    unidade: Optional[str] = None
     bairro: str
     localidade: str
     uf: str
-    estado: str
-    regiao: str
-    ibge: str
-    gia: str
-    ddd: int
-    siafi: int
+    estado: Optional[str] = None
+    regiao: Optional[str] = None
+    ibge: Optional[str] = None
+    gia: Optional[str] = None
+    ddd: Optional[int] = None
+    siafi: Optional[int] = None
 
     model_config = {"from_attributes": True}
+
+
+# Campos numéricos no schema, gravados como texto na base
+_INTEGER_FIELDS = ("ddd", "siafi")
+# Campos do registro expostos no JSON (sem as datas de gravação)
+_JSON_FIELDS = tuple(CEPSchema.model_fields)
+
+
+def cep_record_json_bytes(record: CEPRecord) -> bytes:
+    """JSON de ``CEPSchema`` para um registro, sem instanciar o modelo.
+
+    Registros completos e já no formato do schema (DDD e SIAFI numéricos)
+    são serializados direto; os demais passam pela validação completa, que
+    normaliza os valores ou levanta ``ValidationError``.
+    """
+    data = {field: getattr(record, field) for field in _JSON_FIELDS}
+    if None in data.values() or not all(
+        data[field].isdigit() for field in _INTEGER_FIELDS
+    ):
+        return CEPSchema.model_validate(data).model_dump_json().encode()
+    for field in _INTEGER_FIELDS:
+        data[field] = int(data[field])
+    return _dumps_json(data)
+
+
+def cep_record_json(record: CEPRecord) -> str:
+    return cep_record_json_bytes(record).decode("utf-8")
+
+
+class CEPBatchRequest(BaseModel):
+    ceps: List[str] = Field(min_length=1, max_length=1000)
+
+
+class CEPBatchResponse(BaseModel):
+    # Chave: CEP sanitizado; valor nulo para CEPs não encontrados
+    results: Dict[str, Optional[CEPSchema]]
+
+
+class CEPPage(BaseModel):
+    results: List[CEPSchema]
+    # Valor de ``after`` para a próxima página; nulo na última
+    next_after: Optional[str] = None
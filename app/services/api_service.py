@@ -1,31 +1,197 @@
 import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from app.config.settings import settings
 import logging
-from typing import Optional
-from app.interfaces.cep_api_service_interface import ICEPAPIService
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from app.interfaces.cep_api_service_interface import (
+    FetchStatus,
+    ICEPAPIService,
+)
+from app.interfaces.cep_provider_interface import ICEPProvider
+from app.services.providers.viacep_provider import ViaCEPProvider
+from app.utils.backoff import RETRYABLE_STATUS_CODES, backoff_delay
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.metrics import metrics
+from app.utils.rate_limiter import TokenBucket
+from app.utils.single_flight import SingleFlight
 
 
 logger = logging.getLogger(__name__)
 
 
+def create_http_session(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+) -> requests.Session:
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or settings.API_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or settings.API_POOL_MAXSIZE,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def create_circuit_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=settings.API_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout=settings.API_CIRCUIT_RECOVERY_SECONDS,
+    )
+
+
+def create_rate_limiter() -> Optional[TokenBucket]:
+    if settings.API_RATE_LIMIT_PER_SECOND <= 0:
+        return None
+    return TokenBucket(
+        rate=settings.API_RATE_LIMIT_PER_SECOND,
+        burst=settings.API_RATE_LIMIT_BURST,
+    )
+
+
 class APIService(ICEPAPIService):
 
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        max_workers: Optional[int] = None,
+        timeout: Optional[Tuple[float, float]] = None,
+        retries: Optional[int] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        provider: Optional[ICEPProvider] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        # A sessão é compartilhada entre as threads para reaproveitar as
+        # conexões (TCP + TLS) do pool do HTTPAdapter
+        self.session = session or create_http_session()
+        self.max_workers = max_workers or settings.API_MAX_WORKERS
+        self.timeout = timeout or (
+            settings.API_CONNECT_TIMEOUT_SECONDS,
+            settings.API_READ_TIMEOUT_SECONDS,
+        )
+        self.retries = settings.API_RETRIES if retries is None else retries
+        self.circuit_breaker = circuit_breaker or create_circuit_breaker()
+        self.provider = provider or ViaCEPProvider()
+        self.rate_limiter = rate_limiter or create_rate_limiter()
+        self._sleep = sleep
+        # Consultas simultâneas ao mesmo CEP viram uma única requisição
+        self._in_flight = SingleFlight()
+
+    @property
+    def circuit_breakers(self) -> Dict[str, CircuitBreaker]:
+        return {self.provider.name: self.circuit_breaker}
+
     def fetch_cep_data(self, cep: str) -> Optional[dict]:
+        return self.fetch_cep(cep)[1]
+
+    def fetch_cep(self, cep: str) -> Tuple[FetchStatus, Optional[dict]]:
+        result, shared = self._in_flight.do(
+            cep, lambda: self._fetch_guarded(cep)
+        )
+        if shared:
+            metrics.inc("api_coalesced")
+        return result
+
+    def _fetch_guarded(
+        self, cep: str
+    ) -> Tuple[FetchStatus, Optional[dict]]:
+        # Com o circuito aberto a API externa não é consultada: a falha é
+        # imediata em vez de esperar o tempo limite de cada requisição
+        if not self.circuit_breaker.allow_request():
+            logger.warning(
+                "Circuit breaker aberto; CEP %s não consultado na API.", cep
+            )
+            metrics.inc("circuit_open")
+            return FetchStatus.ERROR, None
+        try:
+            status, data, upstream_failed = self._fetch(cep)
+        except BaseException:
+            # Sem resultado (ex.: KeyboardInterrupt): a vaga de teste do
+            # circuito meio aberto não pode ficar presa
+            self.circuit_breaker.release_trial()
+            raise
+        if upstream_failed:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return status, data
+
+    def _fetch(self, cep: str) -> Tuple[FetchStatus, Optional[dict], bool]:
+        url = self.provider.url(cep)
         try:
-            url = f"{settings.EXTERNAL_API_URL}/{cep}/json/"
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("erro"):
-                logger.info(f"CEP {cep} não encontrato na API (ViaCEP).")
-                return None
-            return data
+            response = self._get_with_retries(url)
+            if response.status_code in self.provider.not_found_status_codes:
+                data = None
+            else:
+                response.raise_for_status()
+                data = self.provider.parse(response.json())
+            if data is None:
+                logger.info(
+                    "CEP %s não encontrado na API (%s).",
+                    cep, self.provider.name,
+                )
+                return FetchStatus.NOT_FOUND, None, False
+            return FetchStatus.FOUND, data, False
         except requests.exceptions.HTTPError as http_err:
-            logger.error(f"Erro para o CEP {cep}: {http_err}: {response.text}")
-            return None
+            logger.error(
+                "Erro para o CEP %s: %s: %s", cep, http_err, response.text
+            )
+            # Erros 4xx (exceto 429) não indicam indisponibilidade da API
+            return FetchStatus.ERROR, None, \
+                response.status_code in RETRYABLE_STATUS_CODES
         except requests.exceptions.RequestException as req_err:
-            logger.error(f"Erro de requisição para o CEP {cep}: {req_err}")
-            return None
+            logger.error("Erro de requisição para o CEP %s: %s", cep, req_err)
+            return FetchStatus.ERROR, None, True
         except Exception as e:
-            logger.error(f"Ocorreu um erro ao pesquisar o CEP {cep}: {e}")
-            return None
+            logger.error("Ocorreu um erro ao pesquisar o CEP %s: %s", cep, e)
+            return FetchStatus.ERROR, None, False
+
+    def _get_with_retries(self, url: str) -> requests.Response:
+        attempt = 0
+        while True:
+            # Cada tentativa, inclusive as repetições, consome um token
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(self._sleep)
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ):
+                if attempt >= self.retries:
+                    raise
+                retry_after = None
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES \
+                        or attempt >= self.retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+            metrics.inc("api_retry")
+            self._sleep(backoff_delay(
+                attempt,
+                settings.API_RETRY_BACKOFF_SECONDS,
+                settings.API_RETRY_BACKOFF_MAX_SECONDS,
+                retry_after,
+            ))
+            attempt += 1
+
+    def fetch_many_cep_data(self, ceps: Sequence[str]) -> List[Optional[dict]]:
+        return [data for _, data in self.fetch_ceps(ceps)]
+
+    def fetch_ceps(
+        self, ceps: Sequence[str]
+    ) -> List[Tuple[FetchStatus, Optional[dict]]]:
+        if len(ceps) <= 1 or self.max_workers <= 1:
+            return [self.fetch_cep(cep) for cep in ceps]
+        workers = min(self.max_workers, len(ceps))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="cep-fetch"
+        ) as executor:
+            # executor.map preserva a ordem de entrada
+            return list(executor.map(self.fetch_cep, ceps))
+
+    def close(self) -> None:
+        self.session.close()
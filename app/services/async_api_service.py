@@ -0,0 +1,151 @@
+import asyncio
+import httpx
+from app.config.settings import settings
+import logging
+from typing import Awaitable, Callable, Optional, Tuple
+from app.interfaces.async_cep_api_service_interface import (
+    IAsyncCEPAPIService,
+)
+from app.interfaces.cep_api_service_interface import FetchStatus
+from app.services.api_service import (
+    create_circuit_breaker,
+    create_rate_limiter,
+)
+from app.interfaces.cep_provider_interface import ICEPProvider
+from app.services.providers.viacep_provider import ViaCEPProvider
+from app.utils.backoff import RETRYABLE_STATUS_CODES, backoff_delay
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.metrics import metrics
+from app.utils.rate_limiter import TokenBucket
+from app.utils.single_flight import AsyncSingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+
+def create_async_http_client(
+    max_connections: Optional[int] = None,
+) -> httpx.AsyncClient:
+    # O limite de conexões do pool também limita as requisições simultâneas
+    # à API externa; as demais aguardam uma conexão livre
+    max_connections = max_connections or settings.API_POOL_MAXSIZE
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        timeout=httpx.Timeout(
+            settings.API_READ_TIMEOUT_SECONDS,
+            connect=settings.API_CONNECT_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+class AsyncAPIService(IAsyncCEPAPIService):
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        retries: Optional[int] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        provider: Optional[ICEPProvider] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.client = client or create_async_http_client()
+        self.retries = settings.API_RETRIES if retries is None else retries
+        self.circuit_breaker = circuit_breaker or create_circuit_breaker()
+        self.provider = provider or ViaCEPProvider()
+        self.rate_limiter = rate_limiter or create_rate_limiter()
+        self._sleep = sleep
+        self._in_flight = AsyncSingleFlight()
+
+    async def fetch_cep_data(self, cep: str) -> Optional[dict]:
+        return (await self.fetch_cep(cep))[1]
+
+    async def fetch_cep(self, cep: str) -> Tuple[FetchStatus, Optional[dict]]:
+        result, shared = await self._in_flight.do(
+            cep, lambda: self._fetch_guarded(cep)
+        )
+        if shared:
+            metrics.inc("api_coalesced")
+        return result
+
+    async def _fetch_guarded(
+        self, cep: str
+    ) -> Tuple[FetchStatus, Optional[dict]]:
+        if not self.circuit_breaker.allow_request():
+            logger.warning(
+                "Circuit breaker aberto; CEP %s não consultado na API.", cep
+            )
+            metrics.inc("circuit_open")
+            return FetchStatus.ERROR, None
+        try:
+            status, data, upstream_failed = await self._fetch(cep)
+        except BaseException:
+            # Cancelada sem resultado: a vaga de teste do circuito meio
+            # aberto é liberada, senão o provedor nunca mais é consultado
+            self.circuit_breaker.release_trial()
+            raise
+        if upstream_failed:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return status, data
+
+    async def _fetch(
+        self, cep: str
+    ) -> Tuple[FetchStatus, Optional[dict], bool]:
+        url = self.provider.url(cep)
+        try:
+            response = await self._get_with_retries(url)
+            if response.status_code in self.provider.not_found_status_codes:
+                data = None
+            else:
+                response.raise_for_status()
+                data = self.provider.parse(response.json())
+            if data is None:
+                logger.info(
+                    f"CEP {cep} não encontrado na API "
+                    f"({self.provider.name})."
+                )
+                return FetchStatus.NOT_FOUND, None, False
+            return FetchStatus.FOUND, data, False
+        except httpx.HTTPStatusError as http_err:
+            logger.error(f"Erro para o CEP {cep}: {http_err}: {response.text}")
+            return FetchStatus.ERROR, None, \
+                response.status_code in RETRYABLE_STATUS_CODES
+        except httpx.HTTPError as req_err:
+            logger.error(f"Erro de requisição para o CEP {cep}: {req_err}")
+            return FetchStatus.ERROR, None, True
+        except Exception as e:
+            logger.error(f"Ocorreu um erro ao pesquisar o CEP {cep}: {e}")
+            return FetchStatus.ERROR, None, False
+
+    async def _get_with_retries(self, url: str) -> httpx.Response:
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            try:
+                response = await self.client.get(url)
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+                retry_after = None
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES \
+                        or attempt >= self.retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+            metrics.inc("api_retry")
+            await self._sleep(backoff_delay(
+                attempt,
+                settings.API_RETRY_BACKOFF_SECONDS,
+                settings.API_RETRY_BACKOFF_MAX_SECONDS,
+                retry_after,
+            ))
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
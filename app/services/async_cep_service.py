@@ -0,0 +1,116 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from app.interfaces.async_cep_api_service_interface import (
+    IAsyncCEPAPIService,
+)
+from app.interfaces.async_cep_repository_interface import IAsyncCEPRepository
+from app.models.cep import CEP
+from app.services.cep_service import prepare_cep_data, sanitize_cep
+from app.utils.single_flight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCEPService:
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        api_service: IAsyncCEPAPIService,
+        cep_repository: IAsyncCEPRepository,
+        single_flight: Optional[AsyncSingleFlight] = None,
+    ):
+        self.db_session = db_session
+        self.api_service = api_service
+        self.cep_repository = cep_repository
+        # Deve ser compartilhado entre as instâncias que rodam no mesmo loop
+        self.single_flight = (
+            AsyncSingleFlight() if single_flight is None else single_flight
+        )
+
+    async def get_or_fetch_cep_details(self, cep_str: str) -> Optional[CEP]:
+        sanitized_cep = sanitize_cep(cep_str)
+        if len(sanitized_cep) != 8:
+            logger.warning(f"CEP inválido: {cep_str} -> {sanitized_cep}")
+            return None
+
+        # 1. tentar recuperar o CEP do repositório local
+        local_cep = await self.cep_repository.get_cep(
+            self.db_session, sanitized_cep
+        )
+        if local_cep:
+            logger.info(f"CEP {sanitized_cep} encontrado na base local.")
+            return local_cep
+
+        logger.info(f"CEP {sanitized_cep} não encontrado na base local.")
+
+        new_cep, shared = await self.single_flight.do(
+            sanitized_cep, lambda: self._fetch_and_store(sanitized_cep)
+        )
+        if shared and new_cep is not None:
+            return await self.cep_repository.get_cep(
+                self.db_session, sanitized_cep
+            )
+        return new_cep
+
+    async def get_or_fetch_many(
+        self, ceps: Iterable[str]
+    ) -> Dict[str, Optional[CEP]]:
+        results: Dict[str, Optional[CEP]] = {}
+        for cep_str in ceps:
+            sanitized_cep = sanitize_cep(cep_str)
+            if len(sanitized_cep) != 8:
+                logger.warning(f"CEP inválido: {cep_str} -> {sanitized_cep}")
+                continue
+            results.setdefault(sanitized_cep, None)
+
+        if not results:
+            return results
+
+        unique_ceps = list(results)
+        for local_cep in await self.cep_repository.get_ceps(
+            self.db_session, unique_ceps
+        ):
+            results[local_cep.cep] = local_cep
+
+        misses = [cep for cep in unique_ceps if results[cep] is None]
+        if not misses:
+            return results
+
+        new_ceps_data: List[dict] = []
+        fetched = await self.api_service.fetch_many_cep_data(misses)
+        for cep, external_cep in zip(misses, fetched):
+            if not external_cep:
+                logger.warning(f"CEP {cep} não encontrado na API.")
+                continue
+            try:
+                new_ceps_data.append(prepare_cep_data(external_cep))
+            except Exception as e:
+                logger.error(f"Erro ao processar CEP {cep}: {e}")
+
+        for new_cep in await self.cep_repository.create_ceps(
+            self.db_session, new_ceps_data
+        ):
+            if new_cep.cep in results:
+                results[new_cep.cep] = new_cep
+        return results
+
+    async def _fetch_and_store(self, sanitized_cep: str) -> Optional[CEP]:
+        # 2. tentar recuperar o CEP de uma API externa
+        external_cep = await self.api_service.fetch_cep_data(sanitized_cep)
+        if not external_cep:
+            logger.warning(f"CEP {sanitized_cep} não encontrado na API.")
+            return None
+
+        # 3. dado retornado pela API, tentar salvar no repositório local
+        try:
+            new_cep = await self.cep_repository.create_cep(
+                self.db_session, prepare_cep_data(external_cep)
+            )
+            if not new_cep:
+                logger.error(f"Falha ao salvar os dados {sanitized_cep}.")
+            return new_cep
+        except Exception as e:
+            logger.error(f"Erro ao processar CEP {sanitized_cep}: {e}")
+            return None
@@ -0,0 +1,145 @@
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Sequence
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.interfaces.cep_api_service_interface import (
+    FetchStatus,
+    ICEPAPIService,
+)
+from app.interfaces.cep_repository_interface import ICEPRepository
+from app.models.cep import CEP
+from app.services.cep_service import prepare_cep_data
+from app.utils.helpers import get_current_datetime
+from app.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class CEPRefresher:
+    """Revalida na API externa os CEPs já gravados na base local.
+
+    CEPs confirmados há mais de ``soft_ttl`` segundos continuam sendo
+    servidos e são revalidados em segundo plano; após ``hard_ttl`` segundos,
+    a revalidação é feita na própria consulta. CEPs sem data de confirmação
+    (gravados antes das colunas existirem) contam como vencidos pelo prazo
+    curto, nunca pelo longo. Um prazo 0 fica desativado.
+    """
+
+    FRESH = "fresh"
+    STALE = "stale"
+    EXPIRED = "expired"
+
+    def __init__(
+        self,
+        api_service: ICEPAPIService,
+        cep_repository: ICEPRepository,
+        session_factory: Optional[Callable[[], Session]] = None,
+        soft_ttl: Optional[float] = None,
+        hard_ttl: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        clock: Callable[[], datetime.datetime] = get_current_datetime,
+    ):
+        self.api_service = api_service
+        self.cep_repository = cep_repository
+        if session_factory is None:
+            from app.database import get_sessionmaker
+            session_factory = get_sessionmaker()
+        self.session_factory = session_factory
+        self.soft_ttl = (
+            settings.CEP_SOFT_TTL_SECONDS if soft_ttl is None else soft_ttl
+        )
+        self.hard_ttl = (
+            settings.CEP_HARD_TTL_SECONDS if hard_ttl is None else hard_ttl
+        )
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.CEP_REFRESH_MAX_WORKERS,
+            thread_name_prefix="cep-refresh",
+        )
+        # CEPs com revalidação em segundo plano agendada ou em andamento
+        self._scheduled = set()
+        self._lock = threading.Lock()
+
+    def freshness(self, verified_at: Optional[datetime.datetime]) -> str:
+        if verified_at is None:
+            return self.STALE
+        age = (self.clock() - verified_at).total_seconds()
+        if self.hard_ttl and age > self.hard_ttl:
+            return self.EXPIRED
+        if self.soft_ttl and age > self.soft_ttl:
+            return self.STALE
+        return self.FRESH
+
+    def schedule(self, cep: str) -> bool:
+        """Agenda a revalidação em segundo plano; ``False`` se já agendada."""
+        with self._lock:
+            if cep in self._scheduled:
+                return False
+            self._scheduled.add(cep)
+        try:
+            self._executor.submit(self._refresh_in_background, cep)
+        except RuntimeError:
+            # Executor encerrado: o processo está terminando
+            with self._lock:
+                self._scheduled.discard(cep)
+            return False
+        metrics.inc("refresh_scheduled")
+        return True
+
+    def _refresh_in_background(self, cep: str) -> None:
+        db = self.session_factory()
+        try:
+            self.refresh_many(db, [cep])
+        except Exception as e:
+            logger.error("Erro ao revalidar CEP %s: %s", cep, e)
+        finally:
+            db.close()
+            with self._lock:
+                self._scheduled.discard(cep)
+
+    def refresh(self, db: Session, cep: str) -> Optional[CEP]:
+        return self.refresh_many(db, [cep]).get(cep)
+
+    def refresh_many(
+        self, db: Session, ceps: Sequence[str]
+    ) -> Dict[str, CEP]:
+        """Consulta os CEPs na API e grava os dados retornados, atualizando
+        ``verified_at``. CEPs não confirmados pela API ficam como estão."""
+        ceps_data = []
+        for cep, (status, external_cep) in zip(
+            ceps, self.api_service.fetch_ceps(ceps)
+        ):
+            if status is FetchStatus.FOUND and external_cep:
+                ceps_data.append(prepare_cep_data(external_cep))
+            elif status is FetchStatus.NOT_FOUND:
+                logger.warning(
+                    "CEP %s gravado na base não existe mais na API.", cep
+                )
+            else:
+                metrics.inc("refresh_failed")
+                logger.warning("Falha ao revalidar CEP %s na API.", cep)
+        if not ceps_data:
+            return {}
+        refreshed = self.cep_repository.upsert_ceps(
+            db, ceps_data, update_existing=True
+        )
+        metrics.inc("refreshed", len(refreshed))
+        return {db_cep.cep: db_cep for db_cep in refreshed}
+
+    def close(self) -> None:
+        # Revalidações ainda na fila são descartadas; serão agendadas de
+        # novo na próxima consulta
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def create_cep_refresher(
+    api_service: ICEPAPIService, cep_repository: ICEPRepository
+) -> Optional[CEPRefresher]:
+    if not settings.CEP_SOFT_TTL_SECONDS and not settings.CEP_HARD_TTL_SECONDS:
+        return None
+    return CEPRefresher(api_service, cep_repository)
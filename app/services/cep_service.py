@@ -1,13 +1,53 @@
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+import datetime
 import logging
 
-from app.interfaces.cep_api_service_interface import ICEPAPIService
+from app.interfaces.cep_api_service_interface import (
+    FetchStatus,
+    ICEPAPIService,
+)
+from app.interfaces.cep_not_found_repository_interface import (
+    ICEPNotFoundRepository,
+)
 from app.interfaces.cep_repository_interface import ICEPRepository
 from app.models.cep import CEP
+from app.models.cep_record import CEPRecord, record_from_model
+from app.utils.cep_normalizer import normalize_ceps, sanitize_cep
+from app.utils.metrics import metrics
+from app.utils.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from app.services.cep_refresher import CEPRefresher
 
 logger = logging.getLogger(__name__)
 
+# Compartilhado entre as instâncias do serviço dentro do processo
+_in_flight = SingleFlight()
+
+# Limite de CEPs por página nas listagens por prefixo, faixa e localidade
+MAX_PAGE_SIZE = 1000
+
+
+# Colunas do modelo aceitas nos dados vindos da API
+CEP_MODEL_FIELDS = frozenset(column.name for column in CEP.__table__.columns)
+
+
+def prepare_cep_data(external_cep: dict) -> dict:
+    external_cep["cep"] = sanitize_cep(external_cep.get("cep", ""))
+    return {
+        k: v for k, v in external_cep.items() if k in CEP_MODEL_FIELDS
+    }
+
 
 class CEPService:
     def __init__(
@@ -15,56 +55,399 @@ class CEPService:
         db_session: Session,
         api_service: ICEPAPIService,
         cep_repository: ICEPRepository,
+        not_found_repository: Optional[ICEPNotFoundRepository] = None,
+        single_flight: Optional[SingleFlight] = None,
+        refresher: Optional["CEPRefresher"] = None,
     ):
         self.db_session = db_session
         self.api_service = api_service
         self.cep_repository = cep_repository
+        self.not_found_repository = not_found_repository
+        self.single_flight = (
+            _in_flight if single_flight is None else single_flight
+        )
+        # Sem refresher, os CEPs da base local não vencem
+        self.refresher = refresher
 
     def get_or_fetch_cep_details(self, cep_str: str) -> Optional[CEP]:
         # Limpeza dos dados
-        sanitized_cep = "".join(filter(str.isdigit, cep_str))
+        with metrics.stage("sanitize"):
+            sanitized_cep = sanitize_cep(cep_str)
         if len(sanitized_cep) != 8:
-            logger.warning(f"CEP inválido: {cep_str} -> {sanitized_cep}")
+            metrics.inc("invalid")
+            logger.warning("CEP inválido: %s -> %s", cep_str, sanitized_cep)
             return None
 
         # 1. tentar recuperar o CEP do repositório local
-        logger.info(f"Tentando localizar CEP {sanitized_cep} da base local.")
-        local_cep = self.cep_repository.get_cep(self.db_session, sanitized_cep)
+        logger.info("Tentando localizar CEP %s da base local.", sanitized_cep)
+        with metrics.stage("local_lookup"):
+            local_cep = self.cep_repository.get_cep(
+                self.db_session, sanitized_cep
+            )
         if local_cep:
-            logger.info(f"CEP {sanitized_cep} encontrado na base local.")
-            return local_cep
+            metrics.inc("local_hit")
+            logger.info("CEP %s encontrado na base local.", sanitized_cep)
+            refreshed = self._revalidate(
+                {sanitized_cep: local_cep.verified_at}
+            )
+            return refreshed.get(sanitized_cep, local_cep)
 
-        logger.info(f"CEP {sanitized_cep} não encontrado na base local.")
+        metrics.inc("local_miss")
+        logger.info("CEP %s não encontrado na base local.", sanitized_cep)
 
-        # 2. tentar recuperar o CEP de uma API externa
-        external_cep = self.api_service.fetch_cep_data(sanitized_cep)
+        return self._fetch_missing(sanitized_cep)
 
-        if not external_cep:
-            logger.warning(f"CEP {sanitized_cep} não encontrado na API.")
+    def get_cep_record(
+        self, cep_str: str, failed: Optional[Set[str]] = None
+    ) -> Optional[CEPRecord]:
+        """Como ``get_or_fetch_cep_details``, mas os CEPs já gravados são
+        lidos como ``CEPRecord``, sem entidades do ORM. Um CEP sem resultado
+        por falha temporária, e não por inexistência, é acrescentado a
+        ``failed``, quando informado."""
+        with metrics.stage("sanitize"):
+            sanitized_cep = sanitize_cep(cep_str)
+        if len(sanitized_cep) != 8:
+            metrics.inc("invalid")
+            logger.warning("CEP inválido: %s -> %s", cep_str, sanitized_cep)
             return None
 
-        # 3. dado retornado pela API, tentar salvar no repositório local
+        with metrics.stage("local_lookup"):
+            record = self.cep_repository.get_cep_record(
+                self.db_session, sanitized_cep
+            )
+        if record is not None:
+            metrics.inc("local_hit")
+            refreshed = self._revalidate({sanitized_cep: record.verified_at})
+            if sanitized_cep in refreshed:
+                return record_from_model(refreshed[sanitized_cep])
+            return record
+
+        metrics.inc("local_miss")
+        new_cep = self._fetch_missing(sanitized_cep, failed)
+        return record_from_model(new_cep) if new_cep is not None else None
+
+    def _fetch_missing(
+        self, sanitized_cep: str, failed: Optional[Set[str]] = None
+    ) -> Optional[CEP]:
+        # Uma única busca externa em andamento por CEP dentro do processo;
+        # quem aguarda recebe também o status da busca
+        (status, new_cep), shared = self.single_flight.do(
+            sanitized_cep, lambda: self._fetch_and_store(sanitized_cep)
+        )
+        if status is FetchStatus.ERROR and failed is not None:
+            failed.add(sanitized_cep)
+        if shared and new_cep is not None:
+            # O CEP foi buscado e gravado por outra requisição; a leitura é
+            # refeita na sessão desta requisição
+            return self.cep_repository.get_cep(self.db_session, sanitized_cep)
+        return new_cep
+
+    def get_or_fetch_many(
+        self, ceps: Iterable[str]
+    ) -> Dict[str, Optional[CEP]]:
+        results: Dict[str, Optional[CEP]] = self._sanitize_many(ceps)
+        if not results:
+            return results
+
+        # 1. uma única consulta (IN) para todo o conjunto na base local
+        unique_ceps = list(results)
+        with metrics.stage("local_lookup"):
+            local_ceps = self.cep_repository.get_ceps(
+                self.db_session, unique_ceps
+            )
+        for local_cep in local_ceps:
+            results[local_cep.cep] = local_cep
+        results.update(self._revalidate({
+            local_cep.cep: local_cep.verified_at for local_cep in local_ceps
+        }))
+
+        misses = [cep for cep in unique_ceps if results[cep] is None]
+        metrics.inc("local_hit", len(unique_ceps) - len(misses))
+        metrics.inc("local_miss", len(misses))
+        logger.info(
+            "%s de %s CEPs encontrados na base local.",
+            len(unique_ceps) - len(misses),
+            len(unique_ceps),
+        )
+        results.update(self._fetch_misses(misses))
+        return results
+
+    def _fetch_misses(
+        self, misses: List[str], failed: Optional[Set[str]] = None
+    ) -> Dict[str, Optional[CEP]]:
+        """Busca na API os CEPs ausentes da base local e os grava. Os que
+        ficaram sem resposta definitiva (falha da API ou da gravação) são
+        acrescentados a ``failed``."""
+        results: Dict[str, Optional[CEP]] = dict.fromkeys(misses)
+        if self.not_found_repository and misses:
+            known_not_found = self.not_found_repository.get_not_found(
+                self.db_session, misses
+            )
+            misses = [cep for cep in misses if cep not in known_not_found]
+            metrics.inc("known_not_found", len(known_not_found))
+        if not misses:
+            return results
+
+        # CEPs já em busca por outra requisição não são buscados novamente
+        flights = {cep: self.single_flight.begin(cep) for cep in misses}
+        own = [cep for cep in misses if flights[cep][1]]
         try:
-            external_cep["cep"] = "".join(
-                filter(str.isdigit, external_cep.get("cep", ""))
+            self._fetch_and_store_many(own, results, failed)
+        finally:
+            for cep in own:
+                self.single_flight.finish(cep, flights[cep][0], results[cep])
+
+        shared = [
+            cep for cep in misses
+            if not flights[cep][1] and flights[cep][0].wait() is not None
+        ]
+        if shared:
+            for local_cep in self.cep_repository.get_ceps(
+                self.db_session, shared
+            ):
+                results[local_cep.cep] = local_cep
+        return results
+
+    def get_records_or_fetch_many(
+        self, ceps: Iterable[str], failed: Optional[Set[str]] = None
+    ) -> Dict[str, Optional[CEPRecord]]:
+        """Como ``get_or_fetch_many``, com os CEPs já gravados lidos como
+        ``CEPRecord``; só os obtidos da API passam por entidades.
+
+        CEPs sem resultado por falha temporária, e não por inexistência, são
+        acrescentados a ``failed``, quando informado.
+        """
+        results: Dict[str, Optional[CEPRecord]] = self._sanitize_many(ceps)
+        if not results:
+            return results
+
+        with metrics.stage("local_lookup"):
+            records = self.cep_repository.get_cep_records(
+                self.db_session, list(results)
             )
+        for record in records:
+            results[record.cep] = record
+        metrics.inc("local_hit", len(records))
+        refreshed = self._revalidate({
+            record.cep: record.verified_at for record in records
+        })
+        for cep, new_cep in refreshed.items():
+            results[cep] = record_from_model(new_cep)
 
-            model_fields = {column.name for column in CEP.__table__.columns}
-            filtered_cep_data = {
-                k: v for k, v in external_cep.items() if k in model_fields
-            }
+        # Os ausentes vão direto à API, sem nova consulta à base local
+        misses = [cep for cep, record in results.items() if record is None]
+        metrics.inc("local_miss", len(misses))
+        if misses:
+            for cep, new_cep in self._fetch_misses(misses, failed).items():
+                if new_cep is not None:
+                    results[cep] = record_from_model(new_cep)
+        return results
 
-            logger.info(f"CEP {sanitized_cep} encontrado na API externa.")
-            new_cep = self.cep_repository.create_cep(
-                self.db_session,
-                filtered_cep_data
+    def _revalidate(
+        self, verified: Dict[str, Optional[datetime.datetime]]
+    ) -> Dict[str, CEP]:
+        """Confere a validade dos CEPs lidos da base local (CEP -> data de
+        confirmação). Os vencidos pelo prazo curto são revalidados em segundo
+        plano; os vencidos pelo prazo longo, aqui, e retornados."""
+        if self.refresher is None or not verified:
+            return {}
+        expired = []
+        for cep, verified_at in verified.items():
+            freshness = self.refresher.freshness(verified_at)
+            if freshness == self.refresher.STALE:
+                metrics.inc("stale_hit")
+                self.refresher.schedule(cep)
+            elif freshness == self.refresher.EXPIRED:
+                expired.append(cep)
+        if not expired:
+            return {}
+
+        metrics.inc("expired_hit", len(expired))
+        logger.info("%s CEPs vencidos; revalidando na API.", len(expired))
+        with metrics.stage("external_fetch"):
+            # CEPs que a API não confirmou seguem com os dados vencidos
+            return self.refresher.refresh_many(self.db_session, expired)
+
+    @staticmethod
+    def _sanitize_many(ceps: Iterable[str]) -> Dict[str, None]:
+        # Limpeza e remoção de duplicados, preservando a ordem de entrada
+        ceps = ceps if isinstance(ceps, (list, tuple)) else list(ceps)
+        with metrics.stage("sanitize"):
+            normalized = normalize_ceps(ceps)
+        if normalized.invalid:
+            metrics.inc("invalid", len(normalized.invalid))
+            for i in normalized.invalid:
+                logger.warning("CEP inválido: %s", ceps[i])
+        return dict.fromkeys(normalized.unique)
+
+    def list_ceps(
+        self,
+        prefix: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        uf: Optional[str] = None,
+        localidade: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[CEP]:
+        """Uma página de CEPs da base local, em ordem, por prefixo, faixa
+        (inclusive) ou UF/localidade. A próxima página começa após o último
+        CEP desta (``after``). Não consulta a API externa."""
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if after is not None:
+            after = sanitize_cep(after)
+        if prefix is not None:
+            prefix = sanitize_cep(prefix)
+            if not 1 <= len(prefix) <= 8:
+                raise ValueError("Prefixo de CEP inválido.")
+            return self.cep_repository.find_by_prefix(
+                self.db_session, prefix, after, limit
+            )
+        if start is not None or end is not None:
+            start, end = sanitize_cep(start or ""), sanitize_cep(end or "")
+            if len(start) != 8 or len(end) != 8 or start > end:
+                raise ValueError("Faixa de CEPs inválida.")
+            return self.cep_repository.find_by_range(
+                self.db_session, start, end, after, limit
+            )
+        if uf:
+            return self.cep_repository.find_by_locality(
+                self.db_session, uf.upper(), localidade, after, limit
+            )
+        raise ValueError("Informe um prefixo, uma faixa de CEPs ou a UF.")
+
+    def iter_ceps(self, page_size: int = 500, **filters) -> Iterator[CEP]:
+        """Percorre todas as páginas de ``list_ceps`` sob demanda."""
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        after = None
+        while True:
+            page = self.list_ceps(after=after, limit=page_size, **filters)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1].cep
+
+    def _fetch_and_store_many(
+        self,
+        misses: List[str],
+        results: Dict[str, Optional[CEP]],
+        failed: Optional[Set[str]] = None,
+    ) -> None:
+        if not misses:
+            return
+        failed = set() if failed is None else failed
+
+        # 2. somente os CEPs ausentes são buscados na API externa
+        new_ceps_data: List[dict] = []
+        not_found = errors = 0
+        fetched = self._fetch_external_many(misses)
+        for cep, (status, external_cep) in zip(misses, fetched):
+            if status is FetchStatus.ERROR:
+                # Falha temporária: não conta como CEP inexistente
+                errors += 1
+                failed.add(cep)
+                logger.warning("Falha ao consultar o CEP %s na API.", cep)
+                continue
+            if not external_cep:
+                not_found += 1
+                logger.warning("CEP %s não encontrado na API.", cep)
+                continue
+            try:
+                new_ceps_data.append(prepare_cep_data(external_cep))
+            except Exception as e:
+                failed.add(cep)
+                logger.error("Erro ao processar CEP %s: %s", cep, e)
+
+        metrics.inc("api_found", len(new_ceps_data))
+        metrics.inc("api_not_found", not_found)
+        metrics.inc("api_error", errors)
+
+        # 3. gravação em lote dos CEPs retornados pela API
+        with metrics.stage("persist"):
+            new_ceps = self.cep_repository.create_ceps(
+                self.db_session, new_ceps_data
             )
+        for new_cep in new_ceps:
+            if new_cep.cep in results:
+                results[new_cep.cep] = new_cep
+        # Encontrados na API, mas não gravados
+        failed.update(
+            cep_data["cep"] for cep_data in new_ceps_data
+            if results.get(cep_data["cep"]) is None
+        )
+        logger.info("%s CEPs obtidos da API externa.", len(new_ceps_data))
+
+    def _fetch_and_store(
+        self, sanitized_cep: str
+    ) -> Tuple[FetchStatus, Optional[CEP]]:
+        """Busca o CEP na API e o grava. ``FetchStatus.ERROR`` indica falha
+        temporária: da API, do processamento ou da gravação."""
+        # 2. tentar recuperar o CEP de uma API externa, exceto os que a API
+        # já informou como inexistentes
+        if self.not_found_repository and \
+                self.not_found_repository.is_not_found(
+                    self.db_session, sanitized_cep
+                ):
+            metrics.inc("known_not_found")
+            logger.info("CEP %s registrado como inexistente.", sanitized_cep)
+            return FetchStatus.NOT_FOUND, None
+
+        status, external_cep = self._fetch_external(sanitized_cep)
+
+        if status is FetchStatus.ERROR:
+            # Falha temporária: não conta como CEP inexistente
+            metrics.inc("api_error")
+            logger.warning(
+                "Falha ao consultar o CEP %s na API.", sanitized_cep
+            )
+            return FetchStatus.ERROR, None
+        if not external_cep:
+            metrics.inc("api_not_found")
+            logger.warning("CEP %s não encontrado na API.", sanitized_cep)
+            return FetchStatus.NOT_FOUND, None
+
+        # 3. dado retornado pela API, tentar salvar no repositório local
+        try:
+            filtered_cep_data = prepare_cep_data(external_cep)
+
+            metrics.inc("api_found")
+            logger.info("CEP %s encontrado na API externa.", sanitized_cep)
+            with metrics.stage("persist"):
+                new_cep = self.cep_repository.create_cep(
+                    self.db_session,
+                    filtered_cep_data
+                )
             if new_cep:
-                logger.info(f"CEP {sanitized_cep} salvo.")
-                return new_cep
+                logger.info("CEP %s salvo.", sanitized_cep)
+                return FetchStatus.FOUND, new_cep
             else:
-                logger.error(f"Falha ao salvar os dados {sanitized_cep}.")
-                return None
+                logger.error("Falha ao salvar os dados %s.", sanitized_cep)
+                return FetchStatus.ERROR, None
         except Exception as e:
-            logger.error(f"Erro ao processar CEP {sanitized_cep}: {e}")
-            return None
+            logger.error("Erro ao processar CEP %s: %s", sanitized_cep, e)
+            return FetchStatus.ERROR, None
+
+    def _fetch_external(
+        self, cep: str
+    ) -> Tuple[FetchStatus, Optional[dict]]:
+        with metrics.stage("external_fetch"):
+            status, external_cep = self.api_service.fetch_cep(cep)
+        if self.not_found_repository and status is FetchStatus.NOT_FOUND:
+            self.not_found_repository.mark_not_found(self.db_session, [cep])
+        return status, external_cep
+
+    def _fetch_external_many(
+        self, ceps: List[str]
+    ) -> List[Tuple[FetchStatus, Optional[dict]]]:
+        with metrics.stage("external_fetch"):
+            fetched = self.api_service.fetch_ceps(ceps)
+        if self.not_found_repository:
+            not_found = [
+                cep for cep, (status, _) in zip(ceps, fetched)
+                if status is FetchStatus.NOT_FOUND
+            ]
+            if not_found:
+                self.not_found_repository.mark_not_found(
+                    self.db_session, not_found
+                )
+        return fetched
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Type
+from app.config.settings import settings
+from app.interfaces.async_cep_api_service_interface import (
+    IAsyncCEPAPIService,
+)
+from app.interfaces.cep_api_service_interface import (
+    FetchStatus,
+    ICEPAPIService,
+)
+from app.interfaces.cep_provider_interface import ICEPProvider
+from app.services.api_service import APIService
+from app.services.async_api_service import AsyncAPIService
+from app.services.providers.brasilapi_provider import BrasilAPIProvider
+from app.services.providers.viacep_provider import ViaCEPProvider
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS: Dict[str, Type[ICEPProvider]] = {
+    ViaCEPProvider.name: ViaCEPProvider,
+    BrasilAPIProvider.name: BrasilAPIProvider,
+}
+
+
+def create_provider(name: str) -> ICEPProvider:
+    try:
+        return PROVIDERS[name.strip().lower()]()
+    except KeyError:
+        raise ValueError(f"Provedor de CEP desconhecido: {name}")
+
+
+def create_api_service(
+    providers: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> ICEPAPIService:
+    """Cria o cliente da API externa a partir de ``API_PROVIDERS``.
+
+    Cada provedor tem seu próprio pool HTTP, circuit breaker e limite de
+    taxa.
+    """
+    names = [
+        name for name in (providers or settings.API_PROVIDERS).split(",")
+        if name.strip()
+    ]
+    services = [
+        APIService(max_workers=max_workers, provider=create_provider(name))
+        for name in names
+    ]
+    if len(services) == 1:
+        return services[0]
+    return MultiProviderAPIService(services, max_workers=max_workers)
+
+
+class MultiProviderAPIService(ICEPAPIService):
+    """Consulta os provedores em ordem, com fallback e hedging.
+
+    Se um provedor falha (``ERROR``), o próximo é consultado. Com
+    ``hedge_delay`` > 0, o próximo provedor também é disparado quando o
+    anterior não responde dentro desse tempo; vale a primeira resposta
+    definitiva (``FOUND`` ou ``NOT_FOUND``).
+    """
+
+    def __init__(
+        self,
+        services: Sequence[APIService],
+        hedge_delay: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ):
+        if not services:
+            raise ValueError("Informe ao menos um provedor.")
+        self.services = list(services)
+        self.hedge_delay = (
+            settings.API_HEDGE_DELAY_SECONDS
+            if hedge_delay is None else hedge_delay
+        )
+        self.max_workers = max_workers or settings.API_MAX_WORKERS
+        # As requisições de cada provedor rodam neste pool; as consultas em
+        # lote usam outro, para que uma não espere por vaga da outra
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers * len(self.services),
+            thread_name_prefix="cep-provider",
+        )
+
+    @property
+    def circuit_breakers(self) -> Dict[str, CircuitBreaker]:
+        breakers: Dict[str, CircuitBreaker] = {}
+        for service in self.services:
+            breakers.update(service.circuit_breakers)
+        return breakers
+
+    def fetch_cep_data(self, cep: str) -> Optional[dict]:
+        return self.fetch_cep(cep)[1]
+
+    def fetch_cep(self, cep: str) -> Tuple[FetchStatus, Optional[dict]]:
+        remaining = iter(self.services)
+        pending: Set[Future] = set()
+
+        def launch_next() -> bool:
+            service = next(remaining, None)
+            if service is None:
+                return False
+            pending.add(self._executor.submit(service.fetch_cep, cep))
+            return True
+
+        launch_next()
+        while pending:
+            timeout = self.hedge_delay if self.hedge_delay > 0 else None
+            done, pending = wait(
+                pending, timeout=timeout, return_when=FIRST_COMPLETED
+            )
+            if not done:
+                # Provedor lento: dispara o próximo sem cancelar o atual
+                if launch_next():
+                    metrics.inc("api_hedged")
+                continue
+            for future in done:
+                status, data = future.result()
+                if status != FetchStatus.ERROR:
+                    return status, data
+            if launch_next():
+                metrics.inc("api_fallback")
+        logger.error("Nenhum provedor respondeu para o CEP %s.", cep)
+        return FetchStatus.ERROR, None
+
+    def fetch_many_cep_data(self, ceps: Sequence[str]) -> List[Optional[dict]]:
+        return [data for _, data in self.fetch_ceps(ceps)]
+
+    def fetch_ceps(
+        self, ceps: Sequence[str]
+    ) -> List[Tuple[FetchStatus, Optional[dict]]]:
+        if len(ceps) <= 1 or self.max_workers <= 1:
+            return [self.fetch_cep(cep) for cep in ceps]
+        workers = min(self.max_workers, len(ceps))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="cep-fetch"
+        ) as executor:
+            return list(executor.map(self.fetch_cep, ceps))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for service in self.services:
+            service.close()
+
+
+class AsyncMultiProviderAPIService(IAsyncCEPAPIService):
+    """Equivalente de ``MultiProviderAPIService`` para corrotinas."""
+
+    def __init__(
+        self,
+        services: Sequence[AsyncAPIService],
+        hedge_delay: Optional[float] = None,
+    ):
+        if not services:
+            raise ValueError("Informe ao menos um provedor.")
+        self.services = list(services)
+        self.hedge_delay = (
+            settings.API_HEDGE_DELAY_SECONDS
+            if hedge_delay is None else hedge_delay
+        )
+
+    async def fetch_cep_data(self, cep: str) -> Optional[dict]:
+        return (await self.fetch_cep(cep))[1]
+
+    async def fetch_cep(self, cep: str) -> Tuple[FetchStatus, Optional[dict]]:
+        remaining = iter(self.services)
+        pending: Set[asyncio.Task] = set()
+
+        def launch_next() -> bool:
+            service = next(remaining, None)
+            if service is None:
+                return False
+            pending.add(asyncio.ensure_future(service.fetch_cep(cep)))
+            return True
+
+        launch_next()
+        try:
+            while pending:
+                timeout = self.hedge_delay if self.hedge_delay > 0 else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    if launch_next():
+                        metrics.inc("api_hedged")
+                    continue
+                for task in done:
+                    status, data = task.result()
+                    if status != FetchStatus.ERROR:
+                        return status, data
+                if launch_next():
+                    metrics.inc("api_fallback")
+        finally:
+            # Ao contrário das threads, as tasks perdedoras são canceladas
+            for task in pending:
+                task.cancel()
+        logger.error(f"Nenhum provedor respondeu para o CEP {cep}.")
+        return FetchStatus.ERROR, None
+
+    async def aclose(self) -> None:
+        for service in self.services:
+            await service.aclose()
@@ -0,0 +1,61 @@
+from typing import Optional
+from app.config.settings import settings
+from app.interfaces.cep_provider_interface import ICEPProvider
+
+
+# Estado e região de cada UF, que a BrasilAPI não informa
+UF_ESTADO_REGIAO = {
+    "AC": ("Acre", "Norte"),
+    "AL": ("Alagoas", "Nordeste"),
+    "AP": ("Amapá", "Norte"),
+    "AM": ("Amazonas", "Norte"),
+    "BA": ("Bahia", "Nordeste"),
+    "CE": ("Ceará", "Nordeste"),
+    "DF": ("Distrito Federal", "Centro-Oeste"),
+    "ES": ("Espírito Santo", "Sudeste"),
+    "GO": ("Goiás", "Centro-Oeste"),
+    "MA": ("Maranhão", "Nordeste"),
+    "MT": ("Mato Grosso", "Centro-Oeste"),
+    "MS": ("Mato Grosso do Sul", "Centro-Oeste"),
+    "MG": ("Minas Gerais", "Sudeste"),
+    "PA": ("Pará", "Norte"),
+    "PB": ("Paraíba", "Nordeste"),
+    "PR": ("Paraná", "Sul"),
+    "PE": ("Pernambuco", "Nordeste"),
+    "PI": ("Piauí", "Nordeste"),
+    "RJ": ("Rio de Janeiro", "Sudeste"),
+    "RN": ("Rio Grande do Norte", "Nordeste"),
+    "RS": ("Rio Grande do Sul", "Sul"),
+    "RO": ("Rondônia", "Norte"),
+    "RR": ("Roraima", "Norte"),
+    "SC": ("Santa Catarina", "Sul"),
+    "SP": ("São Paulo", "Sudeste"),
+    "SE": ("Sergipe", "Nordeste"),
+    "TO": ("Tocantins", "Norte"),
+}
+
+
+class BrasilAPIProvider(ICEPProvider):
+    name = "brasilapi"
+    not_found_status_codes = frozenset({404})
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or settings.BRASILAPI_URL).rstrip("/")
+
+    def url(self, cep: str) -> str:
+        return f"{self.base_url}/{cep}"
+
+    def parse(self, payload: dict) -> Optional[dict]:
+        # A BrasilAPI não informa complemento, IBGE, DDD etc.: esses campos
+        # ficam nulos, e numa atualização mantêm o valor já gravado
+        uf = payload.get("state")
+        estado, regiao = UF_ESTADO_REGIAO.get(uf, (None, None))
+        return {
+            "cep": payload.get("cep", ""),
+            "logradouro": payload.get("street") or "",
+            "bairro": payload.get("neighborhood") or "",
+            "localidade": payload.get("city"),
+            "uf": uf,
+            "estado": estado,
+            "regiao": regiao,
+        }
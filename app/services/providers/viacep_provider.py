@@ -0,0 +1,18 @@
+from typing import Optional
+from app.config.settings import settings
+from app.interfaces.cep_provider_interface import ICEPProvider
+
+
+class ViaCEPProvider(ICEPProvider):
+    name = "viacep"
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or settings.EXTERNAL_API_URL).rstrip("/")
+
+    def url(self, cep: str) -> str:
+        return f"{self.base_url}/{cep}/json/"
+
+    def parse(self, payload: dict) -> Optional[dict]:
+        if payload.get("erro"):
+            return None
+        return payload
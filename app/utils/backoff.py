@@ -0,0 +1,25 @@
+import random
+from typing import Optional
+
+
+# Respostas da API externa que justificam nova tentativa
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def backoff_delay(
+    attempt: int,
+    base_seconds: float,
+    max_seconds: float,
+    retry_after: Optional[str] = None,
+) -> float:
+    """Espera antes da tentativa ``attempt + 1`` (exponencial com jitter).
+
+    Um cabeçalho ``Retry-After`` em segundos tem precedência, limitado a
+    ``max_seconds``.
+    """
+    if retry_after:
+        try:
+            return min(max_seconds, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return random.uniform(0, min(max_seconds, base_seconds * 2 ** attempt))
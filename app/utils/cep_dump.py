@@ -0,0 +1,230 @@
+import csv
+import gzip
+import io
+import json
+import os
+from itertools import islice
+from typing import (
+    IO, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar,
+)
+
+from app.schemas.cep_schema import CEPSchema
+
+
+T = TypeVar("T")
+
+CEP_DUMP_FIELDS = tuple(CEPSchema.model_fields)
+# Colunas com poucos valores distintos, gravadas com dicionário nos
+# formatos colunares
+DICTIONARY_FIELDS = ("uf", "estado", "regiao", "ddd", "localidade")
+
+COLUMNAR_SUFFIXES = {".parquet": "parquet", ".arrow": "arrow"}
+
+
+def dump_format(path: str) -> str:
+    """Formato de um arquivo de CEPs pela extensão: ``parquet``, ``arrow``
+    (Arrow IPC), ``csv`` ou ``jsonl`` (os dois últimos com ``.gz``)."""
+    base_path = path[:-3] if path.endswith(".gz") else path
+    suffix = os.path.splitext(base_path)[1].lower()
+    if suffix in COLUMNAR_SUFFIXES:
+        if base_path != path:
+            raise ValueError(f"Arquivo colunar não pode ser .gz: {path}")
+        return COLUMNAR_SUFFIXES[suffix]
+    return "csv" if suffix == ".csv" else "jsonl"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            "Arquivos Parquet e Arrow exigem o pacote pyarrow."
+        ) from e
+    return pyarrow
+
+
+def open_text(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_cep_records(path: str) -> Iterator[dict]:
+    """Lê um arquivo de CEPs (CSV ou JSON lines, opcionalmente .gz, Parquet
+    ou Arrow IPC) em fluxo.
+
+    Cada registro traz apenas os campos de ``CEPSchema``, com valores em
+    texto, como são gravados na tabela ``CEP``.
+    """
+    fmt = dump_format(path)
+    if fmt in ("parquet", "arrow"):
+        yield from _iter_columnar_records(path, fmt)
+        return
+    with open_text(path) as source:
+        if fmt == "csv":
+            records: Iterable[dict] = csv.DictReader(source)
+        else:
+            records = (json.loads(line) for line in source if line.strip())
+        for record in records:
+            yield {
+                field: None if record.get(field) is None
+                else str(record[field])
+                for field in CEP_DUMP_FIELDS
+            }
+
+
+def _iter_columnar_records(path: str, fmt: str) -> Iterator[dict]:
+    pa = _import_pyarrow()
+    if fmt == "parquet":
+        source = pa.parquet.ParquetFile(path)
+        batches = source.iter_batches(
+            columns=[
+                field for field in CEP_DUMP_FIELDS
+                if field in source.schema_arrow.names
+            ]
+        )
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        batches = (
+            reader.get_batch(i) for i in range(reader.num_record_batches)
+        )
+    # Um lote decodificado por vez: memória limitada ao tamanho do lote
+    for batch in batches:
+        columns = []
+        for field in CEP_DUMP_FIELDS:
+            index = batch.schema.get_field_index(field)
+            if index < 0:
+                columns.append([None] * batch.num_rows)
+                continue
+            column = batch.column(index)
+            if pa.types.is_dictionary(column.type):
+                column = column.dictionary_decode()
+            if not pa.types.is_string(column.type):
+                column = column.cast(pa.string())
+            columns.append(column.to_pylist())
+        for values in zip(*columns):
+            yield dict(zip(CEP_DUMP_FIELDS, values))
+
+
+class CEPDumpWriter:
+    """Grava lotes de registros de CEP em JSON lines (opcionalmente .gz),
+    Parquet ou Arrow IPC, conforme a extensão de ``path``.
+
+    O arquivo é montado em ``path + ".tmp"`` e só substitui ``path`` em
+    ``close``. Nos formatos colunares, cada lote vira um row group (Parquet)
+    ou record batch (Arrow), e as colunas de ``DICTIONARY_FIELDS`` são
+    gravadas com dicionário.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = dump_format(path)
+        if self.format == "csv":
+            raise ValueError("Exportação em CSV não suportada.")
+        self._tmp_path = path + ".tmp"
+        self._dictionaries: Dict[str, Dict[str, int]] = {
+            field: {} for field in DICTIONARY_FIELDS
+        }
+        self._writer = None
+        self._text: Optional[IO[str]] = None
+        if self.format == "jsonl":
+            if path.endswith(".gz"):
+                self._text = io.TextIOWrapper(
+                    gzip.open(self._tmp_path, "wb", compresslevel=6),
+                    encoding="utf-8",
+                )
+            else:
+                self._text = open(self._tmp_path, "w", encoding="utf-8")
+        else:
+            self._open_columnar()
+
+    def _open_columnar(self) -> None:
+        pa = self._pa = _import_pyarrow()
+        self.schema = pa.schema([
+            (
+                field,
+                pa.dictionary(pa.int32(), pa.string())
+                if field in DICTIONARY_FIELDS else pa.string(),
+            )
+            for field in CEP_DUMP_FIELDS
+        ])
+        if self.format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(
+                self._tmp_path, self.schema, compression="zstd"
+            )
+        else:
+            # Os dicionários crescem entre lotes: cada lote grava só os
+            # valores novos (delta)
+            self._sink = pa.OSFile(self._tmp_path, "wb")
+            self._writer = pa.ipc.new_file(
+                self._sink,
+                self.schema,
+                options=pa.ipc.IpcWriteOptions(
+                    compression="zstd", emit_dictionary_deltas=True
+                ),
+            )
+
+    def write(self, rows: Sequence[Sequence[Optional[str]]]) -> None:
+        """Grava um lote; cada linha traz os valores de ``CEP_DUMP_FIELDS``,
+        nessa ordem."""
+        if not rows:
+            return
+        if self._text is not None:
+            for row in rows:
+                self._text.write(json.dumps(
+                    dict(zip(CEP_DUMP_FIELDS, row)), ensure_ascii=False
+                ))
+                self._text.write("\n")
+            return
+        self._writer.write_batch(self._record_batch(rows))
+
+    def _record_batch(self, rows: Sequence[Sequence[Optional[str]]]):
+        pa = self._pa
+        columns = []
+        for field, values in zip(CEP_DUMP_FIELDS, zip(*rows)):
+            if field not in DICTIONARY_FIELDS:
+                columns.append(pa.array(values, type=pa.string()))
+                continue
+            codes = self._dictionaries[field]
+            indices = [
+                None if value is None else codes.setdefault(value, len(codes))
+                for value in values
+            ]
+            columns.append(pa.DictionaryArray.from_arrays(
+                pa.array(indices, type=pa.int32()),
+                pa.array(list(codes), type=pa.string()),
+            ))
+        return pa.record_batch(columns, schema=self.schema)
+
+    def close(self) -> None:
+        if self._text is not None:
+            self._text.close()
+        else:
+            self._writer.close()
+            if self.format == "arrow":
+                self._sink.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Descarta o arquivo parcial, sem tocar em ``path``."""
+        try:
+            if self._text is not None:
+                self._text.close()
+            else:
+                self._writer.close()
+                if self.format == "arrow":
+                    self._sink.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,125 @@
+import datetime
+import gzip
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.config.settings import settings
+from app.models.cep_record import CEPRecord
+from app.schemas.cep_schema import cep_record_json_bytes
+from app.utils.lru_cache import MISSING, LRUCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+GZIP = "gzip"
+BROTLI = "br"
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Codificações de um ``Accept-Encoding`` com seus pesos (``q``)."""
+    accepted: Dict[str, float] = {}
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name] = quality
+    return accepted
+
+
+class CEPJSON(NamedTuple):
+    # JSON de CEPSchema em UTF-8, como devolvido ao cliente
+    body: bytes
+    # Variantes pré-comprimidas, quando habilitadas
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+    # Última verificação do CEP na fonte, para checar a validade nos acertos
+    verified_at: Optional[datetime.datetime] = None
+
+    def variant(
+        self, accept_encoding: Optional[str]
+    ) -> Tuple[bytes, Optional[str]]:
+        """Corpo e ``Content-Encoding`` para o ``Accept-Encoding`` do
+        cliente: brotli, gzip ou o JSON sem compressão."""
+        if self.gzip is None and self.br is None:
+            return self.body, None
+        accepted = accepted_encodings(accept_encoding)
+        if self.br is not None and accepted.get(BROTLI, 0) > 0:
+            return self.br, BROTLI
+        if self.gzip is not None and accepted.get(GZIP, 0) > 0:
+            return self.gzip, GZIP
+        return self.body, None
+
+
+class CEPJSONCache:
+    """Cache do JSON já serializado de cada CEP.
+
+    O JSON é gerado uma vez, quando o CEP entra no cache de repositório, e
+    as consultas seguintes devolvem os mesmos bytes, sem validação nem
+    serialização. Com ``compress``, guarda também as variantes gzip e, se o
+    pacote ``brotli`` estiver instalado, brotli.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        compress: Optional[bool] = None,
+        cache: Optional[LRUCache] = None,
+    ):
+        if cache is None:
+            cache = LRUCache(
+                max_size=max_size or settings.CEP_CACHE_MAX_SIZE,
+                ttl_seconds=(
+                    settings.CEP_CACHE_TTL_SECONDS
+                    if ttl_seconds is None else ttl_seconds
+                ),
+            )
+        self.cache = cache
+        self.compress = (
+            settings.CEP_JSON_COMPRESS if compress is None else compress
+        )
+
+    def get(self, cep: str) -> Optional[CEPJSON]:
+        entry = self.cache.get(cep)
+        return None if entry is MISSING else entry
+
+    def put(self, record: CEPRecord) -> CEPJSON:
+        """Serializa o registro e o guarda. Erros de validação são
+        propagados, sem deixar no cache uma versão anterior do CEP."""
+        try:
+            entry = self.encode(record)
+        except Exception:
+            self.cache.delete(record.cep)
+            raise
+        self.cache.set(record.cep, entry)
+        return entry
+
+    def encode(self, record: CEPRecord) -> CEPJSON:
+        body = cep_record_json_bytes(record)
+        if not self.compress:
+            return CEPJSON(body, verified_at=record.verified_at)
+        return CEPJSON(
+            body,
+            gzip=gzip.compress(body, compresslevel=6, mtime=0),
+            br=brotli.compress(body) if brotli is not None else None,
+            verified_at=record.verified_at,
+        )
+
+    def invalidate(self, cep: str) -> None:
+        self.cache.delete(cep)
+
+    def __len__(self) -> int:
+        return len(self.cache)
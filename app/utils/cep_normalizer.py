@@ -0,0 +1,63 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+
+# Bytes removidos na limpeza: tudo exceto os dígitos ASCII e o separador de
+# linhas usado na limpeza em lote
+_NON_DIGITS = bytes(
+    byte for byte in range(256)
+    if not (ord("0") <= byte <= ord("9") or byte == ord("\n"))
+)
+
+
+def sanitize_cep(cep_str: str) -> str:
+    """Mantém só os dígitos ASCII do CEP (``"01001-000"`` -> ``"01001000"``).
+    """
+    digits = cep_str.replace("-", "")
+    if digits.isascii() and digits.isdigit():
+        return digits
+    # Caracteres fora do ASCII (inclusive dígitos de outros alfabetos) são
+    # descartados
+    return cep_str.encode("ascii", "ignore").translate(
+        None, _NON_DIGITS + b"\n"
+    ).decode("ascii")
+
+
+class NormalizedCEPs(NamedTuple):
+    # CEP limpo por posição da entrada; None nas entradas inválidas
+    sanitized: List[Optional[str]]
+    # CEPs válidos sem repetição, na ordem da primeira ocorrência
+    unique: List[str]
+    # Posições das entradas inválidas
+    invalid: List[int]
+
+
+def normalize_ceps(values: Sequence[Optional[str]]) -> NormalizedCEPs:
+    """Limpa, valida e remove repetições de uma coluna de CEPs de uma vez.
+
+    A coluna inteira é limpa com um único ``bytes.translate``, em vez de um
+    filtro por caractere em cada CEP; o resultado é o mesmo de aplicar
+    ``sanitize_cep`` a cada valor.
+    """
+    try:
+        joined = "\n".join(values).encode("ascii", "ignore")
+    except TypeError:
+        # Valores nulos: limpeza um a um
+        cleaned = [sanitize_cep(value or "") for value in values]
+    else:
+        cleaned = joined.translate(None, _NON_DIGITS).decode("ascii").split(
+            "\n"
+        )
+        if len(cleaned) != len(values):
+            # Algum valor continha quebra de linha
+            cleaned = [sanitize_cep(value) for value in values]
+
+    unique: Dict[str, None] = dict.fromkeys(cleaned)
+    if all(len(cep) == 8 for cep in unique):
+        return NormalizedCEPs(cleaned, list(unique), [])
+
+    invalid = [i for i, cep in enumerate(cleaned) if len(cep) != 8]
+    for i in invalid:
+        cleaned[i] = None
+    return NormalizedCEPs(
+        cleaned, [cep for cep in unique if len(cep) == 8], invalid
+    )
@@ -0,0 +1,103 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Union
+
+
+class CircuitBreaker:
+    """Circuit breaker para a API externa.
+
+    ``closed``: requisições liberadas. Após ``failure_threshold`` falhas
+    consecutivas passa a ``open`` e recusa requisições por
+    ``recovery_timeout`` segundos; depois, em ``half_open``, libera uma
+    requisição de teste, que fecha o circuito se tiver sucesso ou o reabre
+    se falhar.
+
+    Uma requisição de teste que não informa o resultado (cancelada ou
+    interrompida) deve chamar ``release_trial``; se nem isso acontecer, uma
+    nova requisição de teste é liberada após ``trial_timeout`` segundos
+    (por padrão, ``recovery_timeout``).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+        trial_timeout: Optional[float] = None,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.trial_timeout = (
+            recovery_timeout if trial_timeout is None else trial_timeout
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._trial_started_at = 0.0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and (
+                not self._trial_in_progress
+                or self._clock() - self._trial_started_at
+                >= self.trial_timeout
+            ):
+                self._trial_in_progress = True
+                self._trial_started_at = self._clock()
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or \
+                    self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+            self._trial_in_progress = False
+
+    def release_trial(self) -> None:
+        """Libera a requisição de teste sem resultado, mantendo o estado."""
+        with self._lock:
+            self._trial_in_progress = False
+
+    def snapshot(self) -> Dict[str, Union[str, int]]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+            }
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and \
+                self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
@@ -3,3 +3,8 @@ import datetime
 
 def get_current_timestamp():
     return datetime.datetime.now().isoformat()
+
+
+def get_current_datetime() -> datetime.datetime:
+    # UTC sem fuso, no mesmo formato gravado pelas colunas DateTime
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
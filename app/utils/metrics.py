@@ -0,0 +1,221 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config.settings import settings
+
+
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_NOOP = nullcontext()
+
+
+def _format_labels(labels: LabelKey, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}",
+                 f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(key)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # Por rótulo: contagem por faixa (não cumulativa), soma e total
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = (
+                    [0] * (len(self.buckets) + 1), [0.0]
+                )
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(tuple(sorted(labels.items())))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}",
+                 f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            labels = _format_labels(key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(
+                f"{self.name}_sum{_format_labels(key)} {repr(total[0])}"
+            )
+            lines.append(f"{self.name}_count{_format_labels(key)} "
+                         f"{cumulative}")
+        return lines
+
+
+class Gauge:
+    """Valor lido no momento da exportação, a partir de uma função."""
+
+    def __init__(
+        self, name: str, documentation: str, read: Callable[[], float]
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}",
+                f"# TYPE {self.name} gauge",
+                f"{self.name} {_format_value(self.read())}"]
+
+
+class MetricsRegistry:
+    """Contadores e histogramas do caminho de consulta de CEPs.
+
+    Desabilitado, ``stage()`` devolve um context manager nulo compartilhado
+    e ``inc()`` retorna de imediato, sem medir tempo nem travar.
+    """
+
+    def __init__(
+        self, enabled: Optional[bool] = False, tracing: bool = False
+    ):
+        # ``enabled=None`` lê METRICS_ENABLED e TRACING_ENABLED no primeiro
+        # uso, para não carregar as configurações ao importar o módulo
+        self._enabled = enabled
+        self._metrics: Dict[str, object] = {}
+        self._tracer = None
+        self.stage_duration = self.histogram(
+            "cep_stage_duration_seconds",
+            "Duração de cada etapa da consulta de CEP.",
+        )
+        self.events = self.counter(
+            "cep_events_total",
+            "Eventos da consulta de CEP (resultado, cache, API).",
+        )
+        if tracing:
+            self.enable_tracing()
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._load_settings()
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        if self._enabled is None:
+            self._load_settings()
+        self._enabled = value
+
+    def _load_settings(self) -> None:
+        self._enabled = settings.METRICS_ENABLED
+        if settings.TRACING_ENABLED:
+            self.enable_tracing()
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, **kwargs) -> Histogram:
+        return self._metrics.setdefault(
+            name, Histogram(name, documentation, **kwargs)
+        )
+
+    def gauge(
+        self, name: str, documentation: str, read: Callable[[], float]
+    ) -> Gauge:
+        gauge = self._metrics[name] = Gauge(name, documentation, read)
+        return gauge
+
+    def enable_tracing(self) -> bool:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            return False
+        self._tracer = trace.get_tracer("app.cep")
+        return True
+
+    def inc(self, event: str, amount: float = 1.0) -> None:
+        if self.enabled:
+            self.events.inc(amount, event=event)
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NOOP
+        return self._timed_stage(name)
+
+    @contextmanager
+    def _timed_stage(self, name: str) -> Iterator[None]:
+        span = (
+            self._tracer.start_as_current_span(f"cep.{name}")
+            if self._tracer is not None else _NOOP
+        )
+        started_at = time.perf_counter()
+        try:
+            with span:
+                yield
+        finally:
+            self.stage_duration.observe(
+                time.perf_counter() - started_at, stage=name
+            )
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def get(self, name: str) -> Optional[object]:
+        return self._metrics.get(name)
+
+
+metrics = MetricsRegistry(enabled=None)
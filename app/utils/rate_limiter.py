@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """Limitador de taxa (token bucket) compartilhado entre threads e tasks.
+
+    Libera até ``burst`` requisições de uma vez e, em regime, no máximo
+    ``rate`` requisições por segundo. Cada chamada reserva um token sob o
+    lock e espera fora dele, de modo que as chamadas concorrentes são
+    espaçadas sem serializar a espera.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate deve ser maior que zero.")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+
+    def reserve(self) -> float:
+        """Consome um token e retorna quantos segundos esperar por ele."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated_at) * self.rate,
+            )
+            self._updated_at = now
+            # O saldo pode ficar negativo: cada reserva entra na fila atrás
+            # das anteriores
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, sleep: Callable[[float], None] = time.sleep) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
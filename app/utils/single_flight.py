@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from typing import (
+    Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple,
+)
+
+
+class Flight:
+    def __init__(self):
+        self._done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self) -> Any:
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Garante uma única execução em andamento por chave dentro do processo.
+
+    Chamadas concorrentes para a mesma chave aguardam e recebem o resultado
+    da primeira (a "líder"), em vez de repetirem o trabalho.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, Flight] = {}
+
+    def begin(self, key: Hashable) -> Tuple[Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def finish(
+        self,
+        key: Hashable,
+        flight: Flight,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        flight.result = result
+        flight.error = error
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight._done.set()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Retorna ``(resultado, compartilhado)``."""
+        flight, leader = self.begin(key)
+        if not leader:
+            return flight.wait(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, result=result)
+        return result, False
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+
+class AsyncSingleFlight:
+    """Equivalente de ``SingleFlight`` para corrotinas de um mesmo loop.
+
+    A chamada compartilhada roda numa task própria: cancelar quem a iniciou
+    (por exemplo, o provedor perdedor de um hedge) só interrompe a espera
+    dele, sem cancelar a chamada nem propagar ``CancelledError`` aos que
+    aguardam o mesmo resultado.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        flight = self._flights.get(key)
+        if flight is not None:
+            return await asyncio.shield(flight), True
+
+        flight = asyncio.ensure_future(fn())
+        self._flights[key] = flight
+        flight.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(flight), False
+
+    def _finish(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Evita o aviso de exceção não recuperada quando ninguém mais
+            # aguarda o resultado
+            flight.exception()
+
+    def __len__(self) -> int:
+        return len(self._flights)
@@ -0,0 +1,174 @@
+"""Benchmark do caminho de consulta de CEPs.
+
+Usa SQLite em memória e um ViaCEP local (``FakeViaCEPServer``) com
+latência configurável, para que execuções sejam comparáveis entre commits::
+
+    python -m benchmarks.bench_lookup --iterations 2000 --latency-ms 20 \\
+        --cache --json bench_output.json
+"""
+import argparse
+import logging
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("EXTERNAL_API_URL", "http://127.0.0.1/ws")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.config.settings import settings  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.repositories.cached_cep_repository import (  # noqa: E402
+    CachedCEPRepository,
+)
+from app.repositories.cep_repository import CEPRepository  # noqa: E402
+from app.schemas.cep_schema import (  # noqa: E402
+    CEPSchema,
+    cep_record_json,
+)
+from app.services.api_service import APIService  # noqa: E402
+from app.services.cep_service import CEPService  # noqa: E402
+from app.utils.metrics import metrics  # noqa: E402
+from benchmarks.fake_viacep import (  # noqa: E402
+    FakeViaCEPServer,
+    fake_cep_payload,
+)
+from benchmarks.harness import measure, report  # noqa: E402
+
+SCENARIOS = (
+    "repository_read",
+    "repository_write",
+    "api_fetch",
+    "service_hit",
+    "service_record_hit",
+    "service_miss",
+    "service_invalid",
+    "service_batch_miss",
+)
+HOT_CEPS = 1000
+
+
+def cep_for(prefix: int, i: int) -> str:
+    # Faixas distintas por cenário; índices negativos são do aquecimento
+    return f"{prefix}{(i + 10_000) % 10_000_000:07d}"
+
+
+def create_session():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autoflush=False, bind=engine)()
+
+
+def seed(db, repository: CEPRepository) -> None:
+    repository.upsert_ceps(db, [
+        {**fake_cep_payload(cep_for(1, i)), "cep": cep_for(1, i)}
+        for i in range(HOT_CEPS)
+    ])
+
+
+def run(args: argparse.Namespace) -> list:
+    settings.API_MAX_WORKERS = args.workers
+    metrics.enabled = args.metrics
+    db = create_session()
+    base_repository = CEPRepository()
+    seed(db, base_repository)
+    repository = (
+        CachedCEPRepository(base_repository) if args.cache
+        else base_repository
+    )
+
+    with FakeViaCEPServer(args.latency_ms / 1000) as fake_api:
+        settings.EXTERNAL_API_URL = fake_api.url
+        api_service = APIService(max_workers=args.workers)
+        service = CEPService(
+            db_session=db,
+            api_service=api_service,
+            cep_repository=repository,
+        )
+        batch = args.batch_size
+        operations = {
+            "repository_read": lambda i: repository.get_cep(
+                db, cep_for(1, i % HOT_CEPS)
+            ),
+            "repository_write": lambda i: repository.create_cep(
+                db, {**fake_cep_payload(cep_for(2, i)), "cep": cep_for(2, i)}
+            ),
+            "api_fetch": lambda i: api_service.fetch_cep_data(cep_for(3, i)),
+            "service_hit": lambda i: CEPSchema.model_validate(
+                service.get_or_fetch_cep_details(cep_for(1, i % HOT_CEPS))
+            ).model_dump_json(),
+            "service_record_hit": lambda i: cep_record_json(
+                service.get_cep_record(cep_for(1, i % HOT_CEPS))
+            ),
+            "service_miss": lambda i: service.get_or_fetch_cep_details(
+                cep_for(4, i)
+            ),
+            "service_invalid": lambda i: service.get_or_fetch_cep_details(
+                "123"
+            ),
+            "service_batch_miss": lambda i: service.get_or_fetch_many(
+                [cep_for(5, i * batch + j) for j in range(batch)]
+            ),
+        }
+        results = []
+        for name in args.scenarios:
+            iterations = args.iterations
+            if name == "service_batch_miss":
+                iterations = max(1, iterations // batch)
+            results.append(measure(
+                name, operations[name], iterations, warmup=args.warmup
+            ))
+        api_service.close()
+    return results
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Latência simulada do ViaCEP local.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Usa o CachedCEPRepository na frente do repositório.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Habilita as métricas por etapa durante a medição.",
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=SCENARIOS,
+        help="Cenário a executar (repetível; padrão: todos).",
+    )
+    parser.add_argument("--json", help="Grava os resultados neste arquivo.")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args(argv)
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+    results = run(args)
+    report(results, parameters=vars(args), json_path=args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Benchmark de inicialização: importação e primeira consulta de CEP.
+
+Cada iteração roda um processo novo, que importa a aplicação e resolve um
+CEP já gravado (base local) e um ausente (ViaCEP local), e mede também o
+modo de linha de comando (``main.py --batch``) com os mesmos dois CEPs,
+incluindo tudo o que ele faz ao iniciar::
+
+    python -m benchmarks.bench_startup --iterations 20 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.harness import percentile, report
+
+HIT_CEP = "10000000"
+MISS_CEP = "20000000"
+MAIN_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py"
+)
+
+
+def probe() -> None:
+    """Executado no processo filho: mede cada etapa e imprime em JSON."""
+    timings = {}
+    started_at = time.perf_counter()
+    from app.database import get_db
+    from app.repositories.cep_repository import CEPRepository
+    from app.services.api_service import APIService
+    from app.services.cep_service import CEPService
+    timings["import"] = time.perf_counter() - started_at
+
+    step_at = time.perf_counter()
+    db = next(get_db())
+    service = CEPService(
+        db_session=db,
+        api_service=APIService(),
+        cep_repository=CEPRepository(),
+    )
+    assert service.get_or_fetch_cep_details(HIT_CEP) is not None
+    timings["first_hit"] = time.perf_counter() - step_at
+
+    step_at = time.perf_counter()
+    assert service.get_or_fetch_cep_details(MISS_CEP) is not None
+    timings["first_miss"] = time.perf_counter() - step_at
+    db.close()
+    print(json.dumps(timings))
+
+
+def prepare_database(url: str) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.commands.init_db import init_db
+    from app.repositories.cep_repository import CEPRepository
+    from benchmarks.fake_viacep import fake_cep_payload
+
+    engine = create_engine(url)
+    init_db(bind=engine)
+    with Session(engine) as db:
+        CEPRepository().upsert_ceps(
+            db, [{**fake_cep_payload(HIT_CEP), "cep": HIT_CEP}]
+        )
+    engine.dispose()
+
+
+def summarize(name: str, values_seconds: List[float]) -> Dict[str, float]:
+    latencies = sorted(value * 1000 for value in values_seconds)
+    return {
+        "name": name,
+        "iterations": len(latencies),
+        "ops_per_second": round(1000 / latencies[len(latencies) // 2], 1),
+        "mean_ms": round(sum(latencies) / len(latencies), 4),
+        "p50_ms": round(percentile(latencies, 0.50), 4),
+        "p95_ms": round(percentile(latencies, 0.95), 4),
+        "p99_ms": round(percentile(latencies, 0.99), 4),
+        "max_ms": round(latencies[-1], 4),
+    }
+
+
+def run(args: argparse.Namespace) -> list:
+    from benchmarks.fake_viacep import FakeViaCEPServer
+
+    samples: Dict[str, List[float]] = {
+        "process": [], "import": [], "first_hit": [], "first_miss": [],
+        "cli_batch": [],
+    }
+    with tempfile.TemporaryDirectory() as directory, \
+            FakeViaCEPServer(args.latency_ms / 1000) as fake_api:
+        url = f"sqlite:///{os.path.join(directory, 'startup.db')}"
+        prepare_database(url)
+        env = {
+            **os.environ,
+            "DATABASE_URL": url,
+            "EXTERNAL_API_URL": fake_api.url,
+            "API_RETRIES": "0",
+            "LOG_FILE": os.path.join(directory, "startup.log"),
+        }
+        command = [sys.executable, "-m", "benchmarks.bench_startup", "--probe"]
+        for _ in range(args.iterations):
+            started_at = time.perf_counter()
+            output = subprocess.run(
+                command, env=env, capture_output=True, text=True, check=True
+            ).stdout
+            samples["process"].append(time.perf_counter() - started_at)
+            for name, value in json.loads(output).items():
+                samples[name].append(value)
+            # O CEP ausente precisa continuar ausente na próxima iteração
+            _delete_cep(url, MISS_CEP)
+
+            started_at = time.perf_counter()
+            subprocess.run(
+                [sys.executable, MAIN_PATH, "--batch", "-"],
+                input=f"{HIT_CEP}\n{MISS_CEP}\n",
+                env=env, capture_output=True, text=True, check=True,
+            )
+            samples["cli_batch"].append(time.perf_counter() - started_at)
+            _delete_cep(url, MISS_CEP)
+    return [summarize(name, values) for name, values in samples.items()]
+
+
+def _delete_cep(url: str, cep: str) -> None:
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(
+            text('DELETE FROM "CEP" WHERE cep = :cep'), {"cep": cep}
+        )
+    engine.dispose()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="Latência simulada do ViaCEP local.",
+    )
+    parser.add_argument("--json", help="Grava os resultados neste arquivo.")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.probe:
+        probe()
+        return
+    results = run(args)
+    report(results, parameters=vars(args), json_path=args.json)
+
+
+if __name__ == "__main__":
+    main()
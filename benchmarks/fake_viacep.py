@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_cep_payload(cep: str) -> dict:
+    return {
+        "cep": f"{cep[:5]}-{cep[5:]}",
+        "logradouro": f"Rua {cep}",
+        "complemento": "",
+        "unidade": "",
+        "bairro": "Centro",
+        "localidade": "São Paulo",
+        "uf": "SP",
+        "estado": "São Paulo",
+        "regiao": "Sudeste",
+        "ibge": "3550308",
+        "gia": "1004",
+        "ddd": "11",
+        "siafi": "7107",
+    }
+
+
+class FakeViaCEPServer:
+    """Servidor HTTP local com o formato de resposta da ViaCEP.
+
+    Atende ``/ws/<cep>/json/`` após ``latency_seconds``; CEPs iniciados por
+    ``9`` são respondidos com ``{"erro": true}``.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, port: int = 0):
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalhos e corpo num único segmento TCP, sem o atraso do
+            # algoritmo de Nagle com ACK atrasado
+            disable_nagle_algorithm = True
+            wbufsize = 1 << 16
+
+            def do_GET(self):
+                server.requests += 1
+                if server.latency_seconds:
+                    time.sleep(server.latency_seconds)
+                parts = self.path.strip("/").split("/")
+                if len(parts) != 3 or parts[0] != "ws" or parts[2] != "json":
+                    self.send_error(404)
+                    return
+                cep = parts[1]
+                payload = (
+                    {"erro": True} if cep.startswith("9")
+                    else fake_cep_payload(cep)
+                )
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/ws"
+
+    def start(self) -> "FakeViaCEPServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeViaCEPServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ViaCEP local para testes.")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    fake = FakeViaCEPServer(args.latency_ms / 1000, port=args.port)
+    print(f"ViaCEP local em {fake.url}")
+    try:
+        fake._httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake._httpd.server_close()
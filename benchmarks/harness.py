@@ -0,0 +1,80 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    last = len(sorted_values) - 1
+    index = min(last, round(fraction * last))
+    return sorted_values[index]
+
+
+def measure(
+    name: str,
+    operation: Callable[[int], object],
+    iterations: int,
+    warmup: int = 0,
+) -> Dict[str, float]:
+    """Executa ``operation(i)`` e resume as latências em milissegundos."""
+    for i in range(warmup):
+        operation(-1 - i)
+
+    latencies = []
+    started_at = time.perf_counter()
+    for i in range(iterations):
+        op_start = time.perf_counter()
+        operation(i)
+        latencies.append((time.perf_counter() - op_start) * 1000)
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "ops_per_second": round(iterations / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 4),
+        "p50_ms": round(percentile(latencies, 0.50), 4),
+        "p95_ms": round(percentile(latencies, 0.95), 4),
+        "p99_ms": round(percentile(latencies, 0.99), 4),
+        "max_ms": round(latencies[-1], 4),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def report(
+    results: List[Dict[str, float]],
+    parameters: dict,
+    json_path: Optional[str] = None,
+) -> None:
+    header = (f"{'cenário':<24}{'ops/s':>12}{'p50 ms':>10}"
+              f"{'p95 ms':>10}{'p99 ms':>10}")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result['name']:<24}{result['ops_per_second']:>12}"
+              f"{result['p50_ms']:>10}{result['p95_ms']:>10}"
+              f"{result['p99_ms']:>10}")
+
+    if json_path:
+        document = {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "parameters": parameters,
+            "results": results,
+        }
+        with open(json_path, "w", encoding="utf-8") as target:
+            json.dump(document, target, indent=2)
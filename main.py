@@ -1,39 +1,151 @@
+import argparse
+import json
 import logging
-from app.database import Base, engine, get_db
+import sys
+from itertools import islice
+from typing import Iterator, List, Optional, TextIO
+from app.database import get_db, get_read_sessionmaker
+from app.repositories.cached_cep_repository import CachedCEPRepository
+from app.repositories.cep_not_found_repository import CEPNotFoundRepository
 from app.repositories.cep_repository import CEPRepository
-from app.services.api_service import APIService
+from app.repositories.in_memory_cep_repository import InMemoryCEPRepository
+from app.repositories.write_behind_cep_repository import (
+    WriteBehindCEPRepository,
+)
 from app.services.cep_service import CEPService
-from app.schemas.cep_schema import CEPSchema
+from app.services.cep_refresher import create_cep_refresher
+from app.services.multi_provider_api_service import create_api_service
+from app.schemas.cep_schema import CEPSchema, cep_record_json
+from app.utils.cep_json_cache import CEPJSONCache
+from app.utils.cep_normalizer import normalize_ceps
 from app.config.logging_config import setup_logging
+from app.config.settings import settings
 from sqlalchemy.orm import Session
 
-# Setup logging first
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
-def init_db():
-    logger.info("Iniciando conexão com base de dados...")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Conexão com base de dados iniciada com sucesso.")
-
-
-def main():
-    init_db()
+def iter_chunks(lines: TextIO, chunk_size: int) -> Iterator[List[str]]:
+    ceps = (line.strip() for line in lines if line.strip())
+    while True:
+        chunk = list(islice(ceps, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(
+    cep_service: CEPService,
+    source: TextIO,
+    output: TextIO,
+    chunk_size: int,
+    json_cache: Optional[CEPJSONCache] = None,
+) -> None:
+    for chunk in iter_chunks(source, chunk_size):
+        ceps = normalize_ceps(chunk)
+        resultados = cep_service.get_records_or_fetch_many(ceps.unique)
+        for cep_input, cep in zip(chunk, ceps.sanitized):
+            record = resultados.get(cep) if cep else None
+            if record:
+                # JSON já serializado quando o CEP entrou no cache, se for
+                # da mesma verificação do registro revalidado pelo serviço
+                entry = json_cache.get(cep) if json_cache else None
+                if entry and entry.verified_at != record.verified_at:
+                    entry = None
+                try:
+                    output.write(
+                        entry.body.decode("utf-8") if entry
+                        else cep_record_json(record)
+                    )
+                    output.write("\n")
+                    continue
+                except Exception as e:
+                    logger.error(f"Erro ao validar dados do CEP {cep_input}: {e}")
+            output.write(json.dumps({"cep": cep_input, "erro": True}))
+            output.write("\n")
+        output.flush()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Consulta de CEPs.")
+    parser.add_argument(
+        "--batch",
+        metavar="ARQUIVO",
+        help="Arquivo com um CEP por linha ('-' para ler da entrada padrão). "
+             "Os resultados são emitidos em JSON lines na saída padrão.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Quantidade de CEPs resolvidos por lote (padrão: 1000).",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="SNAPSHOT",
+        help="Consulta o snapshot gerado por app.commands.build_index em "
+             "vez da base de dados.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Configurado aqui, e não na importação, para não atrasar quem só
+    # importa o módulo (testes, benchmarks)
+    setup_logging()
 
     db_generator = get_db()
     db_session: Session = next(db_generator)
 
+    write_behind = None
+    refresher = None
+    json_cache = None
     try:
-        api_service_instance = APIService()
-        cep_repository_instance = CEPRepository()
+        api_service_instance = create_api_service()
+        if args.index:
+            # Sem base de dados: a sessão nunca é usada (nem conectada)
+            cep_repository_instance = InMemoryCEPRepository.load(args.index)
+            not_found_repository_instance = None
+        else:
+            repository = CEPRepository(
+                read_sessionmaker=get_read_sessionmaker()
+            )
+            if settings.CEP_WRITE_BEHIND:
+                write_behind = WriteBehindCEPRepository(repository)
+                write_behind.start()
+                repository = write_behind
+            json_cache = CEPJSONCache(compress=False)
+            cep_repository_instance = CachedCEPRepository(
+                repository, json_cache=json_cache
+            )
+            refresher = create_cep_refresher(
+                api_service_instance, cep_repository_instance
+            )
+            not_found_repository_instance = CEPNotFoundRepository()
 
         cep_service = CEPService(
             db_session=db_session,
             api_service=api_service_instance,
-            cep_repository=cep_repository_instance
+            cep_repository=cep_repository_instance,
+            not_found_repository=not_found_repository_instance,
+            refresher=refresher,
         )
 
+        if args.batch:
+            if args.batch == "-":
+                run_batch(
+                    cep_service, sys.stdin, sys.stdout, args.chunk_size,
+                    json_cache,
+                )
+            else:
+                with open(args.batch, encoding="utf-8") as source:
+                    run_batch(
+                        cep_service, source, sys.stdout, args.chunk_size,
+                        json_cache,
+                    )
+            return
+
         cep_input = input("Digite o CEP para consulta: ")
         logger.info(f"Usuário digitou CEP: {cep_input}")
 
@@ -69,6 +181,10 @@ def main():
         logger.exception(f"Um erro ocorreu ao executar o método principal: {e}")
         print(f"Ocorreu um erro inesperado: {e}")
     finally:
+        if refresher is not None:
+            refresher.close()
+        if write_behind is not None:
+            write_behind.close()
         logger.info("Fechando sessão do banco de dados.")
         db_session.close()
 
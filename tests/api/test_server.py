@@ -0,0 +1,241 @@
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.api.server import create_app, create_worker_app, get_cep_service
+from app.database import get_db
+from app.models.cep import CEP
+from app.models.cep_record import CEPRecord, record_from_model
+from app.services.cep_refresher import CEPRefresher
+from app.services.cep_service import CEPService
+from app.utils.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def mock_cep_service():
+    return MagicMock(spec=CEPService)
+
+
+@pytest.fixture
+def client(mock_cep_service):
+    app = create_app()
+    app.dependency_overrides[get_cep_service] = lambda: mock_cep_service
+    app.dependency_overrides[get_db] = lambda: MagicMock(spec=Session)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def sample_cep_model():
+    return CEP(
+        cep="01001000",
+        logradouro="Praça da Sé",
+        complemento="lado ímpar",
+        unidade="",
+        bairro="Sé",
+        localidade="São Paulo",
+        uf="SP",
+        estado="São Paulo",
+        regiao="Sudeste",
+        ibge="3550308",
+        gia="1004",
+        ddd="11",
+        siafi="7107",
+    )
+
+
+def test_get_cep_found(client, mock_cep_service, sample_cep_model):
+    mock_cep_service.get_cep_record.return_value = record_from_model(
+        sample_cep_model
+    )
+
+    response = client.get("/cep/01001-000")
+
+    assert response.status_code == 200
+    assert response.json()["logradouro"] == "Praça da Sé"
+    assert response.json()["ddd"] == 11
+
+
+def test_get_cep_not_found(client, mock_cep_service):
+    mock_cep_service.get_cep_record.return_value = None
+
+    assert client.get("/cep/99999999").status_code == 404
+
+
+def test_get_cep_upstream_failure_is_not_404(client, mock_cep_service):
+    def unavailable(cep, failed):
+        failed.add("01001000")
+        return None
+
+    mock_cep_service.get_cep_record.side_effect = unavailable
+
+    response = client.get("/cep/01001000")
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) > 0
+
+
+def test_get_cep_invalid(client, mock_cep_service):
+    assert client.get("/cep/123").status_code == 400
+    mock_cep_service.get_cep_record.assert_not_called()
+
+
+def test_post_batch(client, mock_cep_service, sample_cep_model):
+    mock_cep_service.get_or_fetch_many.return_value = {
+        "01001000": sample_cep_model, "99999999": None
+    }
+
+    response = client.post(
+        "/cep/batch", json={"ceps": ["01001-000", "99999999"]}
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results["01001000"]["localidade"] == "São Paulo"
+    assert results["99999999"] is None
+
+
+def test_health_and_metrics(client):
+    health = client.get("/health").json()
+    assert health["status"] == "ok"
+    assert health["external_api"]["viacep"]["state"] == "closed"
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE cep_stage_duration_seconds histogram" in response.text
+    assert "cep_cache_entries 0" in response.text
+    assert "cep_api_circuit_state 0" in response.text
+
+
+def test_list_ceps_returns_next_cursor(
+    client, mock_cep_service, sample_cep_model
+):
+    mock_cep_service.list_ceps.return_value = [sample_cep_model]
+
+    response = client.get("/ceps", params={"prefix": "01001", "limit": 1})
+
+    assert response.status_code == 200
+    assert response.json()["next_after"] == "01001000"
+    mock_cep_service.list_ceps.assert_called_once_with(
+        prefix="01001", start=None, end=None, uf=None, localidade=None,
+        after=None, limit=1,
+    )
+
+
+def test_list_ceps_invalid_filter(client, mock_cep_service):
+    mock_cep_service.list_ceps.side_effect = ValueError("Faixa inválida.")
+
+    assert client.get("/ceps").status_code == 400
+
+
+def test_list_ceps_database_error(client, mock_cep_service):
+    mock_cep_service.list_ceps.side_effect = OperationalError(
+        "SELECT", {}, Exception("base fora")
+    )
+
+    assert client.get("/ceps", params={"uf": "SP"}).status_code == 503
+
+
+def test_get_cep_incomplete_record(client, mock_cep_service):
+    mock_cep_service.get_cep_record.return_value = CEPRecord("01001000")
+
+    assert client.get("/cep/01001000").status_code == 500
+
+
+def test_get_cep_from_provider_without_optional_fields(
+    client, mock_cep_service
+):
+    mock_cep_service.get_cep_record.return_value = CEPRecord(
+        cep="20040020", logradouro="Praça Pio X", bairro="Centro",
+        localidade="Rio de Janeiro", uf="RJ", estado="Rio de Janeiro",
+        regiao="Sudeste",
+    )
+
+    response = client.get("/cep/20040020")
+
+    assert response.status_code == 200
+    assert response.json()["ddd"] is None
+    assert response.json()["logradouro"] == "Praça Pio X"
+
+
+def test_get_cep_serves_cached_json(
+    client, mock_cep_service, sample_cep_model
+):
+    mock_cep_service.get_cep_record.return_value = record_from_model(
+        sample_cep_model
+    )
+
+    first = client.get("/cep/01001-000")
+    second = client.get("/cep/01001000")
+
+    assert second.content == first.content
+    assert second.json()["siafi"] == 7107
+    mock_cep_service.get_cep_record.assert_called_once()
+
+
+@pytest.fixture
+def refresher(client):
+    refresher = MagicMock(spec=CEPRefresher)
+    refresher.FRESH = CEPRefresher.FRESH
+    refresher.STALE = CEPRefresher.STALE
+    refresher.EXPIRED = CEPRefresher.EXPIRED
+    client.app.state.cep_refresher = refresher
+    return refresher
+
+
+def test_get_cep_cached_json_respects_freshness(
+    client, mock_cep_service, sample_cep_model, refresher
+):
+    mock_cep_service.get_cep_record.return_value = record_from_model(
+        sample_cep_model
+    )
+    client.get("/cep/01001000")
+
+    # Prazo brando vencido: os bytes do cache e a revalidação agendada
+    refresher.freshness.return_value = CEPRefresher.STALE
+    assert client.get("/cep/01001000").status_code == 200
+    refresher.schedule.assert_called_once_with("01001000")
+    assert mock_cep_service.get_cep_record.call_count == 1
+
+    # Vencido: a consulta passa pelo serviço, que revalida o CEP
+    refresher.freshness.return_value = CEPRefresher.EXPIRED
+    assert client.get("/cep/01001000").status_code == 200
+    assert mock_cep_service.get_cep_record.call_count == 2
+
+
+def test_get_cep_gzip_variant(client, mock_cep_service, sample_cep_model):
+    client.app.state.json_cache.compress = True
+    mock_cep_service.get_cep_record.return_value = record_from_model(
+        sample_cep_model
+    )
+
+    response = client.get(
+        "/cep/01001000", headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json()["logradouro"] == "Praça da Sé"
+
+
+def test_worker_app_configures_logging_in_lifespan(mocker):
+    listener = MagicMock()
+    setup = mocker.patch(
+        "app.api.server.setup_logging", return_value=listener
+    )
+    app = create_worker_app()
+
+    setup.assert_not_called()
+    with TestClient(app):
+        setup.assert_called_once_with()
+    listener.stop.assert_called_once_with()
+
+
+def test_create_app_respects_metrics_setting(monkeypatch):
+    registry = MetricsRegistry(enabled=False)
+    monkeypatch.setattr("app.api.server.metrics", registry)
+
+    create_app()
+
+    assert registry.enabled is False
@@ -0,0 +1,17 @@
+import json
+from app.commands.build_index import build_index
+from app.repositories.in_memory_cep_repository import InMemoryCEPRepository
+
+
+def test_build_index_from_dump(tmp_path):
+    dump = tmp_path / "ceps.jsonl"
+    dump.write_text("\n".join(json.dumps(record) for record in [
+        {"cep": "01001-000", "localidade": "São Paulo", "uf": "SP"},
+        {"cep": "20040-020", "localidade": "Rio de Janeiro", "uf": "RJ"},
+    ]), encoding="utf-8")
+    output = str(tmp_path / "ceps.idx")
+
+    assert build_index(output, dump_path=str(dump)) == 2
+
+    index = InMemoryCEPRepository.load(output)
+    assert index.get_cep(None, "20040020").localidade == "Rio de Janeiro"
@@ -0,0 +1,203 @@
+import json
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.commands import enrich as enrich_module
+from app.commands.enrich import enrich, part_path
+from app.commands.init_db import init_db
+from app.models.cep_record import CEPRecord
+from app.repositories.cep_repository import CEPRepository
+
+
+def full_record(cep):
+    record = CEPRecord(cep=cep, **{
+        field: "1" for field in CEPRecord._fields[1:13]
+    })
+    return record._replace(uf="SP")
+
+
+def resolve(ceps, failed=None):
+    # Encontra só os CEPs terminados em 0
+    return {
+        cep: full_record(cep) if cep.endswith("0") else None
+        for cep in (c.replace("-", "") for c in ceps)
+    }
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    service = MagicMock()
+    service.get_records_or_fetch_many.side_effect = resolve
+    monkeypatch.setattr(enrich_module, "_worker", service)
+    return service
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "ceps.txt"
+    path.write_text(
+        "01001-000\n01001001\n\n20040020\n30130010\n40000001\n",
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def read_parts(output_dir, shards):
+    return [
+        json.loads(line)
+        for shard in range(shards)
+        for line in open(part_path(output_dir, shard), encoding="utf-8")
+    ]
+
+
+def test_enrich_writes_one_part_per_shard(tmp_path, input_file, worker):
+    output_dir = str(tmp_path / "saida")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        summary = enrich(
+            input_file, output_dir, workers=2, shard_size=2,
+            progress=None, executor=executor,
+        )
+
+    assert summary["ceps"] == 5
+    assert summary["found"] == 3
+    assert summary["shards"] == 3
+    rows = read_parts(output_dir, 3)
+    assert [row["cep"] for row in rows] == [
+        "01001000", "01001001", "20040020", "30130010", "40000001",
+    ]
+    assert rows[0]["uf"] == "SP"
+    assert rows[1] == {
+        "cep": "01001001", "erro": True, "status": "not_found",
+    }
+
+
+def test_enrich_resumes_without_refetching(tmp_path, input_file, worker):
+    output_dir = str(tmp_path / "saida")
+    # Um erro por shard restante: qualquer um deles pode ser coletado antes
+    worker.get_records_or_fetch_many.side_effect = [
+        resolve(["01001-000", "01001001"]),
+        RuntimeError("worker caiu"),
+        RuntimeError("worker caiu"),
+    ]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(RuntimeError):
+            enrich(
+                input_file, output_dir, workers=1, shard_size=2,
+                progress=None, executor=executor,
+            )
+
+    worker.get_records_or_fetch_many.reset_mock()
+    worker.get_records_or_fetch_many.side_effect = resolve
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        summary = enrich(
+            input_file, output_dir, workers=1, shard_size=2,
+            progress=None, executor=executor,
+        )
+
+    assert summary["skipped_shards"] == 1
+    assert summary["shards"] == 2
+    requested = [
+        call.args[0]
+        for call in worker.get_records_or_fetch_many.call_args_list
+    ]
+    assert sorted(requested) == [["20040020", "30130010"], ["40000001"]]
+    assert len(read_parts(output_dir, 3)) == 5
+
+
+def test_enrich_rejects_output_of_another_run(tmp_path, input_file, worker):
+    output_dir = str(tmp_path / "saida")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        enrich(
+            input_file, output_dir, shard_size=2,
+            progress=None, executor=executor,
+        )
+
+    with pytest.raises(ValueError):
+        enrich(input_file, output_dir, shard_size=3, progress=None)
+
+
+def test_enrich_does_not_checkpoint_shards_with_fetch_errors(
+    tmp_path, input_file, worker
+):
+    output_dir = str(tmp_path / "saida")
+
+    def unreachable_api(ceps, failed):
+        # API fora: os CEPs terminados em 1 ficam sem resposta
+        results = resolve(ceps)
+        failed.update(
+            cep for cep, record in results.items() if record is None
+        )
+        return results
+
+    worker.get_records_or_fetch_many.side_effect = unreachable_api
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        summary = enrich(
+            input_file, output_dir, workers=1, shard_size=2,
+            progress=None, executor=executor,
+        )
+
+    assert summary["failed_shards"] == 2
+    assert summary["failed_ceps"] == 2
+    assert summary["shards"] == 1
+    assert os.path.exists(part_path(output_dir, 1))
+    assert not os.path.exists(part_path(output_dir, 0))
+    assert not os.path.exists(part_path(output_dir, 0) + ".tmp")
+
+    # Com a API de volta, só os shards com falha são refeitos
+    worker.get_records_or_fetch_many.reset_mock()
+    worker.get_records_or_fetch_many.side_effect = resolve
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        summary = enrich(
+            input_file, output_dir, workers=1, shard_size=2,
+            progress=None, executor=executor,
+        )
+
+    assert summary["skipped_shards"] == 1
+    assert summary["failed_shards"] == 0
+    rows = read_parts(output_dir, 3)
+    assert rows[1]["status"] == "not_found"
+    assert rows[4]["status"] == "not_found"
+
+
+def test_enrich_with_spawned_workers(tmp_path, monkeypatch):
+    # Pool real (spawn): init_worker em cada processo, process_shard
+    # serializado por pickle e limpeza via Finalize ao encerrar
+    database = tmp_path / "ceps.db"
+    engine = create_engine(f"sqlite:///{database}")
+    init_db(bind=engine)
+    with Session(engine) as db:
+        CEPRepository().upsert_ceps(db, [
+            {**full_record("01001000")._asdict(), "verified_at": None},
+        ])
+    engine.dispose()
+    log_file = tmp_path / "worker.log"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{database}")
+    # Nenhum servidor na porta 9: a API externa está inacessível
+    monkeypatch.setenv("EXTERNAL_API_URL", "http://127.0.0.1:9/ws")
+    monkeypatch.setenv("API_PROVIDERS", "viacep")
+    monkeypatch.setenv("API_RETRIES", "0")
+    monkeypatch.setenv("LOG_FILE", str(log_file))
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    monkeypatch.setenv("LOG_QUEUE", "false")
+    input_path = tmp_path / "ceps.txt"
+    input_path.write_text("01001-000\n123\n20040020\n", encoding="utf-8")
+    output_dir = str(tmp_path / "saida")
+
+    summary = enrich(
+        str(input_path), output_dir, workers=2, shard_size=2, progress=None
+    )
+
+    assert summary["shards"] == 1
+    assert summary["failed_shards"] == 1
+    rows = read_parts(output_dir, 1)
+    assert rows[0]["cep"] == "01001000"
+    assert rows[0]["uf"] == "SP"
+    assert rows[1] == {"cep": "123", "erro": True, "status": "invalid"}
+    assert not os.path.exists(part_path(output_dir, 1))
+    assert "encerrado" in log_file.read_text(encoding="utf-8")
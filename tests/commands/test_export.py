@@ -0,0 +1,82 @@
+import os
+import pytest
+from sqlalchemy.orm import Session
+
+from app.commands.build_index import build_index
+from app.commands.export import export
+from app.repositories.cep_repository import CEPRepository
+from app.repositories.in_memory_cep_repository import InMemoryCEPRepository
+from app.utils.cep_dump import iter_cep_records
+
+
+@pytest.fixture
+def seeded(db_session: Session):
+    CEPRepository().upsert_ceps(db_session, [
+        {"cep": "01001000", "logradouro": "Praça da Sé", "uf": "SP",
+         "estado": "São Paulo", "ddd": "11"},
+        {"cep": "20040020", "logradouro": "Praça Pio X", "uf": "RJ",
+         "estado": "Rio de Janeiro", "ddd": "21"},
+        {"cep": "01310100", "logradouro": "Avenida Paulista", "uf": "SP",
+         "estado": "São Paulo", "ddd": "11"},
+    ])
+    return db_session
+
+
+@pytest.mark.parametrize("name", ["ceps.jsonl.gz", "ceps.parquet",
+                                  "ceps.arrow"])
+def test_export_round_trip(seeded, tmp_path, name):
+    if not name.endswith(".gz"):
+        pytest.importorskip("pyarrow")
+    output = str(tmp_path / name)
+
+    summary = export(
+        output, page_size=2, progress=None, session_factory=lambda: seeded
+    )
+
+    assert summary["exported"] == 3
+    assert not os.path.exists(output + ".tmp")
+    records = list(iter_cep_records(output))
+    assert [record["cep"] for record in records] == [
+        "01001000", "01310100", "20040020",
+    ]
+    assert records[1]["logradouro"] == "Avenida Paulista"
+    assert records[2]["estado"] == "Rio de Janeiro"
+    assert records[0]["complemento"] is None
+
+
+def test_columnar_export_uses_dictionaries(seeded, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc  # noqa: F401
+    output = str(tmp_path / "ceps.arrow")
+
+    export(output, page_size=2, progress=None, session_factory=lambda: seeded)
+
+    table = pa.ipc.open_file(output).read_all()
+    assert pa.types.is_dictionary(table.schema.field("uf").type)
+    assert not pa.types.is_dictionary(table.schema.field("logradouro").type)
+    assert table.column("uf").to_pylist() == ["SP", "SP", "RJ"]
+
+
+def test_export_seeds_offline_index(seeded, tmp_path):
+    pytest.importorskip("pyarrow")
+    dump = str(tmp_path / "ceps.parquet")
+    export(dump, progress=None, session_factory=lambda: seeded)
+
+    index_path = str(tmp_path / "ceps.idx")
+    assert build_index(index_path, dump_path=dump) == 3
+    index = InMemoryCEPRepository.load(index_path)
+    assert index.get_cep(None, "20040020").logradouro == "Praça Pio X"
+
+
+def test_export_failure_keeps_previous_file(tmp_path):
+    output = tmp_path / "ceps.jsonl.gz"
+    output.write_bytes(b"anterior")
+
+    def broken_session():
+        raise RuntimeError("sem base")
+
+    with pytest.raises(RuntimeError):
+        export(str(output), progress=None, session_factory=broken_session)
+
+    assert output.read_bytes() == b"anterior"
+    assert not os.path.exists(str(output) + ".tmp")
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app.commands.init_db import init_db
+from app.database import guard_schema, missing_columns
+from app.repositories.cep_repository import CEPRepository
+
+
+def test_init_db_creates_tables_and_is_idempotent():
+    engine = create_engine("sqlite://")
+
+    init_db(bind=engine)
+    init_db(bind=engine)
+
+    tables = set(inspect(engine).get_table_names())
+    assert {"CEP", "CEP_NOT_FOUND"} <= tables
+
+
+def legacy_engine():
+    # Tabela CEP de antes das datas de gravação e confirmação
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    guard_schema(engine)
+    with engine.begin() as connection:
+        connection.execute(text(
+            'CREATE TABLE "CEP" (id INTEGER PRIMARY KEY, cep VARCHAR(9), '
+            'logradouro VARCHAR(255), complemento VARCHAR(100), '
+            'unidade VARCHAR(100), bairro VARCHAR(100), '
+            'localidade VARCHAR(100), uf VARCHAR(2), estado VARCHAR(100), '
+            'regiao VARCHAR(100), ibge VARCHAR(7), gia VARCHAR(7), '
+            'ddd VARCHAR(2), siafi VARCHAR(7))'
+        ))
+        connection.execute(text(
+            "INSERT INTO \"CEP\" (cep, logradouro) "
+            "VALUES ('01001000', 'Praça da Sé')"
+        ))
+    return engine
+
+
+def test_query_on_outdated_schema_asks_for_init_db():
+    engine = legacy_engine()
+
+    assert missing_columns(engine) == {"CEP": ["fetched_at", "verified_at"]}
+    with Session(engine) as db:
+        with pytest.raises(RuntimeError, match="init_db"):
+            CEPRepository().get_cep_record(db, "01001000")
+        # O catálogo é lido uma vez; as falhas seguintes repetem o erro
+        with pytest.raises(RuntimeError, match="fetched_at"):
+            CEPRepository().get_cep(db, "01001000")
+
+
+def test_schema_guard_keeps_other_errors():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    guard_schema(engine)
+    init_db(bind=engine)
+
+    with engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM "OUTRA"'))
+
+
+def test_init_db_adds_missing_columns():
+    engine = legacy_engine()
+
+    init_db(bind=engine)
+
+    assert missing_columns(engine) == {}
+    with Session(engine) as db:
+        record = CEPRepository().get_cep_record(db, "01001000")
+    assert record.logradouro == "Praça da Sé"
+    assert record.verified_at is None
@@ -0,0 +1,73 @@
+import csv
+import json
+import pytest
+from sqlalchemy.orm import Session
+
+from app.commands.preload import preload
+from app.models.cep import CEP
+from app.utils.cep_dump import CEP_DUMP_FIELDS
+
+
+@pytest.fixture
+def sample_records():
+    return [
+        {"cep": "01001-000", "logradouro": "Praça da Sé", "uf": "SP",
+         "ddd": 11},
+        {"cep": "20040-020", "logradouro": "Praça Pio X", "uf": "RJ",
+         "ddd": 21},
+        {"cep": "123", "logradouro": "Inválido"},
+    ]
+
+
+def test_preload_jsonl_in_chunks(
+    db_session: Session, tmp_path, sample_records
+):
+    path = tmp_path / "ceps.jsonl"
+    path.write_text(
+        "\n".join(json.dumps(record) for record in sample_records),
+        encoding="utf-8",
+    )
+
+    summary = preload(
+        str(path),
+        chunk_size=2,
+        progress=None,
+        session_factory=lambda: db_session,
+    )
+
+    assert summary["processed"] == 2
+    assert summary["written"] == 2
+    assert summary["skipped"] == 1
+    loaded = {c.cep: c for c in db_session.query(CEP).all()}
+    assert set(loaded) == {"01001000", "20040020"}
+    assert loaded["01001000"].ddd == "11"
+
+
+def test_preload_csv_keeps_existing_rows_unless_updating(
+    db_session: Session, tmp_path, sample_records
+):
+    path = tmp_path / "ceps.csv"
+    with open(path, "w", encoding="utf-8", newline="") as target:
+        writer = csv.DictWriter(target, fieldnames=CEP_DUMP_FIELDS)
+        writer.writeheader()
+        writer.writerows(sample_records[:1])
+    db_session.add(CEP(cep="01001000", logradouro="Antigo"))
+    db_session.commit()
+
+    summary = preload(
+        str(path), progress=None, session_factory=lambda: db_session
+    )
+    assert db_session.query(CEP).one().logradouro == "Antigo"
+    # O CEP existente foi processado, mas não gravado
+    assert summary["processed"] == 1
+    assert summary["written"] == 0
+
+    summary = preload(
+        str(path),
+        update_existing=True,
+        progress=None,
+        session_factory=lambda: db_session,
+    )
+    db_session.expire_all()
+    assert db_session.query(CEP).one().logradouro == "Praça da Sé"
+    assert summary["written"] == 1
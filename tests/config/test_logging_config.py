@@ -0,0 +1,53 @@
+import io
+import logging
+import queue
+
+from app.config.logging_config import (
+    BatchingQueueListener,
+    DroppingQueueHandler,
+    SamplingFilter,
+)
+
+
+def make_record(level: int, msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord(
+        "app.services.cep_service", level, __file__, 1, msg, args, None
+    )
+
+
+def test_sampling_filter_keeps_warnings_and_samples_info():
+    sampling_filter = SamplingFilter(rate=0.0)
+
+    assert not sampling_filter.filter(make_record(logging.INFO, "info"))
+    assert sampling_filter.filter(make_record(logging.WARNING, "aviso"))
+    assert SamplingFilter(rate=1.0).filter(make_record(logging.INFO, "info"))
+
+
+def test_queue_handler_drops_when_full_and_resolves_message():
+    log_queue = queue.Queue(maxsize=1)
+    handler = DroppingQueueHandler(log_queue)
+
+    handler.handle(make_record(logging.INFO, "CEP %s salvo.", "01001000"))
+    handler.handle(make_record(logging.INFO, "descartado"))
+
+    record = log_queue.get_nowait()
+    assert record.msg == "CEP 01001000 salvo."
+    assert record.args is None
+    assert handler.dropped == 1
+
+
+def test_batching_listener_writes_all_records_on_stop():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue = queue.Queue()
+    listener = BatchingQueueListener(
+        log_queue, handler, batch_size=2, flush_interval=0.01
+    )
+    listener.start()
+
+    for i in range(5):
+        log_queue.put(make_record(logging.INFO, f"linha {i}"))
+    listener.stop()
+
+    assert stream.getvalue().splitlines() == [f"linha {i}" for i in range(5)]
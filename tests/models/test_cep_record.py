@@ -0,0 +1,13 @@
+from app.models.cep import CEP
+from app.models.cep_record import CEPRecord, record_from_model
+from app.repositories.cep_repository import CEP_ROW_COLUMNS
+
+
+def test_record_fields_follow_table_columns():
+    assert CEPRecord._fields == tuple(CEP_ROW_COLUMNS)
+
+
+def test_record_from_model():
+    record = record_from_model(CEP(cep="01001000", uf="SP"))
+
+    assert record == CEPRecord(cep="01001000", uf="SP")
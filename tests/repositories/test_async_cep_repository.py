@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.repositories.async_cep_repository import AsyncCEPRepository
+
+
+@pytest.fixture
+def sample_cep_data():
+    return {
+        "cep": "87654321",
+        "logradouro": "Avenida Principal",
+        "bairro": "Centro",
+        "localidade": "Cidade Exemplo",
+        "uf": "RJ",
+        "ddd": "21",
+    }
+
+
+def run_with_session(coro_fn):
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with session_factory() as db:
+                return await coro_fn(db)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_async_create_and_get_cep(sample_cep_data):
+    repository = AsyncCEPRepository()
+
+    async def scenario(db):
+        created = await repository.create_cep(db, sample_cep_data.copy())
+        duplicate = await repository.create_cep(db, sample_cep_data.copy())
+        found = await repository.get_cep(db, "87654321")
+        missing = await repository.get_cep(db, "00000000")
+        return created, duplicate, found, missing
+
+    created, duplicate, found, missing = run_with_session(scenario)
+    assert created.id is not None
+    assert duplicate.id == created.id
+    assert found.logradouro == "Avenida Principal"
+    assert missing is None
+
+
+def test_async_upsert_ceps(sample_cep_data):
+    repository = AsyncCEPRepository()
+
+    async def scenario(db):
+        await repository.create_cep(db, sample_cep_data.copy())
+        upserted = await repository.upsert_ceps(db, [
+            {**sample_cep_data, "logradouro": "Avenida Nova"},
+            {**sample_cep_data, "cep": "87654322"},
+        ])
+        db.expire_all()
+        found = await repository.get_ceps(db, ["87654321", "87654322"])
+        return upserted, found
+
+    upserted, found = run_with_session(scenario)
+    assert sorted(c.cep for c in upserted) == ["87654321", "87654322"]
+    assert {c.cep: c.logradouro for c in found}["87654321"] == "Avenida Nova"
+
+
+def test_async_find_by_prefix_and_locality():
+    repository = AsyncCEPRepository()
+
+    async def scenario(db):
+        await repository.upsert_ceps(db, [
+            {"cep": "01310100", "uf": "SP", "localidade": "São Paulo"},
+            {"cep": "01310200", "uf": "SP", "localidade": "São Paulo"},
+            {"cep": "20040020", "uf": "RJ", "localidade": "Rio de Janeiro"},
+        ])
+        by_prefix = await repository.find_by_prefix(
+            db, "0131", after="01310100"
+        )
+        by_uf = await repository.find_by_locality(db, "RJ")
+        return by_prefix, by_uf
+
+    by_prefix, by_uf = run_with_session(scenario)
+    assert [cep.cep for cep in by_prefix] == ["01310200"]
+    assert [cep.localidade for cep in by_uf] == ["Rio de Janeiro"]
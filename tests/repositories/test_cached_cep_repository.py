@@ -0,0 +1,172 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+
+from app.interfaces.cep_repository_interface import ICEPRepository
+from app.models.cep import CEP
+from app.models.cep_record import CEPRecord
+from app.repositories.cached_cep_repository import CachedCEPRepository
+from app.utils.cep_json_cache import CEPJSONCache
+
+
+@pytest.fixture
+def mock_db_session():
+    return MagicMock(spec=Session)
+
+
+@pytest.fixture
+def mock_cep_repository():
+    return MagicMock(spec=ICEPRepository)
+
+
+@pytest.fixture
+def cached_repository(mock_cep_repository):
+    return CachedCEPRepository(
+        mock_cep_repository,
+        max_size=10,
+        ttl_seconds=60,
+        negative_ttl_seconds=60,
+    )
+
+
+@pytest.fixture
+def sample_cep_model():
+    return CEP(id=1, cep="12345678", logradouro="Rua Cache", uf="SP")
+
+
+def test_get_cep_hits_database_once(
+    cached_repository, mock_cep_repository, mock_db_session, sample_cep_model
+):
+    mock_cep_repository.get_cep.return_value = sample_cep_model
+
+    first = cached_repository.get_cep(mock_db_session, "12345678")
+    second = cached_repository.get_cep(mock_db_session, "12345678")
+
+    assert first is sample_cep_model
+    assert second is not sample_cep_model
+    assert second.logradouro == "Rua Cache"
+    mock_cep_repository.get_cep.assert_called_once_with(
+        mock_db_session, "12345678"
+    )
+    assert cached_repository.stats()["hits"] == 1
+
+
+def test_get_cep_caches_negative_result(
+    cached_repository, mock_cep_repository, mock_db_session
+):
+    mock_cep_repository.get_cep.return_value = None
+
+    assert cached_repository.get_cep(mock_db_session, "00000000") is None
+    assert cached_repository.get_cep(mock_db_session, "00000000") is None
+
+    mock_cep_repository.get_cep.assert_called_once()
+    assert cached_repository.stats()["negative_hits"] == 1
+
+
+def test_create_cep_replaces_negative_entry(
+    cached_repository, mock_cep_repository, mock_db_session, sample_cep_model
+):
+    mock_cep_repository.get_cep.return_value = None
+    mock_cep_repository.create_cep.return_value = sample_cep_model
+    cached_repository.get_cep(mock_db_session, "12345678")
+
+    cached_repository.create_cep(mock_db_session, {"cep": "12345678"})
+
+    assert cached_repository.get_cep(
+        mock_db_session, "12345678"
+    ).logradouro == "Rua Cache"
+    mock_cep_repository.get_cep.assert_called_once()
+
+
+def test_get_ceps_only_queries_uncached(
+    cached_repository, mock_cep_repository, mock_db_session, sample_cep_model
+):
+    mock_cep_repository.get_cep.return_value = sample_cep_model
+    cached_repository.get_cep(mock_db_session, "12345678")
+    mock_cep_repository.get_ceps.return_value = []
+
+    found = cached_repository.get_ceps(
+        mock_db_session, ["12345678", "87654321"]
+    )
+
+    assert [c.cep for c in found] == ["12345678"]
+    mock_cep_repository.get_ceps.assert_called_once_with(
+        mock_db_session, ["87654321"]
+    )
+    assert cached_repository.get_ceps(mock_db_session, ["87654321"]) == []
+    mock_cep_repository.get_ceps.assert_called_once()
+
+
+def test_get_cep_record_shares_cache_with_entities(
+    cached_repository, mock_cep_repository, mock_db_session, sample_cep_model
+):
+    mock_cep_repository.get_cep_records.return_value = [
+        CEPRecord(cep="12345678", logradouro="Rua Cache", uf="SP")
+    ]
+
+    record = cached_repository.get_cep_record(mock_db_session, "12345678")
+    cached_model = cached_repository.get_cep(mock_db_session, "12345678")
+    cached_record = cached_repository.get_cep_record(
+        mock_db_session, "12345678"
+    )
+
+    assert record.logradouro == cached_record.logradouro == "Rua Cache"
+    assert cached_model.uf == "SP"
+    mock_cep_repository.get_cep_records.assert_called_once()
+    mock_cep_repository.get_cep.assert_not_called()
+
+
+def test_json_cache_follows_stored_ceps(
+    mock_cep_repository, mock_db_session
+):
+    json_cache = CEPJSONCache(max_size=10, ttl_seconds=60, compress=False)
+    cached_repository = CachedCEPRepository(
+        mock_cep_repository, max_size=10, ttl_seconds=60,
+        json_cache=json_cache,
+    )
+    db_cep = CEP(
+        cep="01001000", logradouro="Praça da Sé", complemento="",
+        unidade="", bairro="Sé", localidade="São Paulo", uf="SP",
+        estado="São Paulo", regiao="Sudeste", ibge="3550308", gia="1004",
+        ddd="11", siafi="7107",
+    )
+    mock_cep_repository.create_cep.return_value = db_cep
+
+    cached_repository.create_cep(mock_db_session, {"cep": "01001000"})
+
+    entry = json_cache.get("01001000")
+    assert json.loads(entry.body)["logradouro"] == "Praça da Sé"
+
+    cached_repository.invalidate("01001000")
+    assert json_cache.get("01001000") is None
+
+
+def test_json_cache_skips_invalid_records(
+    mock_cep_repository, mock_db_session, sample_cep_model
+):
+    json_cache = CEPJSONCache(max_size=10, ttl_seconds=60, compress=False)
+    cached_repository = CachedCEPRepository(
+        mock_cep_repository, max_size=10, ttl_seconds=60,
+        json_cache=json_cache,
+    )
+    mock_cep_repository.get_cep.return_value = sample_cep_model
+
+    assert cached_repository.get_cep(mock_db_session, "12345678") is not None
+    assert json_cache.get("12345678") is None
+
+
+def test_database_error_is_not_cached_as_not_found(
+    cached_repository, mock_cep_repository, mock_db_session, sample_cep_model
+):
+    mock_cep_repository.get_cep.side_effect = [
+        Exception("base fora"), sample_cep_model,
+    ]
+
+    with pytest.raises(Exception, match="base fora"):
+        cached_repository.get_cep(mock_db_session, "12345678")
+
+    assert cached_repository.get_cep(
+        mock_db_session, "12345678"
+    ) is sample_cep_model
+    assert cached_repository.negative_hits == 0
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.cep_not_found import CEPNotFound
+from app.repositories.cep_not_found_repository import CEPNotFoundRepository
+
+
+@pytest.fixture
+def not_found_repository():
+    return CEPNotFoundRepository(ttl_seconds=3600, cache_max_size=10)
+
+
+def test_mark_and_check_not_found(
+    db_session: Session, not_found_repository: CEPNotFoundRepository
+):
+    assert not not_found_repository.is_not_found(db_session, "99999999")
+
+    not_found_repository.mark_not_found(db_session, ["99999999"])
+
+    assert not_found_repository.is_not_found(db_session, "99999999")
+    assert db_session.query(CEPNotFound).count() == 1
+
+
+def test_get_not_found_reads_database_and_fills_cache(
+    db_session: Session, not_found_repository: CEPNotFoundRepository
+):
+    not_found_repository.mark_not_found(db_session, ["99999999", "99999998"])
+    fresh_repository = CEPNotFoundRepository(ttl_seconds=3600)
+
+    found = fresh_repository.get_not_found(
+        db_session, ["99999999", "99999998", "12345678"]
+    )
+
+    assert found == {"99999999", "99999998"}
+    assert fresh_repository.cache.get("99999999") is True
+
+
+def test_expired_entries_are_ignored(db_session: Session):
+    repository = CEPNotFoundRepository(ttl_seconds=-1)
+    repository.mark_not_found(db_session, ["99999999"])
+    repository.cache.clear()
+
+    assert not repository.is_not_found(db_session, "99999999")
+
+
+def test_mark_not_found_renews_existing_entry(
+    db_session: Session, not_found_repository: CEPNotFoundRepository
+):
+    not_found_repository.mark_not_found(db_session, ["99999999"])
+    not_found_repository.mark_not_found(db_session, ["99999999"])
+
+    assert db_session.query(CEPNotFound).count() == 1
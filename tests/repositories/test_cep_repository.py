@@ -1,5 +1,8 @@
+import datetime
 import pytest
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.models.cep_record import CEPRecord
 from app.repositories.cep_repository import CEPRepository
 
 
@@ -85,5 +88,248 @@ def test_get_cep_database_error(
     mocker.patch.object(
         db_session, "query", side_effect=Exception("Simulated DB query error")
     )
-    retrieved_cep = cep_repository_instance.get_cep(db_session, "12345678")
-    assert retrieved_cep is None
+    # A falha não pode ser confundida com um CEP ausente
+    with pytest.raises(Exception, match="Simulated DB query error"):
+        cep_repository_instance.get_cep(db_session, "12345678")
+
+
+def test_get_ceps_returns_only_existing(
+    db_session: Session,
+    cep_repository_instance: CEPRepository,
+    sample_cep_data: dict
+):
+    cep_repository_instance.create_cep(db_session, sample_cep_data.copy())
+    retrieved = cep_repository_instance.get_ceps(
+        db_session, [sample_cep_data["cep"], "00000000"]
+    )
+    assert [c.cep for c in retrieved] == [sample_cep_data["cep"]]
+
+
+def test_create_ceps_bulk_insert(
+    db_session: Session,
+    cep_repository_instance: CEPRepository,
+    sample_cep_data: dict
+):
+    second = {**sample_cep_data, "cep": "87654322"}
+    created = cep_repository_instance.create_ceps(
+        db_session, [sample_cep_data.copy(), second]
+    )
+    assert sorted(c.cep for c in created) == ["87654321", "87654322"]
+    assert all(c.id is not None for c in created)
+
+
+def test_create_ceps_database_error(
+    db_session: Session,
+    cep_repository_instance: CEPRepository,
+    sample_cep_data: dict,
+    mocker,
+):
+    mocker.patch.object(
+        db_session, "commit", side_effect=Exception("Simulated DB error")
+    )
+    mocker.patch.object(db_session, "rollback")
+    created = cep_repository_instance.create_ceps(
+        db_session, [sample_cep_data]
+    )
+    assert created == []
+    db_session.rollback.assert_called_once()
+
+
+def test_create_cep_duplicate_returns_existing_row(
+    db_session: Session,
+    cep_repository_instance: CEPRepository,
+    sample_cep_data: dict,
+    mocker,
+):
+    existing = object()
+    mocker.patch.object(
+        db_session,
+        "commit",
+        side_effect=IntegrityError("INSERT", {}, Exception("duplicate")),
+    )
+    mocker.patch.object(db_session, "rollback")
+    mocker.patch.object(
+        cep_repository_instance, "_query_cep", return_value=existing
+    )
+
+    created_cep = cep_repository_instance.create_cep(
+        db_session, sample_cep_data
+    )
+
+    assert created_cep is existing
+    db_session.rollback.assert_called_once()
+    cep_repository_instance._query_cep.assert_called_once_with(
+        db_session, sample_cep_data["cep"]
+    )
+
+
+def test_upsert_ceps_updates_existing_rows(
+    db_session: Session,
+    cep_repository_instance: CEPRepository,
+    sample_cep_data: dict
+):
+    cep_repository_instance.create_cep(db_session, sample_cep_data.copy())
+    changed = {**sample_cep_data, "logradouro": "Avenida Nova"}
+
+    upserted = cep_repository_instance.upsert_ceps(
+        db_session, [changed, {**sample_cep_data, "cep": "87654322"}]
+    )
+
+    assert sorted(c.cep for c in upserted) == ["87654321", "87654322"]
+    retrieved = cep_repository_instance.get_cep(db_session, "87654321")
+    db_session.refresh(retrieved)
+    assert retrieved.logradouro == "Avenida Nova"
+
+
+def test_upsert_ceps_stamps_verification_time(
+    db_session: Session,
+    cep_repository_instance: CEPRepository,
+    sample_cep_data: dict
+):
+    old = datetime.datetime(2020, 1, 1)
+    cep_repository_instance.upsert_ceps(
+        db_session, [{**sample_cep_data, "verified_at": old}]
+    )
+    stored = cep_repository_instance.get_cep(db_session, "87654321")
+    assert stored.fetched_at == stored.verified_at == old
+
+    cep_repository_instance.upsert_ceps(db_session, [sample_cep_data.copy()])
+    db_session.refresh(stored)
+
+    # Só a confirmação muda; a primeira gravação é mantida
+    assert stored.fetched_at == old
+    assert stored.verified_at > old
+
+
+def test_create_ceps_skips_existing_rows(
+    db_session: Session,
+    cep_repository_instance: CEPRepository,
+    sample_cep_data: dict
+):
+    cep_repository_instance.create_cep(db_session, sample_cep_data.copy())
+    changed = {**sample_cep_data, "logradouro": "Avenida Nova"}
+
+    created = cep_repository_instance.create_ceps(db_session, [changed])
+
+    assert len(created) == 1
+    db_session.refresh(created[0])
+    assert created[0].logradouro == sample_cep_data["logradouro"]
+
+
+def test_get_cep_reads_from_replica_and_falls_back_to_primary(
+    db_session: Session,
+    sample_cep_data: dict,
+    mocker,
+):
+    replica_session = mocker.MagicMock(spec=Session)
+    replica_session.query.return_value.filter.return_value.first \
+        .return_value = None
+    read_sessionmaker = mocker.MagicMock()
+    read_sessionmaker.return_value.__enter__.return_value = replica_session
+    repository = CEPRepository(read_sessionmaker=read_sessionmaker)
+    repository.create_cep(db_session, sample_cep_data.copy())
+
+    retrieved = repository.get_cep(db_session, sample_cep_data["cep"])
+
+    replica_session.query.assert_called_once()
+    assert retrieved.cep == sample_cep_data["cep"]
+
+
+def test_get_cep_records_fall_back_to_primary_on_replica_error(
+    db_session: Session,
+    sample_cep_data: dict,
+    mocker,
+):
+    replica_session = mocker.MagicMock(spec=Session)
+    replica_session.execute.side_effect = Exception("réplica fora")
+    read_sessionmaker = mocker.MagicMock()
+    read_sessionmaker.return_value.__enter__.return_value = replica_session
+    repository = CEPRepository(read_sessionmaker=read_sessionmaker)
+    repository.create_cep(db_session, sample_cep_data.copy())
+
+    records = repository.get_cep_records(db_session, [sample_cep_data["cep"]])
+
+    assert [record.cep for record in records] == [sample_cep_data["cep"]]
+
+
+def test_find_by_prefix_propagates_replica_error(db_session: Session, mocker):
+    read_sessionmaker = mocker.MagicMock(
+        side_effect=Exception("réplica fora")
+    )
+    repository = CEPRepository(read_sessionmaker=read_sessionmaker)
+
+    # Uma página vazia encerraria a varredura em silêncio
+    with pytest.raises(Exception, match="réplica fora"):
+        repository.find_by_prefix(db_session, "01310")
+
+
+@pytest.fixture
+def seeded_ceps(db_session: Session, cep_repository_instance: CEPRepository):
+    cep_repository_instance.upsert_ceps(db_session, [
+        {"cep": "01310100", "uf": "SP", "localidade": "São Paulo"},
+        {"cep": "01310200", "uf": "SP", "localidade": "São Paulo"},
+        {"cep": "01310930", "uf": "SP", "localidade": "São Paulo"},
+        {"cep": "01311000", "uf": "SP", "localidade": "São Paulo"},
+        {"cep": "13010000", "uf": "SP", "localidade": "Campinas"},
+        {"cep": "20040020", "uf": "RJ", "localidade": "Rio de Janeiro"},
+    ])
+
+
+@pytest.mark.usefixtures("seeded_ceps")
+def test_find_by_prefix_pages_by_key(
+    db_session: Session, cep_repository_instance: CEPRepository
+):
+    first = cep_repository_instance.find_by_prefix(
+        db_session, "01310", limit=2
+    )
+    second = cep_repository_instance.find_by_prefix(
+        db_session, "01310", after=first[-1].cep, limit=2
+    )
+
+    assert [cep.cep for cep in first] == ["01310100", "01310200"]
+    assert [cep.cep for cep in second] == ["01310930"]
+
+
+@pytest.mark.usefixtures("seeded_ceps")
+def test_find_by_range_is_inclusive(
+    db_session: Session, cep_repository_instance: CEPRepository
+):
+    found = cep_repository_instance.find_by_range(
+        db_session, "01310200", "13010000"
+    )
+
+    assert [cep.cep for cep in found] == [
+        "01310200", "01310930", "01311000", "13010000"
+    ]
+
+
+@pytest.mark.usefixtures("seeded_ceps")
+def test_find_by_locality(
+    db_session: Session, cep_repository_instance: CEPRepository
+):
+    by_uf = cep_repository_instance.find_by_locality(
+        db_session, "SP", after="01311000"
+    )
+    by_city = cep_repository_instance.find_by_locality(
+        db_session, "SP", "São Paulo", limit=10
+    )
+
+    assert [cep.cep for cep in by_uf] == ["13010000"]
+    assert len(by_city) == 4
+
+
+@pytest.mark.usefixtures("seeded_ceps")
+def test_get_cep_records_reads_plain_rows(
+    db_session: Session, cep_repository_instance: CEPRepository
+):
+    record = cep_repository_instance.get_cep_record(db_session, "20040020")
+    records = cep_repository_instance.get_cep_records(
+        db_session, ["01310100", "99999999", "13010000"]
+    )
+
+    assert isinstance(record, CEPRecord)
+    assert record.localidade == "Rio de Janeiro"
+    assert sorted(r.cep for r in records) == ["01310100", "13010000"]
+    assert cep_repository_instance.get_cep_record(
+        db_session, "99999999"
+    ) is None
@@ -0,0 +1,170 @@
+import sys
+import threading
+import pytest
+from app.models.cep import CEP
+from app.models.cep_record import CEPRecord
+from app.repositories.cep_repository import CEPRepository
+from app.repositories.in_memory_cep_repository import InMemoryCEPRepository
+
+
+def cep_record(cep: str, **overrides) -> dict:
+    return {
+        "cep": cep,
+        "logradouro": f"Rua {cep}",
+        "complemento": "",
+        "unidade": "",
+        "bairro": "Centro",
+        "localidade": "São Paulo",
+        "uf": "SP",
+        "estado": "São Paulo",
+        "regiao": "Sudeste",
+        "ibge": "3550308",
+        "gia": None,
+        "ddd": "11",
+        "siafi": "7107",
+        **overrides,
+    }
+
+
+@pytest.fixture
+def index():
+    return InMemoryCEPRepository.from_records([
+        cep_record("01310-100"),
+        cep_record("01001000"),
+        cep_record("20040020", localidade="Rio de Janeiro", uf="RJ"),
+        cep_record("01001000", logradouro="Praça da Sé"),
+        {"cep": "123"},
+    ])
+
+
+def test_lookup_returns_transient_cep_models(index):
+    cep = index.get_cep(None, "01001000")
+
+    assert isinstance(cep, CEP)
+    assert cep.logradouro == "Praça da Sé"
+    assert cep.gia is None
+    assert index.get_cep(None, "99999999") is None
+    assert index.get_cep(None, "abc") is None
+    assert len(index) == 3
+
+
+def test_strings_are_dictionary_encoded(index):
+    assert index._values["localidade"] == ["São Paulo", "Rio de Janeiro"]
+    assert index._values["uf"] == ["SP", "RJ"]
+
+
+def test_get_ceps_skips_missing(index):
+    found = index.get_ceps(None, ["20040020", "99999999", "01310100"])
+
+    assert sorted(cep.cep for cep in found) == ["01310100", "20040020"]
+
+
+def test_writes_go_to_overlay(index):
+    created = index.create_cep(None, cep_record("30130010", uf="MG"))
+    kept = index.create_cep(None, cep_record("01001000", logradouro="X"))
+    index.upsert_ceps(None, [cep_record("20040020", bairro="Saúde")])
+
+    assert created.uf == "MG"
+    assert kept.logradouro == "Praça da Sé"
+    assert index.get_cep(None, "20040020").bairro == "Saúde"
+    assert [row["cep"] for row in index.iter_rows()] == [
+        "01001000", "01310100", "20040020", "30130010"
+    ]
+    assert len(index) == 4
+
+
+def test_snapshot_round_trip(tmp_path, index):
+    index.create_cep(None, cep_record("30130010", uf="MG"))
+    path = str(tmp_path / "ceps.idx")
+
+    index.save(path)
+    loaded = InMemoryCEPRepository.load(path)
+
+    assert len(loaded) == 4
+    assert loaded.get_cep(None, "30130010").uf == "MG"
+    assert loaded.get_cep(None, "01001000").logradouro == "Praça da Sé"
+    assert loaded.get_cep(None, "01001001") is None
+    assert list(loaded.iter_rows()) == list(index.iter_rows())
+
+    resaved = str(tmp_path / "ceps2.idx")
+    loaded.save(resaved)
+    assert list(InMemoryCEPRepository.load(resaved).iter_rows()) == list(
+        index.iter_rows()
+    )
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "outro.bin"
+    path.write_bytes(b"nada por aqui")
+
+    with pytest.raises(ValueError):
+        InMemoryCEPRepository.load(str(path))
+
+
+def test_build_from_database(db_session):
+    CEPRepository().upsert_ceps(db_session, [cep_record("01001000")])
+
+    index = InMemoryCEPRepository.from_database(db_session)
+
+    assert index.get_cep(None, "01001000").logradouro == "Rua 01001000"
+
+
+def test_scans_run_alongside_writes(index):
+    # Escritas em outra thread não invalidam varreduras em andamento; trocas
+    # de thread frequentes expõem leituras do dicionário sem cópia
+    def write():
+        for n in range(2000):
+            index.create_cep(None, cep_record(f"4{n:07d}"))
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        writer = threading.Thread(target=write)
+        writer.start()
+        while writer.is_alive():
+            rows = [row["cep"] for row in index.iter_rows()]
+            assert rows == sorted(rows)
+            len(index)
+        writer.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert len(index) == 2003
+    assert len(index.find_by_prefix(None, "4", limit=5000)) == 2000
+
+
+def test_range_and_prefix_queries_merge_overlay(index):
+    index.create_cep(None, cep_record("01310200"))
+
+    first = index.find_by_prefix(None, "0131", limit=1)
+    rest = index.find_by_prefix(None, "0131", after=first[0].cep)
+    by_range = index.find_by_range(None, "01001000", "01310150")
+
+    assert [cep.cep for cep in first] == ["01310100"]
+    assert [cep.cep for cep in rest] == ["01310200"]
+    assert [cep.cep for cep in by_range] == ["01001000", "01310100"]
+
+
+def test_find_by_locality_compares_dictionary_codes(index):
+    index.create_cep(None, cep_record("30130010", localidade="BH", uf="MG"))
+
+    assert [cep.cep for cep in index.find_by_locality(None, "SP")] == [
+        "01001000", "01310100"
+    ]
+    assert [
+        cep.cep for cep in index.find_by_locality(None, "SP", after="01001000")
+    ] == ["01310100"]
+    assert [
+        cep.cep for cep in index.find_by_locality(None, "MG", "BH")
+    ] == ["30130010"]
+    assert index.find_by_locality(None, "SP", "Campinas") == []
+
+
+def test_get_cep_record_skips_orm(index):
+    record = index.get_cep_record(None, "01001000")
+
+    assert isinstance(record, CEPRecord)
+    assert record.logradouro == "Praça da Sé"
+    assert [r.cep for r in index.get_cep_records(
+        None, ["20040020", "99999999"]
+    )] == ["20040020"]
@@ -0,0 +1,187 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base
+from app.models.cep import CEP
+from app.models.cep_record import CEPRecord
+from app.repositories.cep_repository import CEPRepository
+from app.repositories.write_behind_cep_repository import (
+    WriteBehindCEPRepository,
+)
+
+
+@pytest.fixture
+def mock_db_session():
+    return MagicMock(spec=Session)
+
+
+@pytest.fixture
+def mock_cep_repository():
+    return MagicMock(spec=CEPRepository)
+
+
+@pytest.fixture
+def flush_session():
+    return MagicMock(spec=Session)
+
+
+@pytest.fixture
+def write_behind(mock_cep_repository, flush_session):
+    return WriteBehindCEPRepository(
+        mock_cep_repository,
+        session_factory=lambda: flush_session,
+        batch_size=2,
+        flush_interval=60,
+        max_pending=10,
+    )
+
+
+def test_create_cep_enqueues_and_returns_transient_entity(
+    write_behind, mock_cep_repository, mock_db_session
+):
+    created = write_behind.create_cep(
+        mock_db_session, {"cep": "12345678", "logradouro": "Rua Fila"}
+    )
+
+    assert created.cep == "12345678"
+    assert created.logradouro == "Rua Fila"
+    assert created.id is None
+    assert len(write_behind) == 1
+    mock_cep_repository.execute_upsert.assert_not_called()
+    mock_db_session.commit.assert_not_called()
+
+
+def test_pending_rows_are_visible_to_exact_lookups(
+    write_behind, mock_cep_repository, mock_db_session
+):
+    write_behind.create_cep(mock_db_session, {"cep": "12345678", "uf": "SP"})
+    mock_cep_repository.get_ceps.return_value = [CEP(cep="87654321")]
+    mock_cep_repository.get_cep_records.return_value = []
+
+    assert write_behind.get_cep(mock_db_session, "12345678").uf == "SP"
+    record = write_behind.get_cep_record(mock_db_session, "12345678")
+    assert isinstance(record, CEPRecord)
+    assert (record.cep, record.uf) == ("12345678", "SP")
+    assert record.verified_at is not None
+    found = write_behind.get_ceps(mock_db_session, ["12345678", "87654321"])
+    assert [db_cep.cep for db_cep in found] == ["12345678", "87654321"]
+    mock_cep_repository.get_ceps.assert_called_once_with(
+        mock_db_session, ["87654321"]
+    )
+    mock_cep_repository.get_cep.assert_not_called()
+
+
+def test_flush_writes_in_batches_without_overwriting(
+    write_behind, mock_cep_repository, flush_session, mock_db_session
+):
+    write_behind.create_ceps(
+        mock_db_session,
+        [{"cep": "11111111"}, {"cep": "22222222"}, {"cep": "33333333"}],
+    )
+
+    # Sem a thread, o lote cheio é gravado na própria chamada
+    assert mock_cep_repository.execute_upsert.call_count == 2
+    batches = [
+        [row["cep"] for row in call.args[1]]
+        for call in mock_cep_repository.execute_upsert.call_args_list
+    ]
+    assert batches == [["11111111", "22222222"], ["33333333"]]
+    for call in mock_cep_repository.execute_upsert.call_args_list:
+        assert call.kwargs == {"update_existing": False}
+    assert flush_session.commit.call_count == 2
+    assert write_behind.flushed == 3
+    assert len(write_behind) == 0
+
+
+def test_failed_flush_keeps_rows_pending(
+    write_behind, mock_cep_repository, flush_session, mock_db_session
+):
+    mock_cep_repository.execute_upsert.side_effect = Exception("DB fora")
+    write_behind.create_cep(mock_db_session, {"cep": "11111111"})
+
+    assert write_behind.flush() == 0
+    assert len(write_behind) == 1
+    assert write_behind.failed_flushes == 1
+    flush_session.rollback.assert_called_once()
+    assert write_behind.get_cep(mock_db_session, "11111111") is not None
+
+    mock_cep_repository.execute_upsert.side_effect = None
+    assert write_behind.flush() == 1
+    assert len(write_behind) == 0
+
+
+def test_upsert_writes_through_and_drops_pending_version(
+    write_behind, mock_cep_repository, mock_db_session
+):
+    write_behind.create_cep(mock_db_session, {"cep": "11111111", "uf": "SP"})
+    mock_cep_repository.upsert_ceps.return_value = [
+        CEP(cep="11111111", uf="RJ")
+    ]
+    mock_cep_repository.get_cep.return_value = CEP(cep="11111111", uf="RJ")
+
+    write_behind.upsert_ceps(mock_db_session, [{"cep": "11111111"}])
+
+    assert len(write_behind) == 0
+    assert write_behind.get_cep(mock_db_session, "11111111").uf == "RJ"
+
+
+def test_background_thread_flushes_on_interval_and_close(
+    mock_cep_repository, flush_session, mock_db_session
+):
+    written = threading.Event()
+    mock_cep_repository.execute_upsert.side_effect = (
+        lambda *args, **kwargs: written.set()
+    )
+    repository = WriteBehindCEPRepository(
+        mock_cep_repository,
+        session_factory=lambda: flush_session,
+        batch_size=100,
+        flush_interval=0.01,
+    )
+    repository.start()
+    try:
+        repository.create_cep(mock_db_session, {"cep": "11111111"})
+        assert written.wait(timeout=2)
+        repository.create_cep(mock_db_session, {"cep": "22222222"})
+    finally:
+        repository.close()
+
+    assert len(repository) == 0
+    assert repository.flushed == 2
+
+
+def test_close_persists_pending_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ceps.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    cep_repository = CEPRepository()
+    with factory() as db:
+        db.add(CEP(cep="11111111", logradouro="Original"))
+        db.commit()
+
+    repository = WriteBehindCEPRepository(
+        cep_repository,
+        session_factory=factory,
+        batch_size=100,
+        flush_interval=60,
+    )
+    repository.start()
+    with factory() as db:
+        repository.create_ceps(db, [
+            {"cep": "11111111", "logradouro": "Da API"},
+            {"cep": "22222222", "logradouro": "Nova"},
+        ])
+    repository.close()
+
+    with factory() as db:
+        stored = {
+            db_cep.cep: db_cep.logradouro
+            for db_cep in cep_repository.get_ceps(
+                db, ["11111111", "22222222"]
+            )
+        }
+    assert stored == {"11111111": "Original", "22222222": "Nova"}
+    engine.dispose()
@@ -0,0 +1,49 @@
+import json
+import pytest
+from pydantic import ValidationError
+from app.models.cep_record import CEPRecord
+from app.schemas.cep_schema import CEPSchema, cep_record_json
+
+
+@pytest.fixture
+def record():
+    return CEPRecord(
+        cep="01001000",
+        logradouro="Praça da Sé",
+        complemento="lado ímpar",
+        unidade="",
+        bairro="Sé",
+        localidade="São Paulo",
+        uf="SP",
+        estado="São Paulo",
+        regiao="Sudeste",
+        ibge="3550308",
+        gia="1004",
+        ddd="11",
+        siafi="7107",
+    )
+
+
+def test_cep_record_json_matches_schema_dump(record):
+    expected = CEPSchema.model_validate(record._asdict()).model_dump_json()
+
+    assert cep_record_json(record) == expected
+
+
+def test_cep_record_json_falls_back_to_validation(record):
+    with pytest.raises(ValidationError):
+        cep_record_json(record._replace(logradouro=None))
+    with pytest.raises(ValidationError):
+        cep_record_json(record._replace(ddd="xx"))
+
+
+def test_cep_record_json_allows_fields_missing_from_provider(record):
+    partial = record._replace(
+        complemento=None, ibge=None, gia=None, ddd=None, siafi=None
+    )
+
+    data = json.loads(cep_record_json(partial))
+
+    assert list(data) == list(CEPSchema.model_fields)
+    assert data["ddd"] is None and data["gia"] is None
+    assert data["logradouro"] == "Praça da Sé"
@@ -1,7 +1,15 @@
+import asyncio
+import time
+import httpx
 import pytest
+import requests
 import requests_mock
+from app.interfaces.cep_api_service_interface import FetchStatus
 from app.services.api_service import APIService
+from app.services.async_api_service import AsyncAPIService
 from app.config.settings import settings
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.rate_limiter import TokenBucket
 
 
 @pytest.fixture
@@ -60,3 +68,215 @@ def test_fetch_cep_data_request_exception(api_service: APIService):
         mock.get(url, exc=requests.exceptions.ConnectTimeout)
         result = api_service.fetch_cep_data(cep)
         assert result is None
+
+
+def test_fetch_many_cep_data_preserves_input_order():
+    api_service = APIService(max_workers=4)
+    ceps = ["11111111", "22222222", "33333333", "00000000"]
+    with requests_mock.Mocker() as mock:
+        for cep in ceps[:-1]:
+            mock.get(
+                f"{settings.EXTERNAL_API_URL}/{cep}/json/",
+                json={"cep": cep},
+            )
+        mock.get(
+            f"{settings.EXTERNAL_API_URL}/00000000/json/",
+            json={"erro": True},
+        )
+        result = api_service.fetch_many_cep_data(ceps)
+    assert [r and r["cep"] for r in result] == [
+        "11111111", "22222222", "33333333", None
+    ]
+
+
+def test_api_service_reuses_shared_session():
+    api_service = APIService()
+    adapter = api_service.session.get_adapter("https://viacep.com.br")
+    assert adapter is api_service.session.get_adapter("http://localhost")
+    assert adapter._pool_maxsize == settings.API_POOL_MAXSIZE
+
+
+def test_fetch_cep_distinguishes_not_found_from_error(
+    api_service: APIService,
+):
+    with requests_mock.Mocker() as mock:
+        mock.get(
+            f"{settings.EXTERNAL_API_URL}/00000000/json/",
+            json={"erro": True},
+        )
+        mock.get(f"{settings.EXTERNAL_API_URL}/12345678/json/",
+                 status_code=503)
+        assert api_service.fetch_cep("00000000") == (
+            FetchStatus.NOT_FOUND, None
+        )
+        assert api_service.fetch_cep("12345678") == (FetchStatus.ERROR, None)
+
+
+def test_fetch_cep_retries_transient_errors():
+    sleeps = []
+    api_service = APIService(retries=2, sleep=sleeps.append)
+    url = f"{settings.EXTERNAL_API_URL}/01001000/json/"
+    with requests_mock.Mocker() as mock:
+        mock.get(url, [
+            {"status_code": 503},
+            {"status_code": 429, "headers": {"Retry-After": "0"}},
+            {"json": {"cep": "01001-000"}, "status_code": 200},
+        ])
+        assert api_service.fetch_cep("01001000") == (
+            FetchStatus.FOUND, {"cep": "01001-000"}
+        )
+        assert mock.call_count == 3
+    assert len(sleeps) == 2 and sleeps[1] == 0
+    assert mock.request_history[0].timeout == api_service.timeout
+
+
+def test_fetch_cep_does_not_retry_client_errors():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    api_service = APIService(circuit_breaker=breaker, sleep=lambda _: None)
+    with requests_mock.Mocker() as mock:
+        mock.get(f"{settings.EXTERNAL_API_URL}/0100100/json/",
+                 status_code=400)
+        assert api_service.fetch_cep("0100100") == (FetchStatus.ERROR, None)
+        assert mock.call_count == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_short_circuits_requests():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    api_service = APIService(
+        retries=0, circuit_breaker=breaker, sleep=lambda _: None
+    )
+    with requests_mock.Mocker() as mock:
+        mock.get(requests_mock.ANY, exc=requests.exceptions.ConnectTimeout)
+        for _ in range(3):
+            assert api_service.fetch_cep("01001000") == (
+                FetchStatus.ERROR, None
+            )
+        assert mock.call_count == 2
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_interrupted_half_open_trial_is_released():
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=0, trial_timeout=60
+    )
+    breaker.record_failure()
+    api_service = APIService(
+        retries=0, circuit_breaker=breaker, sleep=lambda _: None
+    )
+    with requests_mock.Mocker() as mock:
+        mock.get(requests_mock.ANY, exc=KeyboardInterrupt)
+        with pytest.raises(KeyboardInterrupt):
+            api_service.fetch_cep("01001000")
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+
+
+def test_fetch_ceps_coalesces_concurrent_requests_for_same_cep():
+    api_service = APIService(max_workers=4)
+
+    def slow_response(request, context):
+        time.sleep(0.2)
+        return {"cep": "01001-000"}
+
+    with requests_mock.Mocker() as mock:
+        mock.get(f"{settings.EXTERNAL_API_URL}/01001000/json/",
+                 json=slow_response)
+        results = api_service.fetch_ceps(["01001000"] * 4)
+        assert mock.call_count == 1
+    assert results == [(FetchStatus.FOUND, {"cep": "01001-000"})] * 4
+
+
+def test_fetch_cep_waits_for_rate_limiter():
+    sleeps = []
+    api_service = APIService(
+        rate_limiter=TokenBucket(rate=10, burst=1), sleep=sleeps.append
+    )
+    with requests_mock.Mocker() as mock:
+        mock.get(requests_mock.ANY, json={"cep": "01001-000"})
+        for cep in ("01001000", "01001001", "01001002"):
+            api_service.fetch_cep(cep)
+    assert len(sleeps) == 2
+    assert all(0 < delay <= 0.2 for delay in sleeps)
+
+
+def test_async_fetch_ceps_coalesces_same_cep():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"cep": "01001-000"})
+
+    async def run():
+        service = AsyncAPIService(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        try:
+            return await service.fetch_ceps(["01001000"] * 3)
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(run()) == [
+        (FetchStatus.FOUND, {"cep": "01001-000"})
+    ] * 3
+    assert len(calls) == 1
+
+
+def test_async_fetch_cep_retries_and_opens_circuit():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(502)
+
+    async def no_sleep(_):
+        pass
+
+    async def run():
+        service = AsyncAPIService(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            retries=1,
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=1, recovery_timeout=60
+            ),
+            sleep=no_sleep,
+        )
+        try:
+            first = await service.fetch_cep("01001000")
+            second = await service.fetch_cep("01001000")
+            return first, second, service.circuit_breaker.state
+        finally:
+            await service.aclose()
+
+    first, second, state = asyncio.run(run())
+    assert first == second == (FetchStatus.ERROR, None)
+    assert len(calls) == 2
+    assert state == CircuitBreaker.OPEN
+
+
+def test_async_fetch_cep_with_mock_transport():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "/00000000/" in request.url.path:
+            return httpx.Response(200, json={"erro": True})
+        if "/99999999/" in request.url.path:
+            return httpx.Response(500)
+        return httpx.Response(200, json={"cep": "12345-678"})
+
+    async def run():
+        service = AsyncAPIService(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        try:
+            return await service.fetch_ceps(
+                ["12345678", "00000000", "99999999"]
+            )
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(run()) == [
+        (FetchStatus.FOUND, {"cep": "12345-678"}),
+        (FetchStatus.NOT_FOUND, None),
+        (FetchStatus.ERROR, None),
+    ]
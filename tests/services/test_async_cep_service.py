@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.interfaces.async_cep_api_service_interface import (
+    IAsyncCEPAPIService,
+)
+from app.interfaces.async_cep_repository_interface import IAsyncCEPRepository
+from app.models.cep import CEP
+from app.services.async_cep_service import AsyncCEPService
+
+
+@pytest.fixture
+def mock_api_service():
+    return AsyncMock(spec=IAsyncCEPAPIService)
+
+
+@pytest.fixture
+def mock_cep_repository():
+    return AsyncMock(spec=IAsyncCEPRepository)
+
+
+@pytest.fixture
+def async_cep_service(mock_api_service, mock_cep_repository):
+    return AsyncCEPService(
+        db_session=MagicMock(spec=AsyncSession),
+        api_service=mock_api_service,
+        cep_repository=mock_cep_repository,
+    )
+
+
+def test_async_get_or_fetch_cep_invalid_format(async_cep_service):
+    assert asyncio.run(
+        async_cep_service.get_or_fetch_cep_details("123")
+    ) is None
+    async_cep_service.cep_repository.get_cep.assert_not_called()
+
+
+def test_async_get_or_fetch_cep_found_in_db(
+    async_cep_service, mock_api_service, mock_cep_repository
+):
+    local_cep = CEP(cep="12345678")
+    mock_cep_repository.get_cep.return_value = local_cep
+
+    result = asyncio.run(
+        async_cep_service.get_or_fetch_cep_details("12345-678")
+    )
+
+    assert result is local_cep
+    mock_api_service.fetch_cep_data.assert_not_called()
+
+
+def test_async_concurrent_misses_share_one_fetch(
+    async_cep_service, mock_api_service, mock_cep_repository
+):
+    created = CEP(cep="12345678")
+    mock_cep_repository.get_cep.side_effect = [None, None, created]
+    mock_cep_repository.create_cep.return_value = created
+
+    async def slow_fetch(cep):
+        await asyncio.sleep(0.01)
+        return {"cep": "12345-678", "logradouro": "Rua API"}
+
+    mock_api_service.fetch_cep_data.side_effect = slow_fetch
+
+    async def run():
+        return await asyncio.gather(
+            async_cep_service.get_or_fetch_cep_details("12345678"),
+            async_cep_service.get_or_fetch_cep_details("12345678"),
+        )
+
+    assert asyncio.run(run()) == [created, created]
+    mock_api_service.fetch_cep_data.assert_awaited_once_with("12345678")
+    mock_cep_repository.create_cep.assert_awaited_once()
+
+
+def test_async_get_or_fetch_many(
+    async_cep_service, mock_api_service, mock_cep_repository
+):
+    local_cep = CEP(cep="12345678")
+    created = CEP(cep="87654321")
+    mock_cep_repository.get_ceps.return_value = [local_cep]
+    mock_api_service.fetch_many_cep_data.return_value = [
+        {"cep": "87654-321"}, None
+    ]
+    mock_cep_repository.create_ceps.return_value = [created]
+
+    result = asyncio.run(async_cep_service.get_or_fetch_many(
+        ["12345678", "87654321", "11111111", "x"]
+    ))
+
+    assert result == {
+        "12345678": local_cep, "87654321": created, "11111111": None
+    }
+    mock_api_service.fetch_many_cep_data.assert_awaited_once_with(
+        ["87654321", "11111111"]
+    )
@@ -0,0 +1,120 @@
+import datetime
+import threading
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+
+from app.interfaces.cep_api_service_interface import (
+    FetchStatus,
+    ICEPAPIService,
+)
+from app.interfaces.cep_repository_interface import ICEPRepository
+from app.models.cep import CEP
+from app.services.cep_refresher import CEPRefresher
+
+NOW = datetime.datetime(2026, 1, 31, 12, 0, 0)
+
+
+@pytest.fixture
+def mock_db_session():
+    return MagicMock(spec=Session)
+
+
+@pytest.fixture
+def mock_api_service():
+    return MagicMock(spec=ICEPAPIService)
+
+
+@pytest.fixture
+def mock_cep_repository():
+    return MagicMock(spec=ICEPRepository)
+
+
+@pytest.fixture
+def refresher(mock_api_service, mock_cep_repository, mock_db_session):
+    refresher = CEPRefresher(
+        mock_api_service,
+        mock_cep_repository,
+        session_factory=lambda: mock_db_session,
+        soft_ttl=60,
+        hard_ttl=3600,
+        max_workers=1,
+        clock=lambda: NOW,
+    )
+    yield refresher
+    refresher.close()
+
+
+def ago(seconds: float) -> datetime.datetime:
+    return NOW - datetime.timedelta(seconds=seconds)
+
+
+def test_freshness_by_age(refresher):
+    assert refresher.freshness(ago(10)) == CEPRefresher.FRESH
+    assert refresher.freshness(ago(120)) == CEPRefresher.STALE
+    assert refresher.freshness(ago(7200)) == CEPRefresher.EXPIRED
+    # Sem data: servido e revalidado, nunca bloqueia a consulta
+    assert refresher.freshness(None) == CEPRefresher.STALE
+
+
+def test_disabled_ttls_never_expire(refresher):
+    refresher.soft_ttl = refresher.hard_ttl = 0
+
+    assert refresher.freshness(ago(10 ** 9)) == CEPRefresher.FRESH
+
+
+def test_refresh_many_upserts_confirmed_ceps(
+    refresher, mock_api_service, mock_cep_repository, mock_db_session
+):
+    mock_api_service.fetch_ceps.return_value = [
+        (FetchStatus.FOUND, {"cep": "11111-111", "uf": "SP", "extra": 1}),
+        (FetchStatus.NOT_FOUND, None),
+        (FetchStatus.ERROR, None),
+    ]
+    mock_cep_repository.upsert_ceps.return_value = [CEP(cep="11111111")]
+
+    refreshed = refresher.refresh_many(
+        mock_db_session, ["11111111", "22222222", "33333333"]
+    )
+
+    assert list(refreshed) == ["11111111"]
+    mock_cep_repository.upsert_ceps.assert_called_once_with(
+        mock_db_session, [{"cep": "11111111", "uf": "SP"}],
+        update_existing=True,
+    )
+
+
+def test_refresh_many_without_confirmation_writes_nothing(
+    refresher, mock_api_service, mock_cep_repository, mock_db_session
+):
+    mock_api_service.fetch_ceps.return_value = [(FetchStatus.ERROR, None)]
+
+    assert refresher.refresh(mock_db_session, "11111111") is None
+    mock_cep_repository.upsert_ceps.assert_not_called()
+
+
+def test_schedule_refreshes_once_in_background(
+    refresher, mock_api_service, mock_cep_repository, mock_db_session
+):
+    release = threading.Event()
+    done = threading.Event()
+
+    def fetch_ceps(ceps):
+        release.wait(timeout=2)
+        return [(FetchStatus.FOUND, {"cep": cep}) for cep in ceps]
+
+    mock_api_service.fetch_ceps.side_effect = fetch_ceps
+    mock_cep_repository.upsert_ceps.side_effect = (
+        lambda *args, **kwargs: done.set() or []
+    )
+
+    assert refresher.schedule("11111111") is True
+    assert refresher.schedule("11111111") is False
+    release.set()
+    assert done.wait(timeout=2)
+    refresher.close()
+
+    mock_api_service.fetch_ceps.assert_called_once_with(["11111111"])
+    mock_db_session.close.assert_called_once()
+    # Concluída a revalidação, o CEP pode ser agendado de novo
+    assert not refresher._scheduled
@@ -1,14 +1,28 @@
+import datetime
+import threading
 import pytest
 from unittest.mock import MagicMock
 from sqlalchemy.orm import Session
 
+from app.services.cep_refresher import CEPRefresher
 from app.services.cep_service import CEPService
 from app.models.cep import CEP
+from app.models.cep_record import CEPRecord
+from app.utils.metrics import MetricsRegistry
+from app.utils.single_flight import SingleFlight
 
 # Interfaces are used for type hinting and for mock spec if needed
-from app.interfaces.cep_api_service_interface import ICEPAPIService
+from app.interfaces.cep_api_service_interface import (
+    FetchStatus,
+    ICEPAPIService,
+)
+from app.interfaces.cep_not_found_repository_interface import (
+    ICEPNotFoundRepository,
+)
 from app.interfaces.cep_repository_interface import ICEPRepository
 
+NOW = datetime.datetime(2026, 1, 31, 12, 0, 0)
+
 
 @pytest.fixture
 def mock_db_session():
@@ -81,7 +95,7 @@ def test_get_or_fetch_cep_invalid_format(
 ):
     result = cep_service.get_or_fetch_cep_details(sample_invalid_cep_str)
     assert result is None
-    cep_service.api_service.fetch_cep_data.assert_not_called()
+    cep_service.api_service.fetch_cep.assert_not_called()
     cep_service.cep_repository.create_cep.assert_not_called()
 
 
@@ -99,7 +113,7 @@ def test_get_or_fetch_cep_found_in_db(
     mock_cep_repository.get_cep.assert_called_once_with(
         cep_service.db_session, sample_valid_cep_str
     )
-    cep_service.api_service.fetch_cep_data.assert_not_called()
+    cep_service.api_service.fetch_cep.assert_not_called()
     mock_cep_repository.create_cep.assert_not_called()
 
 
@@ -111,7 +125,9 @@ def test_get_or_fetch_cep_not_in_db_found_in_api_and_created(
     sample_api_response_data: dict,
 ):
     mock_cep_repository.get_cep.return_value = None  # Not in DB
-    mock_api_service.fetch_cep_data.return_value = sample_api_response_data
+    mock_api_service.fetch_cep.return_value = (
+        FetchStatus.FOUND, sample_api_response_data
+    )
 
     created_cep_model = CEP(
         **{
@@ -128,7 +144,7 @@ def test_get_or_fetch_cep_not_in_db_found_in_api_and_created(
     mock_cep_repository.get_cep.assert_called_once_with(
         cep_service.db_session, sample_valid_cep_str
     )
-    mock_api_service.fetch_cep_data.assert_called_once_with(
+    mock_api_service.fetch_cep.assert_called_once_with(
         sample_valid_cep_str)
 
     # Prepare expected data for create_cep call (filtered, cep sanitized)
@@ -153,7 +169,7 @@ def test_get_or_fetch_cep_not_in_db_not_in_api(
     sample_valid_cep_str,
 ):
     mock_cep_repository.get_cep.return_value = None
-    mock_api_service.fetch_cep_data.return_value = None
+    mock_api_service.fetch_cep.return_value = (FetchStatus.NOT_FOUND, None)
 
     result = cep_service.get_or_fetch_cep_details(sample_valid_cep_str)
 
@@ -161,7 +177,7 @@ def test_get_or_fetch_cep_not_in_db_not_in_api(
     mock_cep_repository.get_cep.assert_called_once_with(
         cep_service.db_session, sample_valid_cep_str
     )
-    mock_api_service.fetch_cep_data.assert_called_once_with(
+    mock_api_service.fetch_cep.assert_called_once_with(
         sample_valid_cep_str)
     mock_cep_repository.create_cep.assert_not_called()
 
@@ -174,7 +190,9 @@ def test_get_or_fetch_cep_api_returns_data_but_db_create_fails(
     sample_api_response_data: dict,
 ):
     mock_cep_repository.get_cep.return_value = None
-    mock_api_service.fetch_cep_data.return_value = sample_api_response_data
+    mock_api_service.fetch_cep.return_value = (
+        FetchStatus.FOUND, sample_api_response_data
+    )
     mock_cep_repository.create_cep.return_value = None
 
     result = cep_service.get_or_fetch_cep_details(sample_valid_cep_str)
@@ -183,7 +201,7 @@ def test_get_or_fetch_cep_api_returns_data_but_db_create_fails(
     mock_cep_repository.get_cep.assert_called_once_with(
         cep_service.db_session, sample_valid_cep_str
     )
-    mock_api_service.fetch_cep_data.assert_called_once_with(
+    mock_api_service.fetch_cep.assert_called_once_with(
         sample_valid_cep_str)
 
     expected_data_for_create = sample_api_response_data.copy()
@@ -233,7 +251,9 @@ def test_cep_service_handles_api_data_with_extra_fields(
         "extra_field_from_api": "should_be_ignored",
         "another_extra": 12345,
     }
-    mock_api_service.fetch_cep_data.return_value = api_data_with_extra
+    mock_api_service.fetch_cep.return_value = (
+        FetchStatus.FOUND, api_data_with_extra
+    )
 
     expected_data_for_db = {
         "cep": sample_valid_cep_str,
@@ -260,3 +280,438 @@ def test_cep_service_handles_api_data_with_extra_fields(
     assert "extra_field_from_api" not in call_args_dict
     assert "another_extra" not in call_args_dict
     assert call_args_dict["logradouro"] == "Rua Teste"
+
+
+def test_get_or_fetch_many_dedupes_and_skips_invalid(
+    cep_service: CEPService,
+    mock_api_service: MagicMock,
+    mock_cep_repository: MagicMock,
+    sample_cep_model_from_db: CEP,
+):
+    mock_cep_repository.get_ceps.return_value = [sample_cep_model_from_db]
+
+    result = cep_service.get_or_fetch_many(
+        ["12345-678", "12345678", "123"]
+    )
+
+    assert result == {"12345678": sample_cep_model_from_db}
+    mock_cep_repository.get_ceps.assert_called_once_with(
+        cep_service.db_session, ["12345678"]
+    )
+    mock_api_service.fetch_ceps.assert_not_called()
+    mock_cep_repository.create_ceps.assert_not_called()
+
+
+def test_get_or_fetch_many_fetches_only_misses_and_bulk_inserts(
+    cep_service: CEPService,
+    mock_api_service: MagicMock,
+    mock_cep_repository: MagicMock,
+    sample_cep_model_from_db: CEP,
+    sample_api_response_data: dict,
+):
+    miss_data = {**sample_api_response_data, "cep": "87654-321"}
+    mock_cep_repository.get_ceps.return_value = [sample_cep_model_from_db]
+    mock_api_service.fetch_ceps.return_value = [
+        (FetchStatus.FOUND, miss_data), (FetchStatus.NOT_FOUND, None)
+    ]
+    created = CEP(cep="87654321", logradouro="Rua API")
+    mock_cep_repository.create_ceps.return_value = [created]
+
+    result = cep_service.get_or_fetch_many(
+        ["12345678", "87654321", "11111111"]
+    )
+
+    assert result == {
+        "12345678": sample_cep_model_from_db,
+        "87654321": created,
+        "11111111": None,
+    }
+    mock_api_service.fetch_ceps.assert_called_once_with(
+        ["87654321", "11111111"]
+    )
+    created_data = mock_cep_repository.create_ceps.call_args[0][1]
+    assert [d["cep"] for d in created_data] == ["87654321"]
+
+
+@pytest.fixture
+def mock_not_found_repository():
+    return MagicMock(spec=ICEPNotFoundRepository)
+
+
+@pytest.fixture
+def cep_service_with_not_found(
+    mock_db_session,
+    mock_api_service,
+    mock_cep_repository,
+    mock_not_found_repository,
+):
+    return CEPService(
+        db_session=mock_db_session,
+        api_service=mock_api_service,
+        cep_repository=mock_cep_repository,
+        not_found_repository=mock_not_found_repository,
+    )
+
+
+def test_get_or_fetch_cep_known_not_found_skips_api(
+    cep_service_with_not_found: CEPService,
+    mock_api_service: MagicMock,
+    mock_cep_repository: MagicMock,
+    mock_not_found_repository: MagicMock,
+    sample_valid_cep_str,
+):
+    mock_cep_repository.get_cep.return_value = None
+    mock_not_found_repository.is_not_found.return_value = True
+
+    result = cep_service_with_not_found.get_or_fetch_cep_details(
+        sample_valid_cep_str
+    )
+
+    assert result is None
+    mock_api_service.fetch_cep.assert_not_called()
+    mock_api_service.fetch_cep.assert_not_called()
+
+
+def test_get_or_fetch_cep_records_api_not_found(
+    cep_service_with_not_found: CEPService,
+    mock_api_service: MagicMock,
+    mock_cep_repository: MagicMock,
+    mock_not_found_repository: MagicMock,
+    sample_valid_cep_str,
+):
+    mock_cep_repository.get_cep.return_value = None
+    mock_not_found_repository.is_not_found.return_value = False
+    mock_api_service.fetch_cep.return_value = (FetchStatus.NOT_FOUND, None)
+
+    result = cep_service_with_not_found.get_or_fetch_cep_details(
+        sample_valid_cep_str
+    )
+
+    assert result is None
+    mock_not_found_repository.mark_not_found.assert_called_once_with(
+        cep_service_with_not_found.db_session, [sample_valid_cep_str]
+    )
+
+
+def test_get_or_fetch_cep_api_error_is_not_recorded(
+    cep_service_with_not_found: CEPService,
+    mock_api_service: MagicMock,
+    mock_cep_repository: MagicMock,
+    mock_not_found_repository: MagicMock,
+    sample_valid_cep_str,
+):
+    mock_cep_repository.get_cep.return_value = None
+    mock_not_found_repository.is_not_found.return_value = False
+    mock_api_service.fetch_cep.return_value = (FetchStatus.ERROR, None)
+
+    assert cep_service_with_not_found.get_or_fetch_cep_details(
+        sample_valid_cep_str
+    ) is None
+    mock_not_found_repository.mark_not_found.assert_not_called()
+
+
+def test_get_or_fetch_many_skips_and_records_not_found(
+    cep_service_with_not_found: CEPService,
+    mock_api_service: MagicMock,
+    mock_cep_repository: MagicMock,
+    mock_not_found_repository: MagicMock,
+):
+    mock_cep_repository.get_ceps.return_value = []
+    mock_not_found_repository.get_not_found.return_value = {"99999999"}
+    mock_api_service.fetch_ceps.return_value = [(FetchStatus.NOT_FOUND, None)]
+    mock_cep_repository.create_ceps.return_value = []
+
+    result = cep_service_with_not_found.get_or_fetch_many(
+        ["99999999", "88888888"]
+    )
+
+    assert result == {"99999999": None, "88888888": None}
+    mock_api_service.fetch_ceps.assert_called_once_with(["88888888"])
+    mock_not_found_repository.mark_not_found.assert_called_once_with(
+        cep_service_with_not_found.db_session, ["88888888"]
+    )
+
+
+def test_get_or_fetch_cep_joins_in_flight_fetch(
+    mock_db_session,
+    mock_api_service: MagicMock,
+    mock_cep_repository: MagicMock,
+    sample_valid_cep_str,
+    sample_cep_model_from_db: CEP,
+):
+    single_flight = SingleFlight()
+    service = CEPService(
+        db_session=mock_db_session,
+        api_service=mock_api_service,
+        cep_repository=mock_cep_repository,
+        single_flight=single_flight,
+    )
+    flight, _ = single_flight.begin(sample_valid_cep_str)
+    mock_cep_repository.get_cep.side_effect = [None, sample_cep_model_from_db]
+    leader = threading.Timer(
+        0.05,
+        single_flight.finish,
+        args=(
+            sample_valid_cep_str,
+            flight,
+            (FetchStatus.FOUND, sample_cep_model_from_db),
+        ),
+    )
+    leader.start()
+
+    result = service.get_or_fetch_cep_details(sample_valid_cep_str)
+
+    leader.join()
+    assert result == sample_cep_model_from_db
+    mock_api_service.fetch_cep.assert_not_called()
+    assert mock_cep_repository.get_cep.call_count == 2
+
+
+def test_get_cep_record_reports_failed_fetch(
+    cep_service, mock_cep_repository, mock_api_service
+):
+    mock_cep_repository.get_cep_record.return_value = None
+    mock_api_service.fetch_cep.return_value = (FetchStatus.ERROR, None)
+    failed = set()
+
+    assert cep_service.get_cep_record("12345678", failed) is None
+    assert failed == {"12345678"}
+
+    # Inexistente na API: sem resultado, mas não é uma falha
+    mock_api_service.fetch_cep.return_value = (FetchStatus.NOT_FOUND, None)
+    failed = set()
+    assert cep_service.get_cep_record("12345678", failed) is None
+    assert failed == set()
+
+
+def test_list_ceps_dispatches_by_filter(cep_service, mock_cep_repository):
+    mock_cep_repository.find_by_prefix.return_value = []
+    mock_cep_repository.find_by_range.return_value = []
+    mock_cep_repository.find_by_locality.return_value = []
+
+    cep_service.list_ceps(prefix="01310-1", after="01310-100", limit=5000)
+    cep_service.list_ceps(start="01000-000", end="01999-999")
+    cep_service.list_ceps(uf="sp", localidade="São Paulo")
+
+    mock_cep_repository.find_by_prefix.assert_called_once_with(
+        cep_service.db_session, "013101", "01310100", 1000
+    )
+    mock_cep_repository.find_by_range.assert_called_once_with(
+        cep_service.db_session, "01000000", "01999999", None, 100
+    )
+    mock_cep_repository.find_by_locality.assert_called_once_with(
+        cep_service.db_session, "SP", "São Paulo", None, 100
+    )
+
+
+@pytest.mark.parametrize("filters", [
+    {}, {"prefix": "abc"}, {"start": "01000000"},
+    {"start": "02000000", "end": "01000000"},
+])
+def test_list_ceps_rejects_invalid_filters(cep_service, filters):
+    with pytest.raises(ValueError):
+        cep_service.list_ceps(**filters)
+
+
+def test_iter_ceps_follows_keyset_pages(cep_service, mock_cep_repository):
+    pages = [[CEP(cep="01310100"), CEP(cep="01310200")], [CEP(cep="01310300")]]
+    mock_cep_repository.find_by_prefix.side_effect = pages
+
+    found = [cep.cep for cep in cep_service.iter_ceps(2, prefix="01310")]
+
+    assert found == ["01310100", "01310200", "01310300"]
+    assert mock_cep_repository.find_by_prefix.call_args_list[1].args[2] == (
+        "01310200"
+    )
+
+
+def test_get_cep_record_local_hit_skips_entities(
+    cep_service, mock_cep_repository, mock_api_service
+):
+    record = CEPRecord(cep="12345678", uf="SP")
+    mock_cep_repository.get_cep_record.return_value = record
+
+    assert cep_service.get_cep_record("12345-678") is record
+    mock_cep_repository.get_cep.assert_not_called()
+    mock_api_service.fetch_cep.assert_not_called()
+
+
+def test_get_cep_record_miss_fetches_and_converts(
+    cep_service, mock_cep_repository, mock_api_service
+):
+    mock_cep_repository.get_cep_record.return_value = None
+    mock_api_service.fetch_cep.return_value = (
+        FetchStatus.FOUND, {"cep": "12345-678"}
+    )
+    mock_cep_repository.create_cep.return_value = CEP(
+        cep="12345678", uf="SP"
+    )
+
+    assert cep_service.get_cep_record("12345678") == CEPRecord(
+        cep="12345678", uf="SP"
+    )
+    assert cep_service.get_cep_record("123") is None
+
+
+def test_get_records_or_fetch_many(
+    cep_service, mock_cep_repository, mock_api_service
+):
+    mock_cep_repository.get_cep_records.return_value = [
+        CEPRecord(cep="11111111")
+    ]
+    mock_cep_repository.get_ceps.return_value = []
+    mock_api_service.fetch_ceps.return_value = [
+        (FetchStatus.FOUND, {"cep": "22222-222"}),
+        (FetchStatus.NOT_FOUND, None),
+    ]
+    mock_cep_repository.create_ceps.return_value = [CEP(cep="22222222")]
+
+    results = cep_service.get_records_or_fetch_many(
+        ["11111111", "22222222", "33333333", "x"]
+    )
+
+    assert results == {
+        "11111111": CEPRecord(cep="11111111"),
+        "22222222": CEPRecord(cep="22222222"),
+        "33333333": None,
+    }
+    mock_api_service.fetch_ceps.assert_called_once_with(
+        ["22222222", "33333333"]
+    )
+    # Os ausentes não são consultados de novo na base local
+    mock_cep_repository.get_ceps.assert_not_called()
+
+
+def test_get_records_or_fetch_many_reports_failed(
+    cep_service, mock_cep_repository, mock_api_service
+):
+    mock_cep_repository.get_cep_records.return_value = []
+    mock_api_service.fetch_ceps.return_value = [
+        (FetchStatus.NOT_FOUND, None),
+        (FetchStatus.ERROR, None),
+    ]
+    failed = set()
+
+    results = cep_service.get_records_or_fetch_many(
+        ["22222222", "33333333"], failed
+    )
+
+    assert results == {"22222222": None, "33333333": None}
+    # Só a falha da API é repetível; o inexistente não entra
+    assert failed == {"33333333"}
+
+
+@pytest.fixture
+def refresher(mock_api_service, mock_cep_repository, mock_db_session):
+    refresher = CEPRefresher(
+        mock_api_service,
+        mock_cep_repository,
+        session_factory=lambda: mock_db_session,
+        soft_ttl=60,
+        hard_ttl=3600,
+        clock=lambda: NOW,
+    )
+    refresher.schedule = MagicMock(return_value=True)
+    yield refresher
+    refresher.close()
+
+
+@pytest.fixture
+def refreshing_cep_service(
+    mock_db_session, mock_api_service, mock_cep_repository, refresher
+):
+    return CEPService(
+        db_session=mock_db_session,
+        api_service=mock_api_service,
+        cep_repository=mock_cep_repository,
+        refresher=refresher,
+    )
+
+
+def test_stale_local_cep_is_served_and_refreshed_in_background(
+    refreshing_cep_service, mock_cep_repository, mock_api_service, refresher
+):
+    stale = CEP(
+        cep="12345678", verified_at=NOW - datetime.timedelta(minutes=5)
+    )
+    mock_cep_repository.get_cep.return_value = stale
+
+    assert refreshing_cep_service.get_or_fetch_cep_details("12345678") is stale
+    refresher.schedule.assert_called_once_with("12345678")
+    mock_api_service.fetch_ceps.assert_not_called()
+
+
+def test_fresh_local_cep_is_not_refreshed(
+    refreshing_cep_service, mock_cep_repository, refresher
+):
+    mock_cep_repository.get_cep_record.return_value = CEPRecord(
+        cep="12345678", verified_at=NOW
+    )
+
+    record = refreshing_cep_service.get_cep_record("12345678")
+
+    assert record.verified_at == NOW
+    refresher.schedule.assert_not_called()
+
+
+def test_expired_local_cep_is_refreshed_before_returning(
+    refreshing_cep_service, mock_cep_repository, mock_api_service
+):
+    expired = datetime.timedelta(days=1)
+    mock_cep_repository.get_cep_record.return_value = CEPRecord(
+        cep="12345678", uf="SP", verified_at=NOW - expired
+    )
+    mock_api_service.fetch_ceps.return_value = [
+        (FetchStatus.FOUND, {"cep": "12345-678", "uf": "RJ"})
+    ]
+    mock_cep_repository.upsert_ceps.return_value = [
+        CEP(cep="12345678", uf="RJ", verified_at=NOW)
+    ]
+
+    record = refreshing_cep_service.get_cep_record("12345678")
+
+    assert (record.uf, record.verified_at) == ("RJ", NOW)
+
+
+def test_expired_local_cep_is_served_when_refresh_fails(
+    refreshing_cep_service, mock_cep_repository, mock_api_service
+):
+    expired = CEP(cep="12345678", verified_at=NOW - datetime.timedelta(days=1))
+    mock_cep_repository.get_ceps.return_value = [expired]
+    mock_api_service.fetch_ceps.return_value = [(FetchStatus.ERROR, None)]
+
+    results = refreshing_cep_service.get_or_fetch_many(["12345678"])
+
+    assert results == {"12345678": expired}
+    mock_cep_repository.upsert_ceps.assert_not_called()
+
+
+def test_batch_api_errors_are_not_counted_as_not_found(
+    cep_service, mock_api_service, mock_cep_repository, monkeypatch
+):
+    registry = MetricsRegistry(enabled=True)
+    monkeypatch.setattr("app.services.cep_service.metrics", registry)
+    mock_cep_repository.get_ceps.return_value = []
+    mock_api_service.fetch_ceps.return_value = [
+        (FetchStatus.NOT_FOUND, None), (FetchStatus.ERROR, None),
+    ]
+    mock_cep_repository.create_ceps.return_value = []
+
+    cep_service.get_or_fetch_many(["11111111", "22222222"])
+
+    assert registry.events.value(event="api_not_found") == 1
+    assert registry.events.value(event="api_error") == 1
+
+
+def test_single_api_error_is_not_counted_as_not_found(
+    cep_service, mock_api_service, mock_cep_repository, monkeypatch
+):
+    registry = MetricsRegistry(enabled=True)
+    monkeypatch.setattr("app.services.cep_service.metrics", registry)
+    mock_cep_repository.get_cep.return_value = None
+    mock_api_service.fetch_cep.return_value = (FetchStatus.ERROR, None)
+
+    assert cep_service.get_or_fetch_cep_details("12345678") is None
+    assert registry.events.value(event="api_error") == 1
+    assert registry.events.value(event="api_not_found") == 0
+    mock_cep_repository.create_cep.assert_not_called()
@@ -0,0 +1,259 @@
+import asyncio
+import json
+import threading
+import httpx
+import pytest
+import requests_mock
+from unittest.mock import MagicMock
+from app.interfaces.cep_api_service_interface import FetchStatus
+from app.models.cep_record import record_from_model
+from app.repositories.cep_repository import CEPRepository
+from app.schemas.cep_schema import cep_record_json
+from app.services.api_service import APIService
+from app.services.async_api_service import AsyncAPIService
+from app.services.cep_service import CEPService
+from app.services.multi_provider_api_service import (
+    AsyncMultiProviderAPIService,
+    MultiProviderAPIService,
+    create_api_service,
+)
+from app.services.providers.brasilapi_provider import BrasilAPIProvider
+from app.services.providers.viacep_provider import ViaCEPProvider
+from app.utils.circuit_breaker import CircuitBreaker
+
+FOUND = (FetchStatus.FOUND, {"cep": "01001-000"})
+
+
+def fake_service(name, result, delay=None):
+    service = MagicMock(spec=APIService)
+    service.circuit_breakers = {name: MagicMock()}
+
+    def fetch_cep(cep):
+        if delay is not None:
+            delay.wait(1)
+        return result
+
+    service.fetch_cep.side_effect = fetch_cep
+    return service
+
+
+def test_brasilapi_payload_is_mapped_to_cep_fields():
+    provider = BrasilAPIProvider(base_url="http://brasilapi.test/cep/v1")
+    with requests_mock.Mocker() as mock:
+        mock.get("http://brasilapi.test/cep/v1/01001000", json={
+            "cep": "01001000",
+            "state": "SP",
+            "city": "São Paulo",
+            "neighborhood": "Sé",
+            "street": "Praça da Sé",
+            "service": "viacep",
+        })
+        mock.get("http://brasilapi.test/cep/v1/99999999", status_code=404,
+                 json={"name": "CepPromiseError"})
+        api_service = APIService(provider=provider)
+
+        assert api_service.fetch_cep("01001000") == (FetchStatus.FOUND, {
+            "cep": "01001000",
+            "logradouro": "Praça da Sé",
+            "bairro": "Sé",
+            "localidade": "São Paulo",
+            "uf": "SP",
+            "estado": "São Paulo",
+            "regiao": "Sudeste",
+        })
+        assert api_service.fetch_cep("99999999") == (
+            FetchStatus.NOT_FOUND, None
+        )
+    assert api_service.circuit_breakers["brasilapi"].state == "closed"
+
+
+def test_brasilapi_result_is_served_and_keeps_known_fields(db_session):
+    repository = CEPRepository()
+    repository.upsert_ceps(db_session, [{
+        "cep": "01001000", "logradouro": "Praça da Sé",
+        "complemento": "lado ímpar", "unidade": "", "bairro": "Sé",
+        "localidade": "São Paulo", "uf": "SP", "estado": "São Paulo",
+        "regiao": "Sudeste", "ibge": "3550308", "gia": "1004", "ddd": "11",
+        "siafi": "7107",
+    }])
+    payload = BrasilAPIProvider().parse({
+        "cep": "01001000", "state": "SP", "city": "São Paulo",
+        "neighborhood": "Sé", "street": "Praça da Sé - lado par",
+    })
+
+    # Uma revalidação pela BrasilAPI não apaga os campos que ela não traz
+    repository.upsert_ceps(db_session, [dict(payload)], update_existing=True)
+    db_session.expire_all()
+    updated = repository.get_cep_record(db_session, "01001000")
+    assert updated.logradouro == "Praça da Sé - lado par"
+    assert (updated.complemento, updated.ddd) == ("lado ímpar", "11")
+
+    # Um CEP obtido só da BrasilAPI é servido com os campos ausentes nulos
+    api_service = MagicMock()
+    api_service.fetch_cep.return_value = (
+        FetchStatus.FOUND,
+        BrasilAPIProvider().parse({
+            "cep": "20040020", "state": "RJ", "city": "Rio de Janeiro",
+            "neighborhood": "Centro", "street": "Praça Pio X",
+        }),
+    )
+    service = CEPService(db_session, api_service, repository)
+    record = service.get_cep_record("20040-020")
+    data = json.loads(cep_record_json(record))
+    assert data["regiao"] == "Sudeste"
+    assert data["ddd"] is None
+    assert record == record_from_model(
+        repository.get_cep(db_session, "20040020")
+    )
+
+
+def test_falls_back_to_next_provider_on_error():
+    primary = fake_service("viacep", (FetchStatus.ERROR, None))
+    secondary = fake_service("brasilapi", FOUND)
+    service = MultiProviderAPIService([primary, secondary], hedge_delay=0)
+
+    assert service.fetch_cep("01001000") == FOUND
+    assert service.fetch_ceps(["01001000", "01001000"]) == [FOUND, FOUND]
+    assert set(service.circuit_breakers) == {"viacep", "brasilapi"}
+    service.close()
+
+
+def test_not_found_is_definitive():
+    primary = fake_service("viacep", (FetchStatus.NOT_FOUND, None))
+    secondary = fake_service("brasilapi", FOUND)
+    service = MultiProviderAPIService([primary, secondary], hedge_delay=0)
+
+    assert service.fetch_cep("99999999") == (FetchStatus.NOT_FOUND, None)
+    secondary.fetch_cep.assert_not_called()
+    service.close()
+
+
+def test_slow_provider_is_hedged():
+    release = threading.Event()
+    primary = fake_service("viacep", FOUND, delay=release)
+    secondary = fake_service("brasilapi", (FetchStatus.FOUND, {"cep": "x"}))
+    service = MultiProviderAPIService([primary, secondary], hedge_delay=0.01)
+
+    assert service.fetch_cep("01001000") == (FetchStatus.FOUND, {"cep": "x"})
+    release.set()
+    service.close()
+
+
+def test_all_providers_failing_returns_error():
+    service = MultiProviderAPIService([
+        fake_service("viacep", (FetchStatus.ERROR, None)),
+        fake_service("brasilapi", (FetchStatus.ERROR, None)),
+    ])
+
+    assert service.fetch_cep("01001000") == (FetchStatus.ERROR, None)
+    service.close()
+
+
+def test_create_api_service_from_provider_list():
+    single = create_api_service("viacep")
+    assert isinstance(single, APIService)
+    assert isinstance(single.provider, ViaCEPProvider)
+
+    multi = create_api_service("viacep, brasilapi")
+    assert [s.provider.name for s in multi.services] == [
+        "viacep", "brasilapi"
+    ]
+    multi.close()
+
+    with pytest.raises(ValueError):
+        create_api_service("correios")
+
+
+def test_async_multi_provider_hedges_slow_provider():
+    primary = MagicMock(spec=AsyncAPIService)
+    secondary = MagicMock(spec=AsyncAPIService)
+
+    async def slow(cep):
+        await asyncio.sleep(1)
+        return FOUND
+
+    async def fast(cep):
+        return FetchStatus.FOUND, {"cep": "x"}
+
+    primary.fetch_cep.side_effect = slow
+    secondary.fetch_cep.side_effect = fast
+    service = AsyncMultiProviderAPIService(
+        [primary, secondary], hedge_delay=0.01
+    )
+
+    assert asyncio.run(service.fetch_cep("01001000")) == (
+        FetchStatus.FOUND, {"cep": "x"}
+    )
+
+
+def test_async_hedge_loser_does_not_wedge_half_open_breaker():
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=0, trial_timeout=60
+    )
+    breaker.record_failure()
+
+    async def slow_handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"cep": "01001-000"})
+
+    async def fast_handler(request):
+        return httpx.Response(200, json={
+            "cep": "01001000", "state": "SP", "city": "São Paulo",
+        })
+
+    async def run():
+        primary = AsyncAPIService(
+            client=httpx.AsyncClient(
+                transport=httpx.MockTransport(slow_handler)
+            ),
+            circuit_breaker=breaker,
+        )
+        secondary = AsyncAPIService(
+            client=httpx.AsyncClient(
+                transport=httpx.MockTransport(fast_handler)
+            ),
+            provider=BrasilAPIProvider(base_url="http://brasilapi.test"),
+        )
+        service = AsyncMultiProviderAPIService(
+            [primary, secondary], hedge_delay=0.01
+        )
+        try:
+            status, _ = await service.fetch_cep("01001000")
+            # A busca perdedora segue até o fim e informa o resultado
+            await asyncio.sleep(0.1)
+            return status
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(run()) == FetchStatus.FOUND
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_async_cancelled_trial_is_released():
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=0, trial_timeout=60
+    )
+    breaker.record_failure()
+
+    async def hanging_handler(request):
+        await asyncio.sleep(1)
+
+    async def run():
+        service = AsyncAPIService(
+            client=httpx.AsyncClient(
+                transport=httpx.MockTransport(hanging_handler)
+            ),
+            circuit_breaker=breaker,
+        )
+        try:
+            task = asyncio.ensure_future(service._fetch_guarded("01001000"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        finally:
+            await service.aclose()
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
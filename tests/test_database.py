@@ -0,0 +1,49 @@
+from app.config.settings import settings
+from app.database import engine_options
+
+
+def test_engine_options_for_sql_server(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 25)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 5)
+
+    options = engine_options(
+        "mssql+pyodbc://u:p@servidor/base?driver=ODBC+Driver+17+for+SQL+Server"
+    )
+
+    assert options["pool_size"] == 25
+    assert options["max_overflow"] == 5
+    assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+    assert options["fast_executemany"] is settings.DB_FAST_EXECUTEMANY
+
+
+def test_engine_options_for_sqlite_skip_pool_sizing():
+    options = engine_options("sqlite://")
+
+    assert "pool_size" not in options
+    assert "fast_executemany" not in options
+
+
+def test_engine_options_postgres_statement_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_SECONDS", 5)
+
+    options = engine_options("postgresql://u:p@servidor/base")
+
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_engine_and_sessionmakers_are_created_once_on_demand():
+    import app.database as database
+
+    assert database.engine is database.get_engine()
+    assert database.SessionLocal is database.get_sessionmaker()
+    assert database.SessionLocal.kw["bind"] is database.engine
+    assert database.ReadSessionLocal is None
+
+
+def test_settings_proxy_reads_and_writes_the_loaded_settings(monkeypatch):
+    from app.config.settings import get_settings
+
+    monkeypatch.setattr(settings, "API_RETRIES", 7)
+
+    assert get_settings().API_RETRIES == 7
+    assert settings.API_RETRIES == 7
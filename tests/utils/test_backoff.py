@@ -0,0 +1,13 @@
+from app.utils.backoff import backoff_delay
+
+
+def test_backoff_delay_grows_and_is_capped():
+    for attempt in range(10):
+        delay = backoff_delay(attempt, base_seconds=0.1, max_seconds=1)
+        assert 0 <= delay <= min(1, 0.1 * 2 ** attempt)
+
+
+def test_backoff_delay_honours_retry_after():
+    assert backoff_delay(0, 0.1, 5, retry_after="3") == 3
+    assert backoff_delay(0, 0.1, 5, retry_after="120") == 5
+    assert backoff_delay(0, 0.1, 0.1, retry_after="data") <= 0.1
@@ -0,0 +1,91 @@
+import datetime
+import gzip
+import json
+import pytest
+from pydantic import ValidationError
+
+from app.models.cep_record import CEPRecord
+from app.schemas.cep_schema import cep_record_json
+from app.utils.cep_json_cache import (
+    CEPJSON,
+    CEPJSONCache,
+    accepted_encodings,
+)
+
+
+@pytest.fixture
+def record():
+    return CEPRecord(
+        cep="01001000",
+        logradouro="Praça da Sé",
+        complemento="lado ímpar",
+        unidade="",
+        bairro="Sé",
+        localidade="São Paulo",
+        uf="SP",
+        estado="São Paulo",
+        regiao="Sudeste",
+        ibge="3550308",
+        gia="1004",
+        ddd="11",
+        siafi="7107",
+    )
+
+
+def test_put_stores_canonical_json(record):
+    cache = CEPJSONCache(max_size=10, ttl_seconds=60, compress=False)
+
+    entry = cache.put(record)
+
+    assert cache.get("01001000") is entry
+    assert entry.body.decode("utf-8") == cep_record_json(record)
+    assert json.loads(entry.body)["ddd"] == 11
+    assert entry.gzip is None and entry.br is None
+    assert cache.get("20040020") is None
+
+
+def test_put_with_compression(record):
+    cache = CEPJSONCache(max_size=10, ttl_seconds=60, compress=True)
+    verified_at = datetime.datetime(2024, 1, 1)
+
+    entry = cache.put(record._replace(verified_at=verified_at))
+
+    assert entry.verified_at == verified_at
+    assert gzip.decompress(entry.gzip) == entry.body
+    assert entry.variant("gzip, deflate") == (entry.gzip, "gzip")
+    assert entry.variant("identity") == (entry.body, None)
+    assert entry.variant("gzip;q=0") == (entry.body, None)
+
+
+def test_invalid_record_drops_previous_entry(record):
+    cache = CEPJSONCache(max_size=10, ttl_seconds=60, compress=False)
+    cache.put(record)
+
+    with pytest.raises(ValidationError):
+        cache.put(record._replace(ddd="xx"))
+
+    assert cache.get("01001000") is None
+    assert len(cache) == 0
+
+
+def test_invalidate(record):
+    cache = CEPJSONCache(max_size=10, ttl_seconds=60, compress=False)
+    cache.put(record)
+
+    cache.invalidate("01001000")
+
+    assert cache.get("01001000") is None
+
+
+def test_variant_prefers_brotli():
+    entry = CEPJSON(b"{}", gzip=b"gz", br=b"br")
+
+    assert entry.variant("gzip, br") == (b"br", "br")
+    assert entry.variant("gzip, br;q=0") == (b"gz", "gzip")
+    assert entry.variant(None) == (b"{}", None)
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip, br;q=0.5, *;q=0, x;q=y") == {
+        "gzip": 1.0, "br": 0.5, "*": 0.0,
+    }
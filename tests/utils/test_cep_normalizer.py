@@ -0,0 +1,43 @@
+import pytest
+
+from app.utils.cep_normalizer import normalize_ceps, sanitize_cep
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("01001000", "01001000"),
+    ("01001-000", "01001000"),
+    (" 01.001-000 ", "01001000"),
+    ("CEP: 01001000\n", "01001000"),
+    ("０１００１０００", ""),
+    ("", ""),
+])
+def test_sanitize_cep(value, expected):
+    assert sanitize_cep(value) == expected
+
+
+def test_normalize_ceps_dedupes_and_reports_invalid():
+    values = ["01001-000", "123", "20040020", "01001000", "", "x20040-020"]
+
+    normalized = normalize_ceps(values)
+
+    assert normalized.sanitized == [
+        "01001000", None, "20040020", "01001000", None, "20040020",
+    ]
+    assert normalized.unique == ["01001000", "20040020"]
+    assert normalized.invalid == [1, 4]
+
+
+def test_normalize_ceps_matches_sanitize_cep():
+    values = ["01001-000", "a\nb01001000", None, "０１", "12.345-678"]
+
+    normalized = normalize_ceps(values)
+
+    expected = [sanitize_cep(value or "") for value in values]
+    assert normalized.sanitized == [
+        cep if len(cep) == 8 else None for cep in expected
+    ]
+    assert normalized.invalid == [2, 3]
+
+
+def test_normalize_ceps_empty_input():
+    assert normalize_ceps([]) == ([], [], [])
@@ -0,0 +1,88 @@
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=10)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success()
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_allows_a_single_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=10, clock=clock
+    )
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_failed_trial_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=5, recovery_timeout=10, clock=clock
+    )
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow_request() is True
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.snapshot()["times_opened"] == 2
+
+
+def test_released_trial_can_be_retried():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=10, clock=clock
+    )
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow_request() is True
+
+    breaker.release_trial()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+
+
+def test_lost_trial_expires_after_trial_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=10, clock=clock,
+        trial_timeout=5,
+    )
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow_request() is True
+
+    clock.now = 14
+    assert breaker.allow_request() is False
+    clock.now = 15
+    assert breaker.allow_request() is True
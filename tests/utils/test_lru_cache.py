@@ -0,0 +1,50 @@
+import pytest
+from app.utils.lru_cache import MISSING, LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_lru_cache_evicts_least_recently_used(clock):
+    cache = LRUCache(max_size=2, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries_after_ttl(clock):
+    cache = LRUCache(max_size=10, ttl_seconds=60, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=5)
+    clock.now = 10
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    clock.now = 61
+    assert cache.get("a", None) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["expirations"] == 2
+
+
+def test_lru_cache_rejects_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(max_size=0, ttl_seconds=1)
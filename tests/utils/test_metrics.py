@@ -0,0 +1,42 @@
+from app.utils.metrics import MetricsRegistry
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+
+    with registry.stage("local_lookup"):
+        pass
+    registry.inc("local_hit")
+
+    assert registry.stage_duration.count(stage="local_lookup") == 0
+    assert registry.events.value(event="local_hit") == 0
+
+
+def test_enabled_registry_records_stages_and_events():
+    registry = MetricsRegistry(enabled=True)
+
+    with registry.stage("external_fetch"):
+        pass
+    registry.inc("api_found")
+    registry.inc("api_found", 2)
+
+    assert registry.stage_duration.count(stage="external_fetch") == 1
+    assert registry.events.value(event="api_found") == 3
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry(enabled=True)
+    registry.stage_duration.observe(0.003, stage="persist")
+    registry.stage_duration.observe(20.0, stage="persist")
+    registry.inc("cache_hit")
+    registry.gauge("cep_cache_entries", "Entradas.", lambda: 7)
+
+    text = registry.render_prometheus()
+
+    assert 'cep_events_total{event="cache_hit"} 1' in text
+    assert ('cep_stage_duration_seconds_bucket'
+            '{stage="persist",le="0.005"} 1') in text
+    assert ('cep_stage_duration_seconds_bucket'
+            '{stage="persist",le="+Inf"} 2') in text
+    assert 'cep_stage_duration_seconds_count{stage="persist"} 2' in text
+    assert "# TYPE cep_cache_entries gauge\ncep_cache_entries 7" in text
@@ -0,0 +1,63 @@
+import asyncio
+import time
+import pytest
+from app.utils.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=3, clock=clock)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.1)
+    assert bucket.reserve() == pytest.approx(0.2)
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    for _ in range(2):
+        bucket.acquire(sleep=clock.sleep)
+
+    bucket.acquire(sleep=clock.sleep)
+    assert clock.now == pytest.approx(0.5)
+
+    clock.now += 10
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_never_exceeds_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=5, burst=1, clock=clock)
+
+    for _ in range(11):
+        bucket.acquire(sleep=clock.sleep)
+
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_token_bucket_async_acquire():
+    bucket = TokenBucket(rate=1000, burst=1)
+
+    async def run():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(5)))
+
+    started = time.monotonic()
+    asyncio.run(run())
+    assert time.monotonic() - started >= 0.0035
+
+
+def test_token_bucket_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import pytest
+from app.utils.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "resultado"
+
+    results = []
+    leader = threading.Thread(
+        target=lambda: results.append(single_flight.do("k", work))
+    )
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(
+        target=lambda: results.append(single_flight.do("k", work))
+    )
+    follower.start()
+    while not follower.is_alive():
+        pass
+    release.set()
+    leader.join(1)
+    follower.join(1)
+
+    assert len(calls) == 1
+    assert sorted(results, key=lambda r: r[1]) == [
+        ("resultado", False), ("resultado", True)
+    ]
+    assert len(single_flight) == 0
+
+
+def test_single_flight_propagates_errors_and_releases_key():
+    single_flight = SingleFlight()
+
+    with pytest.raises(RuntimeError):
+        single_flight.do("k", lambda: (_ for _ in ()).throw(RuntimeError()))
+
+    assert single_flight.do("k", lambda: 1) == (1, False)
+
+
+def test_async_followers_survive_leader_cancellation():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "01001000"
+
+    async def run():
+        leader = asyncio.ensure_future(flight.do("cep", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("cep", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, len(flight)
+
+    assert asyncio.run(run()) == (("01001000", True), 0)